@@ -15,14 +15,32 @@ from dotenv import load_dotenv
 # Adicionar o diretório pai ao path para importar config
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.instrucoes_globais import get_instrucoes_globais
+from utils.cache_pesquisa import CachePesquisa
 
 load_dotenv()
 
 class AgentePesquisador:
     """Agente especializado em pesquisar informações atualizadas sobre temas"""
     
-    def __init__(self):
-        """Inicializa o agente pesquisador com GPT-4 Turbo e ferramentas Tavily"""
+    MODELO_PADRAO = "gpt-4-turbo"
+    
+    def __init__(self, cache: CachePesquisa = None, usar_cache: bool = None, modelo_id: str = None):
+        """
+        Inicializa o agente pesquisador com GPT-4 Turbo e ferramentas Tavily
+        
+        Para reaproveitar a mesma instância entre chamadas, use
+        agents.registro_agentes.obter_agente_pesquisador()
+        
+        Args:
+            modelo_id: Modelo da OpenAI (padrão: MODELO_PADRAO)
+            cache: Cache de pesquisas a usar (padrão: CachePesquisa em memoria/dados)
+            usar_cache: Liga/desliga o cache (padrão: PESQUISA_CACHE, ligado se não definido)
+        """
+        
+        # Cache de pesquisas (evita repetir GPT-4 + Tavily para a mesma palavra-chave)
+        if usar_cache is None:
+            usar_cache = os.getenv("PESQUISA_CACHE", "1").lower() not in ("0", "false", "nao", "não")
+        self.cache = (cache or CachePesquisa()) if usar_cache else None
         
         # Verificar se API key está configurada
         api_key = os.getenv("OPENAI_API_KEY")
@@ -57,7 +75,7 @@ class AgentePesquisador:
         self.agent = Agent(
             name="Agente Pesquisador - iGaming Brasil",
             model=OpenAIChat(
-                id="gpt-4-turbo",
+                id=modelo_id or self.MODELO_PADRAO,
                 api_key=api_key
             ),
             tools=[TavilyTools()],
@@ -66,18 +84,33 @@ class AgentePesquisador:
             add_datetime_to_context=True
         )
     
-    def pesquisar(self, palavra_chave: str, profundidade: str = "detalhada") -> dict:
+    def pesquisar(
+        self,
+        palavra_chave: str,
+        profundidade: str = "detalhada",
+        ignorar_cache: bool = False,
+        max_idade_horas: float = None
+    ) -> dict:
         """
         Realiza uma pesquisa detalhada sobre a palavra-chave
         
         Args:
             palavra_chave: O termo ou tema a ser pesquisado
             profundidade: "rapida" ou "detalhada"
+            ignorar_cache: Se True, força uma nova pesquisa (o resultado ainda é guardado no cache)
+            max_idade_horas: Idade máxima aceita para uma pesquisa em cache (padrão: TTL do cache)
             
         Returns:
             dict com resultados da pesquisa estruturados
         """
         
+        if self.cache and not ignorar_cache:
+            em_cache = self.cache.obter(palavra_chave, profundidade, max_idade_horas)
+            if em_cache:
+                print(f"♻️ Pesquisa em cache para: {palavra_chave}")
+                em_cache["em_cache"] = True
+                return em_cache
+        
         prompt_pesquisa = f"""
         Realize uma pesquisa {profundidade} sobre: {palavra_chave}
         
@@ -119,6 +152,9 @@ class AgentePesquisador:
                 "timestamp": self._obter_timestamp()
             }
             
+            if self.cache:
+                self.cache.salvar(palavra_chave, profundidade, resultado)
+            
             return resultado
             
         except Exception as e:
@@ -127,7 +163,27 @@ class AgentePesquisador:
                 "palavra_chave": palavra_chave,
                 "conteudo": f"Erro ao realizar pesquisa: {str(e)}",
                 "fontes": [],
-                "timestamp": self._obter_timestamp()
+                "timestamp": self._obter_timestamp(),
+                "erro": str(e)
             }
     
-    de
\ No newline at end of file
+    def _extrair_fontes(self, response) -> list:
+        """Extrai as URLs citadas na resposta da pesquisa"""
+        import re
+        
+        conteudo = response.content if hasattr(response, 'content') else str(response)
+        if not conteudo:
+            return []
+        
+        fontes = []
+        for url in re.findall(r'https?://[^\s\)\]>"\']+', str(conteudo)):
+            url = url.rstrip('.,;:')
+            if url not in fontes:
+                fontes.append(url)
+        
+        return fontes
+    
+    def _obter_timestamp(self) -> str:
+        """Retorna o timestamp atual"""
+        from datetime import datetime
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -7,21 +7,34 @@ Usa GPT-4 Turbo da OpenAI para máxima qualidade
 import os
 import sys
 from pathlib import Path
+from typing import Iterator
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
+from agno.run.agent import RunEvent
 from dotenv import load_dotenv
 
 # Adicionar o diretório pai ao path para importar config
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.instrucoes_globais import get_instrucoes_globais
+from agents.parser_secoes import ParserSecoesIncremental
 
 load_dotenv()
 
 class AgenteRedator:
     """Agente especializado em criar conteúdo otimizado para SEO - iGaming Brasil"""
     
-    def __init__(self):
-        """Inicializa o agente redator com GPT-4 Turbo e instruções globais"""
+    MODELO_PADRAO = "gpt-4-turbo"
+    
+    def __init__(self, modelo_id: str = None):
+        """
+        Inicializa o agente redator com GPT-4 Turbo e instruções globais
+        
+        Para reaproveitar a mesma instância entre chamadas, use
+        agents.registro_agentes.obter_agente_redator()
+        
+        Args:
+            modelo_id: Modelo da OpenAI (padrão: MODELO_PADRAO)
+        """
         
         # Verificar se API key está configurada
         api_key = os.getenv("OPENAI_API_KEY")
@@ -65,7 +78,7 @@ class AgenteRedator:
         self.agent = Agent(
             name="Agente Redator - iGaming Brasil",
             model=OpenAIChat(
-                id="gpt-4-turbo",
+                id=modelo_id or self.MODELO_PADRAO,
                 api_key=api_key
             ),
             instructions=instrucoes_completas,
@@ -93,7 +106,85 @@ class AgenteRedator:
             dict com o conteúdo gerado e metadados
         """
         
-        prompt_redacao = f"""
+        prompt_redacao = self._criar_prompt_redacao(
+            palavra_chave, pesquisa_resultado, exemplo_categoria, regras_categoria
+        )
+        
+        try:
+            # Gerar conteúdo
+            response = self.agent.run(prompt_redacao)
+            conteudo_bruto = response.content if hasattr(response, 'content') else str(response)
+            
+            # Parsear resposta
+            conteudo_parseado = self._parsear_conteudo(conteudo_bruto)
+            
+            return self._montar_resultado(palavra_chave, conteudo_bruto, conteudo_parseado)
+            
+        except Exception as e:
+            print(f"Erro ao gerar conteúdo: {e}")
+            return self._resultado_erro(palavra_chave, e)
+    
+    def gerar_conteudo_stream(
+        self,
+        palavra_chave: str,
+        pesquisa_resultado: dict,
+        exemplo_categoria: str = "",
+        regras_categoria: str = ""
+    ) -> Iterator[dict]:
+        """
+        Versão em streaming de gerar_conteudo
+        
+        Produz eventos à medida que o modelo responde:
+        - {"tipo": "token", "texto": ...}: trecho bruto recebido do modelo
+        - {"tipo": "secao", "secao": ..., "valor": ...}: seção de linha única concluída
+          (o título chega logo no início, antes do corpo do artigo)
+        - {"tipo": "conteudo", "texto": ...}: novo pedaço do corpo em Markdown
+        - {"tipo": "final", "resultado": ...}: mesmo dict retornado por gerar_conteudo
+        
+        Args:
+            (mesmos de gerar_conteudo)
+            
+        Yields:
+            dict com o evento
+        """
+        
+        prompt_redacao = self._criar_prompt_redacao(
+            palavra_chave, pesquisa_resultado, exemplo_categoria, regras_categoria
+        )
+        parser = ParserSecoesIncremental()
+        
+        try:
+            for evento in self.agent.run(prompt_redacao, stream=True):
+                if getattr(evento, 'event', None) != RunEvent.run_content:
+                    continue
+                
+                trecho = evento.content if isinstance(evento.content, str) else ""
+                if not trecho:
+                    continue
+                
+                yield {"tipo": "token", "texto": trecho}
+                yield from parser.alimentar(trecho)
+            
+            yield from parser.finalizar()
+            
+            resultado = self._montar_resultado(palavra_chave, parser.texto_bruto(), parser.resultado())
+            
+        except Exception as e:
+            print(f"Erro ao gerar conteúdo: {e}")
+            resultado = self._resultado_erro(palavra_chave, e)
+        
+        yield {"tipo": "final", "resultado": resultado}
+    
+    def _criar_prompt_redacao(
+        self,
+        palavra_chave: str,
+        pesquisa_resultado: dict,
+        exemplo_categoria: str = "",
+        regras_categoria: str = ""
+    ) -> str:
+        """Monta o prompt de redação do artigo"""
+        
+        return f"""
         Crie um artigo completo e otimizado para SEO sobre: **{palavra_chave}**
         
         ## INFORMAÇÕES DE PESQUISA
@@ -158,16 +249,10 @@ class AgenteRedator:
         
         ALT_TEXT_IMAGEM: [sugestão de texto alternativo para a imagem principal]
         """
-        
-        try:
-            # Gerar conteúdo
-            response = self.agent.run(prompt_redacao)
-            conteudo_bruto = response.content if hasattr(response, 'content') else str(response)
-            
-            # Parsear resposta
-            conteudo_parseado = self._parsear_conteudo(conteudo_bruto)
-            
-            resultado = {
+    
+    def _montar_resultado(self, palavra_chave: str, conteudo_bruto: str, conteudo_parseado: dict) -> dict:
+        """Monta o dict de resultado a partir da resposta parseada"""
+        return {
                 "palavra_chave": palavra_chave,
                 "titulo": conteudo_parseado.get("titulo", palavra_chave.title()),
                 "meta_description": conteudo_parseado.get("meta_description", ""),
@@ -178,22 +263,21 @@ class AgenteRedator:
                 "timestamp": self._obter_timestamp(),
                 "estatisticas": self._calcular_estatisticas(conteudo_parseado.get("conteudo", conteudo_bruto))
             }
-            
-            return resultado
-            
-        except Exception as e:
-            print(f"Erro ao gerar conteúdo: {e}")
-            return {
-                "palavra_chave": palavra_chave,
-                "titulo": palavra_chave.title(),
-                "meta_description": f"Artigo sobre {palavra_chave}",
-                "resumo": f"Conteúdo sobre {palavra_chave}",
-                "conteudo_formatado": f"Erro ao gerar conteúdo: {str(e)}",
-                "palavras_chave_secundarias": [],
-                "alt_text_imagem": palavra_chave,
-                "timestamp": self._obter_timestamp(),
-                "estatisticas": {}
-            }
+    
+    def _resultado_erro(self, palavra_chave: str, erro: Exception) -> dict:
+        """Resultado padrão quando a geração falha"""
+        return {
+            "palavra_chave": palavra_chave,
+            "titulo": palavra_chave.title(),
+            "meta_description": f"Artigo sobre {palavra_chave}",
+            "resumo": f"Conteúdo sobre {palavra_chave}",
+            "conteudo_formatado": f"Erro ao gerar conteúdo: {str(erro)}",
+            "palavras_chave_secundarias": [],
+            "alt_text_imagem": palavra_chave,
+            "timestamp": self._obter_timestamp(),
+            "estatisticas": {},
+            "erro": str(erro)
+        }
     
     def revisar_conteudo(self, conteudo: str, foco: str = "seo") -> str:
         """
@@ -222,42 +306,14 @@ class AgenteRedator:
     
     def _parsear_conteudo(self, conteudo_bruto: str) -> dict:
         """Parseia o conteúdo bruto em componentes estruturados"""
-        resultado = {}
-        
         try:
-            linhas = conteudo_bruto.split('\n')
-            conteudo_principal = []
-            capturando_conteudo = False
-            
-            for linha in linhas:
-                if linha.startswith('TITULO:'):
-                    resultado['titulo'] = linha.replace('TITULO:', '').strip()
-                elif linha.startswith('META_DESCRIPTION:'):
-                    resultado['meta_description'] = linha.replace('META_DESCRIPTION:', '').strip()
-                elif linha.startswith('RESUMO:'):
-                    resultado['resumo'] = linha.replace('RESUMO:', '').strip()
-                elif linha.startswith('CONTEUDO:'):
-                    capturando_conteudo = True
-                    continue
-                elif linha.startswith('PALAVRAS_CHAVE_SECUNDARIAS:'):
-                    capturando_conteudo = False
-                    palavras = linha.replace('PALAVRAS_CHAVE_SECUNDARIAS:', '').strip()
-                    resultado['palavras_chave_secundarias'] = [p.strip() for p in palavras.split(',')]
-                elif linha.startswith('ALT_TEXT_IMAGEM:'):
-                    resultado['alt_text_imagem'] = linha.replace('ALT_TEXT_IMAGEM:', '').strip()
-                elif capturando_conteudo:
-                    conteudo_principal.append(linha)
-            
-            if conteudo_principal:
-                resultado['conteudo'] = '\n'.join(conteudo_principal)
-            else:
-                resultado['conteudo'] = conteudo_bruto
-                
+            parser = ParserSecoesIncremental()
+            parser.alimentar(conteudo_bruto)
+            parser.finalizar()
+            return parser.resultado()
         except Exception as e:
             print(f"Erro ao parsear conteúdo: {e}")
-            resultado['conteudo'] = conteudo_bruto
-        
-        return resultado
+            return {'conteudo': conteudo_bruto}
     
     def _calcular_estatisticas(self, conteudo: str) -> dict:
         """Calcula estatísticas do conteúdo"""
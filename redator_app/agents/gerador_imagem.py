@@ -5,29 +5,151 @@ Suporta: DALL-E 3 (OpenAI), Replicate (Flux/Stable Diffusion), ou fallback com t
 """
 
 import os
-import requests
+import sys
 import base64
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFile, ImageFont
 from datetime import datetime
 from io import BytesIO
+from collections import OrderedDict
+from functools import lru_cache
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.aguardador_replicate import obter_aguardador
+from utils.cache_imagens import CacheImagens
+from utils.codificador_imagem import CodificadorImagem
+from utils.http_sessao import obter_sessao, timeout
+from utils.saude_provedores import ProvedorIndisponivel, obter_saude
+
 load_dotenv()
 
+# Rendições de cada imagem de destaque: nome → (largura, altura)
+RENDICOES_PADRAO = {
+    "og": (1200, 630),
+    "quadrada": (1080, 1080),
+    "mobile": (828, 1104),
+    "miniatura": (400, 210),
+}
+
+# Fontes do fallback, na ordem de preferência (IMAGEM_FONTE tem prioridade)
+FONTES_CANDIDATAS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+)
+
+
+def _encontrar_fonte() -> str:
+    """Caminho da fonte do fallback, ou None para usar a fonte embutida do Pillow"""
+    configurada = os.getenv("IMAGEM_FONTE")
+    for caminho in ((configurada,) if configurada else ()) + FONTES_CANDIDATAS:
+        if Path(caminho).exists():
+            return caminho
+    return None
+
+
+@lru_cache(maxsize=16)
+def _carregar_fonte(caminho: str, tamanho: int) -> ImageFont.FreeTypeFont:
+    """Carrega uma fonte uma única vez por processo"""
+    if caminho:
+        try:
+            return ImageFont.truetype(caminho, tamanho)
+        except OSError as e:
+            print(f"⚠️ Fonte {caminho} indisponível: {e}")
+    return ImageFont.load_default(tamanho)
+
+
+@lru_cache(maxsize=4096)
+def _largura_texto(caminho: str, tamanho: int, texto: str) -> float:
+    """Largura de um trecho de texto (as palavras dos títulos se repetem muito)"""
+    return _carregar_fonte(caminho, tamanho).getlength(texto)
+
+
+@lru_cache(maxsize=1024)
+def _mascara_palavra(caminho: str, tamanho: int, palavra: str) -> Image.Image:
+    """Palavra rasterizada uma única vez (máscara L com a origem do texto em 0,0)"""
+    fonte = _carregar_fonte(caminho, tamanho)
+    _, _, direita, base = fonte.getbbox(palavra)
+    mascara = Image.new('L', (max(1, direita), max(1, base)))
+    ImageDraw.Draw(mascara).text((0, 0), palavra, font=fonte, fill=255)
+    return mascara
+
+
+@lru_cache(maxsize=8)
+def _template_gradiente(largura: int, altura: int, inicio: tuple, fim: tuple) -> Image.Image:
+    """
+    Fundo do fallback: gradiente vertical de inicio a fim com borda branca
+    
+    O gradiente é calculado em C (linear_gradient + tabela por canal) em vez
+    de uma linha por vez. Quem usar o template precisa copiá-lo antes de desenhar.
+    """
+    rampa = Image.linear_gradient('L').resize((largura, altura))
+    canais = [
+        rampa.point([int(a + (b - a) * v / 255) for v in range(256)])
+        for a, b in zip(inicio, fim)
+    ]
+    img = Image.merge('RGB', canais)
+    
+    # Adicionar borda decorativa
+    ImageDraw.Draw(img).rectangle([(50, 50), (largura - 50, altura - 50)], outline='white', width=5)
+    return img
+
+
 class GeradorImagem:
     """Gera imagens para os artigos usando IA"""
     
-    def __init__(self, output_dir: str = "redator_app/imagens_geradas"):
-        """Inicializa o gerador de imagens"""
+    # Gradiente azul profissional do fallback (topo, base)
+    PALETA_TEXTO = ((25, 100, 200), (55, 150, 255))
+    
+    def __init__(self, output_dir: str = "redator_app/imagens_geradas", cache: CacheImagens = None,
+                 usar_cache: bool = None, codificador: CodificadorImagem = None,
+                 salvar_em_disco: bool = None):
+        """
+        Inicializa o gerador de imagens
+        
+        Args:
+            output_dir: Pasta das imagens geradas
+            cache: Cache de imagens a usar (padrão: CacheImagens em output_dir/cache)
+            usar_cache: Liga/desliga o cache (padrão: IMAGEM_CACHE, ligado se não definido)
+            codificador: Formato de saída (padrão: CodificadorImagem configurado pelo .env)
+            salvar_em_disco: Se False, as imagens novas ficam só em memória (obter_bytes) e o
+                             caminho retornado não existe em disco; o cache não é gravado
+                             (padrão: IMAGEM_SALVAR_DISCO, ligado se não definido)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.largura = 1200
         self.altura = 630
         
+        # Formato dos arquivos gerados (PNG, JPEG progressivo ou WebP)
+        self.codificador = codificador or CodificadorImagem()
+        
+        # Cache por prompt (evita pagar de novo pela mesma imagem e limita o uso de disco)
+        if usar_cache is None:
+            usar_cache = os.getenv("IMAGEM_CACHE", "1").lower() not in ("0", "false", "nao", "não")
+        self.cache = (cache or CacheImagens(self.output_dir / "cache")) if usar_cache else None
+        
+        # Sem disco, quem usa a imagem a lê de obter_bytes (ex.: upload e publicação em lote)
+        if salvar_em_disco is None:
+            salvar_em_disco = os.getenv("IMAGEM_SALVAR_DISCO", "1").lower() not in ("0", "false", "nao", "não")
+        self.salvar_em_disco = salvar_em_disco
+        
+        # Fonte do fallback (carregada uma vez por processo)
+        self.fonte_path = _encontrar_fonte()
+        
         # Configurar APIs disponíveis
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.replicate_key = os.getenv("REPLICATE_API_TOKEN")
+        
+        # Conexões keep-alive e novas tentativas compartilhadas pelo processo
+        self.http = obter_sessao()
+        
+        # Taxa de erro, latência e disjuntor de cada provedor, compartilhados pelo processo
+        self.saude = obter_saude()
+        
+        # Bytes das últimas imagens geradas, por caminho (upload sem reler o disco)
+        self._em_memoria = OrderedDict()
     
     def gerar_imagem(self, titulo: str, descricao: str = "", contexto: dict = None) -> str:
         """
@@ -53,26 +175,34 @@ class GeradorImagem:
         if contexto is None:
             contexto = {}
         
-        # Tentar DALL-E 3 primeiro
-        if self.openai_key:
-            try:
-                print("→ Usando DALL-E 3 (OpenAI)...")
-                return self._gerar_com_dalle3(titulo, descricao, contexto)
-            except Exception as e:
-                print(f"⚠️ DALL-E 3 falhou: {e}")
+        # Tentar DALL-E 3 primeiro, depois Replicate. Cada provedor consulta o cache
+        # antes do disjuntor: uma imagem já paga é usada mesmo com o provedor fora
+        provedores = (
+            ("DALL-E 3 (OpenAI)", self.openai_key, self._gerar_com_dalle3),
+            ("Replicate (Flux)", self.replicate_key, self._gerar_com_replicate),
+        )
         
-        # Tentar Replicate
-        if self.replicate_key:
+        for nome, chave, gerar in provedores:
+            if not chave:
+                continue
+            
             try:
-                print("→ Usando Replicate (Flux)...")
-                return self._gerar_com_replicate(titulo, descricao, contexto)
+                print(f"→ Usando {nome}...")
+                return gerar(titulo, descricao, contexto)
+            except ProvedorIndisponivel:
+                print(f"⏭️ {nome} indisponível no momento, pulando...")
             except Exception as e:
-                print(f"⚠️ Replicate falhou: {e}")
+                print(f"⚠️ {nome} falhou: {e}")
         
         # Fallback: imagem com texto
         print("→ Usando gerador de texto estilizado...")
+        self.saude.escolher("texto")
         return self._gerar_imagem_texto(titulo, descricao)
     
+    def metricas_provedores(self) -> dict:
+        """Provedor escolhido e estado do disjuntor de cada provedor (compartilhado pelo processo)"""
+        return self.saude.metricas()
+    
     def _gerar_com_dalle3(self, titulo: str, descricao: str, contexto: dict = None) -> str:
         """
         Gera imagem usando DALL-E 3 da OpenAI
@@ -91,6 +221,10 @@ class GeradorImagem:
         # Criar prompt otimizado com contexto rico
         prompt = self._criar_prompt_dalle(titulo, descricao, contexto)
         
+        origem, em_cache = self._buscar_cache("openai", "dall-e-3/1792x1024/standard/natural", prompt)
+        if em_cache:
+            return em_cache
+        
         url = "https://api.openai.com/v1/images/generations"
         
         headers = {
@@ -107,16 +241,20 @@ class GeradorImagem:
             "style": "natural"  # "natural" ou "vivid"
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
-        
-        if response.status_code == 200:
-            data = response.json()
-            image_url = data['data'][0]['url']
+        def chamar():
+            response = self.http.post(url, json=payload, headers=headers, timeout=timeout(60))
             
-            # Baixar e redimensionar para 1200x630
-            return self._baixar_e_redimensionar(image_url, titulo)
-        else:
-            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+            if response.status_code == 200:
+                data = response.json()
+                image_url = data['data'][0]['url']
+                
+                # Baixar e redimensionar para 1200x630
+                return self._baixar_e_redimensionar(image_url, titulo, origem)
+            else:
+                raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+        
+        # Só a chamada real passa pelo disjuntor (o acerto de cache acima não conta)
+        return self.saude.chamar("dalle3", chamar)
     
     def _gerar_com_replicate(self, titulo: str, descricao: str, contexto: dict = None) -> str:
         """
@@ -139,6 +277,11 @@ class GeradorImagem:
         # Criar prompt otimizado com contexto rico
         prompt = self._criar_prompt_replicate(titulo, descricao, contexto)
         
+        versao = "f2ab8a5569479b796f8986afbd7f96745c4d0c81be6d7dddeb8f71a34e5f3e3c"  # flux-schnell
+        origem, em_cache = self._buscar_cache("replicate", f"flux-schnell:{versao}", prompt)
+        if em_cache:
+            return em_cache
+        
         url = "https://api.replicate.com/v1/predictions"
         
         headers = {
@@ -148,7 +291,7 @@ class GeradorImagem:
         
         # Usando Flux Schnell (GRATUITO e rápido!)
         payload = {
-            "version": "f2ab8a5569479b796f8986afbd7f96745c4d0c81be6d7dddeb8f71a34e5f3e3c",  # flux-schnell
+            "version": versao,
             "input": {
                 "prompt": prompt,
                 "width": 1216,  # Múltiplo de 32 próximo de 1200
@@ -160,43 +303,43 @@ class GeradorImagem:
             }
         }
         
-        # Criar predição
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        aguardador = obter_aguardador()
+        payload.update(aguardador.parametros_webhook())
         
-        if response.status_code == 201:
-            prediction = response.json()
-            prediction_url = prediction['urls']['get']
-            
-            # Aguardar conclusão (polling)
-            image_url = self._aguardar_replicate(prediction_url, headers)
-            
-            # Baixar e ajustar tamanho
-            return self._baixar_e_redimensionar(image_url, titulo)
-        else:
-            raise Exception(f"Replicate API error: {response.status_code} - {response.text}")
-    
-    def _aguardar_replicate(self, prediction_url: str, headers: dict, max_tentativas: int = 60) -> str:
-        """Aguarda a conclusão da geração no Replicate"""
-        import time
+        # Criar predição e segurar a conexão até ela terminar (Flux Schnell leva poucos segundos)
+        espera_s = int(os.getenv("REPLICATE_PREFER_WAIT_S", "60"))
+        headers_criacao = {**headers, "Prefer": f"wait={espera_s}"} if espera_s > 0 else headers
         
-        for i in range(max_tentativas):
-            response = requests.get(prediction_url, headers=headers, timeout=10)
+        def chamar():
+            response = self.http.post(url, json=payload, headers=headers_criacao, timeout=timeout(espera_s + 10))
             
-            if response.status_code == 200:
+            if response.status_code in (200, 201):
                 prediction = response.json()
-                status = prediction['status']
                 
-                if status == 'succeeded':
-                    return prediction['output'][0]  # URL da imagem
-                elif status == 'failed':
-                    raise Exception(f"Replicate generation failed: {prediction.get('error')}")
+                # Se ainda não terminou, aguardar junto com as demais predições (webhook ou polling)
+                image_url = self._aguardar_replicate(prediction, headers)
                 
-                # Ainda processando, aguardar
-                time.sleep(1)
+                # Baixar e ajustar tamanho
+                return self._baixar_e_redimensionar(image_url, titulo, origem)
             else:
-                raise Exception(f"Error checking status: {response.status_code}")
+                raise Exception(f"Replicate API error: {response.status_code} - {response.text}")
+        
+        # Só a chamada real passa pelo disjuntor (o acerto de cache acima não conta)
+        return self.saude.chamar("replicate", chamar)
+    
+    def _aguardar_replicate(self, prediction: dict, headers: dict, timeout_s: float = None) -> str:
+        """Aguarda a conclusão da geração no Replicate e retorna a URL da imagem"""
+        if timeout_s is None:
+            timeout_s = float(os.getenv("REPLICATE_TIMEOUT_S", "120"))
+        
+        futuro = obter_aguardador().aguardar(prediction, headers, timeout_s)
+        prediction = futuro.result(timeout=timeout_s + 15)
+        
+        if prediction['status'] == 'succeeded':
+            output = prediction['output']
+            return output[0] if isinstance(output, list) else output  # URL da imagem
         
-        raise Exception("Timeout waiting for image generation")
+        raise Exception(f"Replicate generation {prediction['status']}: {prediction.get('error')}")
     
     def _criar_prompt_dalle(self, titulo: str, descricao: str, contexto: dict = None) -> str:
         """
@@ -334,52 +477,106 @@ Context: {descricao if descricao else palavra_chave}"""
         
         return prompt
     
-    def _baixar_e_redimensionar(self, url: str, titulo: str) -> str:
-        """Baixa imagem de URL e redimensiona para 1200x630"""
-        response = requests.get(url, timeout=30)
+    def _baixar_e_redimensionar(self, url: str, titulo: str, origem: dict = None) -> str:
+        """Baixa imagem de URL (ou data URI) e redimensiona para 1200x630"""
+        if url.startswith('data:'):
+            # Predições síncronas podem devolver a imagem embutida
+            img = base64.b64decode(url.split(',', 1)[1])
+        else:
+            with self.http.get(url, timeout=timeout(30), stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Error downloading image: {response.status_code}")
+                
+                # Decodificar enquanto baixa
+                img = self._decodificar_download(response)
         
-        if response.status_code == 200:
-            # Abrir imagem
-            img = Image.open(BytesIO(response.content))
-            
-            # Redimensionar mantendo proporção e cropando se necessário
-            img_redimensionada = self._crop_to_size(img, self.largura, self.altura)
-            
-            # Salvar
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self._sanitizar_nome(titulo)}_{timestamp}.png"
-            filepath = self.output_dir / filename
-            
-            img_redimensionada.save(filepath, 'PNG', quality=95)
-            
-            return str(filepath)
+        # Redimensionar mantendo proporção, cropar e codificar em memória
+        buffer = self.preparar_imagem(img)
+        
+        # Salvar (em disco só se configurado)
+        return self._salvar_bytes(buffer.getvalue(), titulo, origem, self.codificador.extensao)
+    
+    def preparar_imagem(self, imagem, largura: int = None, altura: int = None) -> BytesIO:
+        """
+        Ajusta uma imagem ao tamanho final sem gravar nada em disco
+        
+        A codificação roda nesta thread (dentro do limite de codificações
+        simultâneas do processo).
+        
+        Args:
+            imagem: bytes, arquivo aberto ou Image do Pillow
+            largura: Largura final (padrão: 1200)
+            altura: Altura final (padrão: 630)
+        
+        Returns:
+            BytesIO com a imagem no formato do codificador (posicionado no início)
+        """
+        largura = largura or self.largura
+        altura = altura or self.altura
+        
+        if isinstance(imagem, (bytes, bytearray)):
+            imagem = BytesIO(imagem)
+        if not isinstance(imagem, Image.Image):
+            imagem = self._abrir(imagem, (largura, altura))
+        
+        return BytesIO(self.codificador.codificar(self._crop_to_size(imagem, largura, altura)))
+    
+    def _abrir(self, arquivo, tamanho: tuple = None) -> Image.Image:
+        """Abre uma imagem já pedindo ao decodificador JPEG a menor escala que ainda cobre o tamanho final"""
+        img = Image.open(arquivo)
+        # draft só tem efeito em JPEG (decodifica a 1/2, 1/4 ou 1/8); nos demais formatos é ignorado
+        img.draft('RGB', tamanho or (self.largura, self.altura))
+        return self._normalizar_modo(img)
+    
+    def _decodificar_download(self, response) -> Image.Image:
+        """
+        Decodifica a imagem à medida que os blocos chegam
+        
+        PNG e demais formatos passam por um ImageFile.Parser, sem acumular o
+        arquivo inteiro. JPEG é lido por completo para poder usar o draft.
+        """
+        partes = response.iter_content(64 * 1024)
+        inicio = next(partes, b'')
+        
+        if inicio[:2] == b'\xff\xd8':
+            return self._abrir(BytesIO(inicio + b''.join(partes)))
         
-        raise Exception(f"Error downloading image: {response.status_code}")
+        parser = ImageFile.Parser()
+        parser.feed(inicio)
+        for parte in partes:
+            parser.feed(parte)
+        return self._normalizar_modo(parser.close())
+    
+    @staticmethod
+    def _normalizar_modo(img: Image.Image) -> Image.Image:
+        """Paletas e tons de cinza viram RGB(A) para o filtro LANCZOS valer"""
+        if img.mode in ('RGB', 'RGBA'):
+            return img
+        return img.convert('RGBA' if 'transparency' in img.info or 'A' in img.mode else 'RGB')
     
     def _crop_to_size(self, img: Image.Image, target_width: int, target_height: int) -> Image.Image:
-        """Redimensiona e cropa imagem para tamanho exato mantendo proporção"""
+        """
+        Redimensiona e cropa imagem para tamanho exato mantendo proporção
+        
+        O recorte central é passado como box ao resize, então só os pixels que
+        ficam na imagem final são reamostrados; fontes muito maiores que o
+        destino são antes reduzidas por um fator inteiro (reducing_gap).
+        """
         img_ratio = img.width / img.height
         target_ratio = target_width / target_height
         
         if img_ratio > target_ratio:
-            # Imagem mais larga - ajustar pela altura
-            new_height = target_height
-            new_width = int(new_height * img_ratio)
+            # Imagem mais larga - cortar as laterais
+            largura_box = img.height * target_ratio
+            left = (img.width - largura_box) / 2
+            box = (left, 0, left + largura_box, img.height)
         else:
-            # Imagem mais alta - ajustar pela largura
-            new_width = target_width
-            new_height = int(new_width / img_ratio)
-        
-        # Redimensionar
-        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # Imagem mais alta - cortar em cima e embaixo
+            altura_box = img.width / target_ratio
+            top = (img.height - altura_box) / 2
+            box = (0, top, img.width, top + altura_box)
         
-        # Crop central para tamanho exato
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        
-        return img_resized.crop((left, top, right, bottom))
+        return img.resize((target_width, target_height), Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
     
     def _gerar_com_ai(self, titulo: str, descricao: str, api_key: str) -> str:
         """
@@ -413,7 +610,7 @@ Context: {descricao if descricao else palavra_chave}"""
             "height": self.altura
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = self.http.post(url, json=payload, headers=headers, timeout=timeout(30))
         
         if response.status_code == 200:
             data = response.json()
@@ -427,17 +624,10 @@ Context: {descricao if descricao else palavra_chave}"""
     
     def _baixar_imagem(self, url: str, titulo: str) -> str:
         """Baixa imagem de uma URL"""
-        response = requests.get(url, timeout=30)
+        response = self.http.get(url, timeout=timeout(30))
         
         if response.status_code == 200:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self._sanitizar_nome(titulo)}_{timestamp}.png"
-            filepath = self.output_dir / filename
-            
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
-            return str(filepath)
+            return self._salvar_bytes(response.content, titulo)
         
         raise Exception(f"Erro ao baixar imagem: {response.status_code}")
     
@@ -447,44 +637,34 @@ Context: {descricao if descricao else palavra_chave}"""
         Cria uma imagem profissional com gradiente e texto
         """
         
-        # Criar imagem com gradiente
-        img = Image.new('RGB', (self.largura, self.altura), color='white')
-        draw = ImageDraw.Draw(img)
+        origem, em_cache = self._buscar_cache("texto", "gradiente", f"{titulo}|{descricao}")
+        if em_cache:
+            return em_cache
         
-        # Criar gradiente
-        for i in range(self.altura):
-            # Gradiente azul profissional
-            r = int(25 + (i / self.altura) * 30)
-            g = int(100 + (i / self.altura) * 50)
-            b = int(200 + (i / self.altura) * 55)
-            draw.rectangle([(0, i), (self.largura, i+1)], fill=(r, g, b))
+        # Partir do fundo pronto (gradiente + borda), criado uma vez por tamanho
+        img = _template_gradiente(self.largura, self.altura, *self.PALETA_TEXTO).copy()
         
-        # Tentar carregar fonte (ou usar padrão)
-        try:
-            # Usar fonte do sistema
-            fonte_titulo = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 70)
-            fonte_desc = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 30)
-        except:
-            fonte_titulo = ImageFont.load_default()
-            fonte_desc = ImageFont.load_default()
-        
-        # Quebrar título em linhas
-        palavras_titulo = titulo.split()
+        # Quebrar título em linhas (larguras das palavras em cache)
+        largura_espaco = _largura_texto(self.fonte_path, 70, ' ')
+        largura_max = self.largura - 100
         linhas_titulo = []
         linha_atual = []
+        largura_atual = 0
         
-        for palavra in palavras_titulo:
-            linha_teste = ' '.join(linha_atual + [palavra])
-            bbox = draw.textbbox((0, 0), linha_teste, font=fonte_titulo)
-            if bbox[2] - bbox[0] < self.largura - 100:
+        for palavra in titulo.split():
+            largura_palavra = _largura_texto(self.fonte_path, 70, palavra)
+            largura_teste = largura_atual + (largura_espaco if linha_atual else 0) + largura_palavra
+            
+            if largura_teste < largura_max or not linha_atual:
                 linha_atual.append(palavra)
+                largura_atual = largura_teste
             else:
-                if linha_atual:
-                    linhas_titulo.append(' '.join(linha_atual))
+                linhas_titulo.append((linha_atual, largura_atual))
                 linha_atual = [palavra]
+                largura_atual = largura_palavra
         
         if linha_atual:
-            linhas_titulo.append(' '.join(linha_atual))
+            linhas_titulo.append((linha_atual, largura_atual))
         
         # Limitar a 3 linhas
         linhas_titulo = linhas_titulo[:3]
@@ -495,33 +675,90 @@ Context: {descricao if descricao else palavra_chave}"""
         
         # Desenhar título
         y_pos = y_inicial
-        for linha in linhas_titulo:
-            bbox = draw.textbbox((0, 0), linha, font=fonte_titulo)
-            largura_texto = bbox[2] - bbox[0]
-            x_pos = (self.largura - largura_texto) // 2
+        for palavras, largura_texto in linhas_titulo:
+            x_pos = (self.largura - largura_texto) / 2
+            
+            # Colar as palavras já rasterizadas: sombra do texto e texto principal
+            for palavra in palavras:
+                mascara = _mascara_palavra(self.fonte_path, 70, palavra)
+                img.paste((0, 0, 0), (int(x_pos) + 3, y_pos + 3), mascara)
+                img.paste((255, 255, 255), (int(x_pos), y_pos), mascara)
+                x_pos += _largura_texto(self.fonte_path, 70, palavra) + largura_espaco
             
-            # Sombra do texto
-            draw.text((x_pos + 3, y_pos + 3), linha, font=fonte_titulo, fill=(0, 0, 0, 128))
-            # Texto principal
-            draw.text((x_pos, y_pos), linha, font=fonte_titulo, fill='white')
             y_pos += 80
         
-        # Adicionar borda decorativa
-        draw.rectangle([(50, 50), (self.largura-50, self.altura-50)], outline='white', width=5)
-        
         # Salvar imagem
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self._sanitizar_nome(titulo)}_{timestamp}.png"
-        filepath = self.output_dir / filename
+        return self._salvar_imagem(img, titulo, origem)
+    
+    def _buscar_cache(self, provedor: str, modelo: str, prompt: str):
+        """
+        Procura no cache a imagem deste prompt
         
-        img.save(filepath, 'PNG', quality=95)
+        Returns:
+            tuple (origem para salvar no cache depois, caminho da imagem em cache ou None)
+        """
+        if not self.cache:
+            return None, None
+        
+        origem = {
+            "chave": CacheImagens.chave(
+                provedor, modelo, prompt, f"{self.largura}x{self.altura}/{self.codificador.assinatura()}"
+            ),
+            "provedor": provedor,
+            "modelo": modelo
+        }
+        caminho = self.cache.obter(origem["chave"])
+        if caminho:
+            print(f"♻️ Imagem em cache ({provedor})")
+        return origem, caminho
+    
+    def _salvar_imagem(self, img: Image.Image, titulo: str, origem: dict = None) -> str:
+        """Codifica a imagem no formato de saída uma única vez e a salva"""
+        dados = self.codificador.codificar(img)
+        return self._salvar_bytes(dados, titulo, origem, self.codificador.extensao)
+    
+    def _salvar_bytes(self, dados: bytes, titulo: str, origem: dict = None, extensao: str = ".png") -> str:
+        """
+        Grava os bytes da imagem (no cache, se houver origem) e os mantém em memória para o upload
+        
+        Com salvar_em_disco desligado, nada é gravado: o caminho retornado só
+        identifica a imagem em obter_bytes.
+        """
+        if not self.salvar_em_disco:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            filepath = self.output_dir / f"{self._sanitizar_nome(titulo)}_{timestamp}{extensao}"
+        elif self.cache and origem:
+            filepath = self.cache.salvar(
+                origem["chave"], dados, origem["provedor"], origem["modelo"],
+                nome=self._sanitizar_nome(titulo), extensao=extensao
+            )
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{self._sanitizar_nome(titulo)}_{timestamp}{extensao}"
+            filepath = self.output_dir / filename
+            
+            with open(filepath, 'wb') as f:
+                f.write(dados)
+        
+        self._em_memoria[str(filepath)] = dados
+        while len(self._em_memoria) > 8:
+            self._em_memoria.popitem(last=False)
         
         return str(filepath)
     
+    def obter_bytes(self, caminho: str):
+        """
+        Bytes de uma imagem gerada por esta instância, sem ler o disco
+        
+        Returns:
+            bytes, ou None se a imagem não estiver mais em memória
+        """
+        return self._em_memoria.get(str(caminho))
+    
     def redimensionar_imagem(self, caminho_imagem: str) -> str:
         """Redimensiona uma imagem existente para 1200x630"""
-        img = Image.open(caminho_imagem)
-        img_redimensionada = img.resize((self.largura, self.altura), Image.Resampling.LANCZOS)
+        img = self._abrir(caminho_imagem)
+        img_redimensionada = img.resize((self.largura, self.altura), Image.Resampling.LANCZOS, reducing_gap=3.0)
         
         # Salvar com novo nome
         path = Path(caminho_imagem)
@@ -530,6 +767,97 @@ Context: {descricao if descricao else palavra_chave}"""
         
         return str(novo_caminho)
     
+    @staticmethod
+    def rendicoes_configuradas() -> dict:
+        """
+        Rendições padrão (IMAGEM_RENDICOES, ex.: "og=1200x630,quadrada=1080x1080")
+        
+        Returns:
+            dict nome → (largura, altura)
+        """
+        configuradas = os.getenv("IMAGEM_RENDICOES")
+        if not configuradas:
+            return dict(RENDICOES_PADRAO)
+        
+        rendicoes = {}
+        for item in configuradas.split(','):
+            nome, _, tamanho = item.strip().partition('=')
+            largura, _, altura = tamanho.lower().partition('x')
+            try:
+                rendicoes[nome.strip()] = (int(largura), int(altura))
+            except ValueError:
+                print(f"⚠️ Rendição inválida em IMAGEM_RENDICOES: {item}")
+        return rendicoes or dict(RENDICOES_PADRAO)
+    
+    def gerar_rendicoes(self, imagem, rendicoes: dict = None, salvar: bool = True) -> dict:
+        """
+        Gera todas as rendições de uma imagem com uma única decodificação
+        
+        As rendições são feitas da maior para a menor. Cada uma parte de uma
+        versão da fonte reduzida por um fator inteiro (reduce), compartilhada
+        entre as rendições que precisam do mesmo fator e derivada da anterior
+        quando possível; só o ajuste final usa LANCZOS. As codificações rodam
+        em paralelo no pool do codificador.
+        
+        Args:
+            imagem: Caminho, bytes ou Image do Pillow
+            rendicoes: dict nome → (largura, altura) (padrão: rendicoes_configuradas())
+            salvar: Se True, grava cada rendição em output_dir (nunca no cache, que só
+                    conhece e limpa os arquivos que ele mesmo indexou)
+        
+        Returns:
+            dict nome → {largura, altura, bytes, mimetype, buffer (BytesIO), caminho (ou None)}
+        """
+        rendicoes = rendicoes or self.rendicoes_configuradas()
+        maior = (max(l for l, _ in rendicoes.values()), max(a for _, a in rendicoes.values()))
+        
+        if isinstance(imagem, Image.Image):
+            fonte, prefixo = imagem, None
+        else:
+            prefixo = Path(imagem) if isinstance(imagem, (str, Path)) else None
+            fonte = self._abrir(BytesIO(imagem) if isinstance(imagem, (bytes, bytearray)) else imagem, maior)
+            fonte.load()
+        
+        # fator de redução inteiro → imagem reduzida (1 = a fonte decodificada)
+        reduzidas = {1: fonte}
+        codificacoes = {}
+        
+        for nome, (largura, altura) in sorted(rendicoes.items(), key=lambda r: -r[1][0] * r[1][1]):
+            # Escala que cobre a rendição; a redução inteira deixa folga de 3x para o LANCZOS
+            escala = max(largura / fonte.width, altura / fonte.height)
+            fator = max(1, int(1 / (escala * 3.0)))
+            
+            if fator not in reduzidas:
+                base = max(f for f in reduzidas if fator % f == 0)
+                reduzidas[fator] = reduzidas[base].reduce(fator // base)
+            
+            img = self._crop_to_size(reduzidas[fator], largura, altura)
+            codificacoes[nome] = (largura, altura, self.codificador.codificar_async(img))
+        
+        destino = self.output_dir
+        stem = prefixo.stem if prefixo else f"imagem_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        manifesto = {}
+        for nome, (largura, altura, futuro) in codificacoes.items():
+            dados = futuro.result()
+            caminho = None
+            
+            if salvar:
+                caminho = destino / f"{stem}_{nome}_{largura}x{altura}{self.codificador.extensao}"
+                with open(caminho, 'wb') as f:
+                    f.write(dados)
+            
+            manifesto[nome] = {
+                "largura": largura,
+                "altura": altura,
+                "bytes": len(dados),
+                "mimetype": self.codificador.mimetype,
+                "buffer": BytesIO(dados),
+                "caminho": str(caminho) if caminho else None
+            }
+        
+        return manifesto
+    
     def _sanitizar_nome(self, nome: str) -> str:
         """Remove caracteres especiais do nome do arquivo"""
         import re
@@ -0,0 +1,132 @@
+"""
+Parser Incremental de Seções
+Interpreta a resposta do Agente Redator (TITULO:, META_DESCRIPTION:, CONTEUDO:, ...)
+à medida que os trechos chegam do streaming, mesmo quando um marcador
+fica dividido entre dois trechos
+"""
+
+from typing import Dict, List
+
+# Marcador → chave no resultado
+MARCADORES = {
+    'TITULO:': 'titulo',
+    'META_DESCRIPTION:': 'meta_description',
+    'RESUMO:': 'resumo',
+    'CONTEUDO:': 'conteudo',
+    'PALAVRAS_CHAVE_SECUNDARIAS:': 'palavras_chave_secundarias',
+    'ALT_TEXT_IMAGEM:': 'alt_text_imagem',
+}
+
+
+class ParserSecoesIncremental:
+    """
+    Recebe o texto em trechos (alimentar) e devolve eventos:
+
+    - {"tipo": "secao", "secao": "titulo", "valor": "..."} quando uma seção de
+      linha única termina (titulo, meta_description, resumo, palavras_chave_secundarias,
+      alt_text_imagem)
+    - {"tipo": "conteudo", "texto": "..."} com cada novo pedaço do corpo do artigo;
+      concatenados, os pedaços formam exatamente resultado()["conteudo"]
+    """
+
+    def __init__(self):
+        self._bruto: List[str] = []
+        self._linha = ""
+        self._emitido_da_linha = 0
+        self._capturando_conteudo = False
+        self._linhas_conteudo = 0
+        self._conteudo: List[str] = []
+        self._secoes: Dict = {}
+
+    def alimentar(self, trecho: str) -> List[Dict]:
+        """Processa um novo trecho de texto e retorna os eventos gerados"""
+        eventos = []
+        if not trecho:
+            return eventos
+
+        self._bruto.append(trecho)
+        partes = (self._linha + trecho).split('\n')
+        self._linha = partes.pop()
+
+        for linha in partes:
+            eventos.extend(self._processar_linha(linha))
+            self._emitido_da_linha = 0
+
+        # Corpo do artigo: emitir a linha parcial assim que ela não puder mais ser um marcador
+        if self._capturando_conteudo and self._linha and not self._pode_ser_marcador(self._linha):
+            eventos.extend(self._emitir_conteudo(self._linha))
+
+        return eventos
+
+    def finalizar(self) -> List[Dict]:
+        """Processa o que sobrou no buffer ao fim do streaming"""
+        # Como em str.split('\n'), o texto após a última quebra de linha
+        # (mesmo vazio) conta como uma linha
+        eventos = []
+        if self._bruto:
+            eventos.extend(self._processar_linha(self._linha))
+        self._linha = ""
+        self._emitido_da_linha = 0
+        return eventos
+
+    def texto_bruto(self) -> str:
+        """Retorna todo o texto recebido até agora"""
+        return ''.join(self._bruto)
+
+    def resultado(self) -> Dict:
+        """Retorna as seções no mesmo formato de AgenteRedator._parsear_conteudo"""
+        resultado = dict(self._secoes)
+        if self._linhas_conteudo:
+            resultado['conteudo'] = ''.join(self._conteudo)
+        else:
+            resultado['conteudo'] = self.texto_bruto()
+        return resultado
+
+    @staticmethod
+    def _pode_ser_marcador(linha: str) -> bool:
+        """True se a linha (ainda incompleta) pode ser ou virar uma linha de marcador"""
+        return any(m.startswith(linha) or linha.startswith(m) for m in MARCADORES)
+
+    def _marcador_da_linha(self, linha: str):
+        for marcador in MARCADORES:
+            if linha.startswith(marcador):
+                return marcador
+        return None
+
+    def _emitir_conteudo(self, linha: str) -> List[Dict]:
+        """Emite a parte ainda não enviada de uma linha do corpo"""
+        if self._emitido_da_linha == 0:
+            texto = ('\n' if self._linhas_conteudo else '') + linha
+            self._linhas_conteudo += 1
+        else:
+            texto = linha[self._emitido_da_linha:]
+
+        self._emitido_da_linha = len(linha)
+        if not texto:
+            return []
+
+        self._conteudo.append(texto)
+        return [{"tipo": "conteudo", "texto": texto}]
+
+    def _processar_linha(self, linha: str) -> List[Dict]:
+        """Processa uma linha completa"""
+        marcador = self._marcador_da_linha(linha)
+
+        if marcador is None:
+            if self._capturando_conteudo:
+                return self._emitir_conteudo(linha)
+            return []
+
+        secao = MARCADORES[marcador]
+        valor = linha.replace(marcador, '').strip()
+
+        if secao == 'conteudo':
+            self._capturando_conteudo = True
+            return []
+
+        if secao == 'palavras_chave_secundarias':
+            self._capturando_conteudo = False
+            valor = [p.strip() for p in valor.split(',')]
+
+        self._secoes[secao] = valor
+        return [{"tipo": "secao", "secao": secao, "valor": valor}]
@@ -0,0 +1,88 @@
+"""
+Registro de Agentes
+Mantém uma única instância de cada agente por processo, reaproveitando o
+cliente OpenAI, as ferramentas Tavily e as conexões HTTP já abertas entre
+sessões do Streamlit e execuções em lote
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Adicionar o diretório pai ao path para importar config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.instrucoes_globais import get_instrucoes_globais
+from agents.agente_pesquisador import AgentePesquisador
+from agents.agente_redator import AgenteRedator
+
+_lock = threading.Lock()
+_agentes: Dict[Tuple, object] = {}
+
+
+def _impressao_digital(texto: str) -> str:
+    """Hash curto usado na chave do registro (nunca guarda o texto original)"""
+    return hashlib.sha256((texto or "").encode('utf-8')).hexdigest()[:16]
+
+
+def _chave(classe, modelo_id: str) -> Tuple:
+    """
+    Chave do registro: classe, modelo, instruções globais e API key
+
+    Se as instruções ou a OPENAI_API_KEY mudarem (ex.: novos secrets no Streamlit
+    Cloud), a chave muda e o agente é recriado automaticamente.
+    """
+    return (
+        classe.__name__,
+        modelo_id or classe.MODELO_PADRAO,
+        _impressao_digital(get_instrucoes_globais()),
+        _impressao_digital(os.getenv("OPENAI_API_KEY"))
+    )
+
+
+def obter_agente(classe, modelo_id: str = None):
+    """
+    Retorna a instância compartilhada de um agente, criando-a na primeira chamada
+
+    Args:
+        classe: AgentePesquisador ou AgenteRedator
+        modelo_id: Modelo da OpenAI (padrão: MODELO_PADRAO da classe)
+
+    Returns:
+        Instância do agente (thread-safe para uso simultâneo)
+    """
+    chave = _chave(classe, modelo_id)
+
+    agente = _agentes.get(chave)
+    if agente is not None:
+        return agente
+
+    with _lock:
+        agente = _agentes.get(chave)
+        if agente is None:
+            # Remover versões antigas da mesma classe (configuração mudou)
+            for antiga in [c for c in _agentes if c[0] == chave[0] and c[1] == chave[1]]:
+                del _agentes[antiga]
+
+            agente = classe(modelo_id=modelo_id) if modelo_id else classe()
+            _agentes[chave] = agente
+
+    return agente
+
+
+def obter_agente_pesquisador(modelo_id: str = None) -> AgentePesquisador:
+    """Retorna o AgentePesquisador compartilhado do processo"""
+    return obter_agente(AgentePesquisador, modelo_id)
+
+
+def obter_agente_redator(modelo_id: str = None) -> AgenteRedator:
+    """Retorna o AgenteRedator compartilhado do processo"""
+    return obter_agente(AgenteRedator, modelo_id)
+
+
+def invalidar_registro():
+    """Descarta todos os agentes; os próximos pedidos criam instâncias novas"""
+    with _lock:
+        _agentes.clear()
@@ -5,6 +5,7 @@ Automatiza a criação de conteúdo otimizado para SEO com imagens e publicaçã
 
 import streamlit as st
 import os
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -33,10 +34,11 @@ os.environ["SUPABASE_KEY"] = get_api_key("SUPABASE_KEY") or ""
 
 # AGORA SIM podemos importar os módulos customizados
 from memoria.gerenciador_memoria import GerenciadorMemoria
-from agents.agente_pesquisador import AgentePesquisador
-from agents.agente_redator import AgenteRedator
+from agents.registro_agentes import obter_agente_pesquisador, obter_agente_redator
 from agents.gerador_imagem import GeradorImagem
 from utils.google_docs_handler import GoogleDocsHandler
+from utils.saude_provedores import obter_saude
+from pipeline.pipeline_artigo import gerar_artigo
 
 # Configuração da página
 st.set_page_config(
@@ -189,6 +191,45 @@ def main():
                     st.error(f"❌ {api_name}")
                     if api_name == "OPENAI_API_KEY":
                         st.caption("⚠️ Verifique se a chave foi configurada corretamente em Settings → Secrets")
+            
+            sincronizacao = gerenciador.metricas_sincronizacao()
+            if sincronizacao:
+                if sincronizacao["pendentes"]:
+                    st.warning(
+                        f"🔄 Supabase: {sincronizacao['pendentes']} alterações pendentes "
+                        f"(atraso {sincronizacao['atraso_s']}s)"
+                    )
+                else:
+                    st.success("✅ Supabase sincronizado")
+                if sincronizacao["falhas"]:
+                    st.error(f"❌ {sincronizacao['falhas']} alterações não sincronizadas")
+                    st.caption(sincronizacao.get("ultimo_erro") or "")
+            
+            provedores = obter_saude().metricas()
+            for provedor, saude in provedores["provedores"].items():
+                latencia = f", {saude['latencia_media_s']}s" if saude["latencia_media_s"] is not None else ""
+                if saude["estado"] == "fechado":
+                    st.success(f"✅ Imagens {provedor}: erro {saude['taxa_erro']:.0%}{latencia}")
+                else:
+                    st.warning(
+                        f"⛔ Imagens {provedor}: disjuntor {saude['estado'].replace('_', '-')}"
+                        f" (novo teste em {saude['reteste_em_s'] or 0:.0f}s)"
+                    )
+                    st.caption(saude.get("ultimo_erro") or "")
+            if provedores["ultimo_provedor"]:
+                st.caption(f"🎨 Última imagem: {provedores['ultimo_provedor']}")
+            
+            if gerenciador.sincronizador:
+                if st.button("🔄 Sincronizar com Supabase", use_container_width=True):
+                    resultado = gerenciador.sincronizar()
+                    if resultado["status"] == "ok":
+                        st.success(
+                            f"{resultado['projetos']} projetos e {resultado['categorias']} categorias atualizados"
+                        )
+                    elif resultado["status"] == "adiado":
+                        st.info("Aguardando o envio das alterações locais")
+                    else:
+                        st.warning("Supabase indisponível - usando dados locais")
         
         st.markdown("---")
         
@@ -315,13 +356,144 @@ def main():
                     status_container = st.container()
                     
                     with status_container:
-                        # PASSO 1: Pesquisa
-                        with st.spinner("🔍 Pesquisando informações sobre a palavra-chave..."):
-                            pesquisador = AgentePesquisador()
-                            pesquisa_resultado = pesquisador.pesquisar(palavra_chave)
-                            st.session_state.pesquisa_realizada = pesquisa_resultado
-                            st.success("✅ Pesquisa concluída!")
+                        mensagens_etapas = {
+                            "pesquisa": "✅ Pesquisa concluída!",
+                            "redacao": "✅ Conteúdo gerado!",
+                            "imagem": "✅ Imagem gerada!",
+                            "upload_imagem": "✅ Imagem enviada ao Google Drive!"
+                        }
+                        
+                        # Pesquisa → Redação rodam em paralelo com Imagem → Upload
+                        with st.status("🚀 Pesquisando, redigindo e gerando a imagem...", expanded=True) as status:
+                            # Artigo aparece progressivamente enquanto o redator escreve
+                            titulo_placeholder = st.empty()
+                            corpo_placeholder = st.empty()
+                            exibicao = {"texto": "", "ultima_atualizacao": 0.0}
+                            
+                            def ao_receber_evento(evento):
+                                if evento["tipo"] == "secao" and evento["secao"] == "titulo":
+                                    titulo_placeholder.subheader(evento["valor"])
+                                elif evento["tipo"] == "conteudo":
+                                    exibicao["texto"] += evento["texto"]
+                                    # Limitar a ~10 atualizações por segundo
+                                    if time.monotonic() - exibicao["ultima_atualizacao"] > 0.1:
+                                        corpo_placeholder.markdown(exibicao["texto"] + "▌")
+                                        exibicao["ultima_atualizacao"] = time.monotonic()
+                            
+                            try:
+                                artigo = gerar_artigo(
+                                    projeto=projeto,
+                                    categoria=categoria,
+                                    palavra_chave=palavra_chave,
+                                    pesquisador=obter_agente_pesquisador(),
+                                    redator=obter_agente_redator(),
+                                    gerador_imagem=GeradorImagem(),
+                                    gerenciador=gerenciador,
+                                    docs_handler=obter_docs_handler(),
+                                    publicar=False,
+                                    ao_concluir_etapa=lambda etapa, _: st.write(
+                                        mensagens_etapas.get(etapa, f"✅ {etapa}")
+                                    ),
+                                    ao_receber_evento=ao_receber_evento
+                                )
+                                status.update(label="✅ Conteúdo completo gerado!", state="complete")
+                            except Exception as e:
+                                artigo = None
+                                status.update(label="❌ Erro na geração", state="error")
+                                st.error(f"Erro ao gerar conteúdo: {e}")
+                            
+                            # O artigo completo é exibido na Etapa 4
+                            titulo_placeholder.empty()
+                            corpo_placeholder.empty()
                         
-                        # PASSO 2: Geração de Conteúdo
-                        with st.spinner("✍️ Gerando conteúdo otimizado para SEO..."):
-                            redator = Agente
\ No newline at end of file
+                        if artigo:
+                            st.session_state.pesquisa_realizada = artigo["pesquisa"]
+                            st.session_state.conteudo_gerado = artigo["conteudo"]
+                            st.session_state.imagem_gerada = artigo["imagem_path"]
+                            st.session_state.imagem_url = artigo["imagem_url"]
+                            st.session_state.documento_url = None
+    
+    # ETAPA 4: Revisão e Publicação
+    if st.session_state.get('conteudo_gerado'):
+        exibir_resultado()
+
+def obter_docs_handler():
+    """Retorna o GoogleDocsHandler da sessão, ou None se o Google não estiver configurado"""
+    if st.session_state.get('docs_handler') is None:
+        try:
+            st.session_state.docs_handler = GoogleDocsHandler()
+        except Exception as e:
+            print(f"⚠️ Google Docs indisponível: {e}")
+            return None
+    return st.session_state.docs_handler
+
+def exibir_resultado():
+    """Exibe o conteúdo gerado e as opções de publicação"""
+    conteudo = st.session_state.conteudo_gerado
+    
+    st.markdown("---")
+    st.markdown('<div class="step-header">📝 Etapa 4: Revisão e Publicação</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.subheader(conteudo.get("titulo", ""))
+        st.caption(conteudo.get("meta_description", ""))
+    
+    with col2:
+        estatisticas = conteudo.get("estatisticas", {})
+        if estatisticas:
+            st.metric("Palavras", estatisticas.get("total_palavras", 0))
+            st.metric("Leitura (min)", estatisticas.get("tempo_leitura_min", 0))
+    
+    imagem_path = st.session_state.get('imagem_gerada')
+    if imagem_path and Path(imagem_path).exists():
+        st.image(imagem_path, caption=conteudo.get("alt_text_imagem", ""))
+    
+    tab_visualizacao, tab_markdown, tab_pesquisa = st.tabs(["👁️ Visualização", "📝 Markdown", "🔍 Pesquisa"])
+    
+    with tab_visualizacao:
+        st.markdown(conteudo.get("conteudo_formatado", ""))
+    
+    with tab_markdown:
+        conteudo_editado = st.text_area(
+            "Edite o conteúdo se necessário:",
+            value=conteudo.get("conteudo_formatado", ""),
+            height=400,
+            key="conteudo_editado"
+        )
+    
+    with tab_pesquisa:
+        pesquisa = st.session_state.get('pesquisa_realizada') or {}
+        st.markdown(pesquisa.get("conteudo", ""))
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("📄 Salvar no Google Docs", type="primary", use_container_width=True):
+            docs_handler = obter_docs_handler()
+            if docs_handler is None:
+                st.error("Google Docs não configurado. Veja GOOGLE_API_SETUP.md")
+            else:
+                with st.spinner("📄 Publicando no Google Docs..."):
+                    st.session_state.documento_url = docs_handler.criar_documento(
+                        titulo=conteudo.get("titulo", ""),
+                        conteudo=conteudo_editado,
+                        imagem_path=imagem_path,
+                        imagem_url=st.session_state.get('imagem_url')
+                    )
+    
+    with col2:
+        st.download_button(
+            "⬇️ Baixar Markdown",
+            data=conteudo_editado,
+            file_name=f"{conteudo.get('palavra_chave', 'artigo')}.md",
+            mime="text/markdown",
+            use_container_width=True
+        )
+    
+    if st.session_state.get('documento_url'):
+        st.success(f"✅ Documento criado: {st.session_state.documento_url}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Geração em Lote - Redator Automático com IA
+Gera artigos para uma lista de palavras-chave sem a interface do Streamlit
+
+Uso:
+    python gerar_lote.py palavras.csv --workers 4
+    python gerar_lote.py palavras.jsonl --sem-publicar --saida resultados.jsonl
+
+O arquivo de entrada (CSV ou JSONL) precisa das colunas: projeto, categoria, palavra_chave
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente ANTES de importar os agentes
+load_dotenv()
+
+from pipeline.executor_lote import ExecutorLote, carregar_palavras_chave
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gera artigos em lote a partir de um CSV/JSONL")
+    parser.add_argument("arquivo", help="Arquivo .csv ou .jsonl com projeto, categoria, palavra_chave")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("LOTE_WORKERS", "4")),
+        help="Número de artigos gerados em paralelo (padrão: LOTE_WORKERS ou 4)"
+    )
+    parser.add_argument("--sem-publicar", action="store_true", help="Não publica no Google Docs")
+    parser.add_argument("--sem-historico", action="store_true", help="Não salva no histórico")
+    parser.add_argument("--saida", help="Arquivo .jsonl para gravar o resultado de cada linha")
+    args = parser.parse_args()
+
+    try:
+        linhas = carregar_palavras_chave(args.arquivo)
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro ao carregar {args.arquivo}: {e}")
+        return 2
+
+    if not linhas:
+        print("⚠️ Nenhuma palavra-chave encontrada no arquivo")
+        return 0
+
+    executor = ExecutorLote(
+        workers=args.workers,
+        publicar=not args.sem_publicar,
+        salvar_historico=not args.sem_historico
+    )
+    resumo = executor.executar(linhas)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            for resultado in resumo["resultados"]:
+                f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    print("\n📊 Resumo do lote")
+    print(f"   Total: {resumo['total']}")
+    print(f"   Sucesso: {resumo['sucesso']}")
+    print(f"   Erros: {resumo['erros']}")
+    print(f"   Duração: {resumo['duracao_total_s']}s com {resumo['workers']} workers")
+    print(f"   Throughput: {resumo['artigos_por_hora']} artigos/hora")
+
+    return 1 if resumo["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
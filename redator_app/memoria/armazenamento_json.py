@@ -0,0 +1,185 @@
+"""
+Armazenamento JSON
+Backend local original do GerenciadorMemoria: todos os projetos e categorias
+em um único arquivo projetos.json
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Cache em memória do projetos.json, compartilhado entre instâncias (o Streamlit
+# cria um GerenciadorMemoria novo a cada rerun). Chave: caminho do arquivo;
+# valor: (assinatura (mtime_ns, tamanho), dados já parseados)
+_cache_dados: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+_lock_dados = threading.RLock()
+
+
+class ArmazenamentoJSON:
+    """Guarda projetos e categorias em um arquivo JSON"""
+
+    def __init__(self, projetos_file: Path):
+        self.projetos_file = Path(projetos_file)
+        self.projetos_file.parent.mkdir(parents=True, exist_ok=True)
+
+        if not self.projetos_file.exists():
+            self._salvar_dados({"projetos": {}})
+
+    def _assinatura_arquivo(self) -> Optional[Tuple[int, int]]:
+        """Retorna (mtime_ns, tamanho) do arquivo de dados, ou None se não existir"""
+        try:
+            stat = os.stat(self.projetos_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _carregar_dados(self) -> Dict:
+        """
+        Carrega os dados da memória
+
+        O JSON só é lido e parseado de novo quando o arquivo muda (mtime/tamanho);
+        nas demais chamadas os dados vêm do cache do processo. O dict retornado é
+        compartilhado: só altere-o dentro de _lock_dados e salve com _salvar_dados.
+        """
+        chave = str(self.projetos_file)
+        assinatura = self._assinatura_arquivo()
+
+        with _lock_dados:
+            em_cache = _cache_dados.get(chave)
+            if em_cache and assinatura is not None and em_cache[0] == assinatura:
+                return em_cache[1]
+
+            try:
+                with open(self.projetos_file, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            except Exception as e:
+                print(f"Erro ao carregar dados: {e}")
+                return {"projetos": {}}
+
+            if assinatura is not None:
+                _cache_dados[chave] = (assinatura, dados)
+            return dados
+
+    def _salvar_dados(self, dados: Dict):
+        """Salva os dados na memória (e atualiza o cache - write-through)"""
+        chave = str(self.projetos_file)
+
+        with _lock_dados:
+            try:
+                # Escrever em arquivo temporário e trocar, para leitores nunca verem JSON pela metade
+                temporario = self.projetos_file.with_suffix('.json.tmp')
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False, indent=2)
+                os.replace(temporario, self.projetos_file)
+
+                assinatura = self._assinatura_arquivo()
+                if assinatura is not None:
+                    _cache_dados[chave] = (assinatura, dados)
+            except Exception as e:
+                _cache_dados.pop(chave, None)
+                print(f"Erro ao salvar dados: {e}")
+
+    def exportar(self) -> Dict:
+        """Retorna todos os dados no formato do projetos.json"""
+        return self._carregar_dados()
+
+    # ==================== PROJETOS ====================
+
+    def criar_projeto(self, nome: str, descricao: str = "") -> bool:
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            if nome not in dados["projetos"]:
+                dados["projetos"][nome] = {
+                    "descricao": descricao,
+                    "categorias": {}
+                }
+                self._salvar_dados(dados)
+                return True
+            return False
+
+    def salvar_projeto(self, nome: str, descricao: str = "") -> bool:
+        """Cria o projeto ou atualiza sua descrição"""
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            projeto = dados["projetos"].setdefault(nome, {"descricao": "", "categorias": {}})
+            projeto["descricao"] = descricao
+            self._salvar_dados(dados)
+            return True
+
+    def listar_projetos(self) -> List[str]:
+        return list(self._carregar_dados()["projetos"].keys())
+
+    def deletar_projeto(self, projeto: str) -> bool:
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            if projeto in dados["projetos"]:
+                del dados["projetos"][projeto]
+                self._salvar_dados(dados)
+                return True
+            return False
+
+    # ==================== CATEGORIAS ====================
+
+    def adicionar_categoria(self, projeto: str, categoria: str, exemplo: str = "", regras: str = "") -> bool:
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            if projeto in dados["projetos"]:
+                dados["projetos"][projeto]["categorias"][categoria] = {
+                    "exemplo": exemplo,
+                    "regras": regras
+                }
+                self._salvar_dados(dados)
+                return True
+            return False
+
+    def listar_categorias(self, projeto: str) -> List[str]:
+        dados = self._carregar_dados()
+
+        if projeto in dados["projetos"]:
+            return list(dados["projetos"][projeto]["categorias"].keys())
+        return []
+
+    def obter_categoria(self, projeto: str, categoria: str) -> Optional[Dict]:
+        dados = self._carregar_dados()
+
+        if projeto in dados["projetos"]:
+            if categoria in dados["projetos"][projeto]["categorias"]:
+                return dict(dados["projetos"][projeto]["categorias"][categoria])
+        return None
+
+    def atualizar_categoria(
+        self,
+        projeto: str,
+        categoria: str,
+        exemplo: Optional[str] = None,
+        regras: Optional[str] = None
+    ) -> bool:
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            if projeto in dados["projetos"] and categoria in dados["projetos"][projeto]["categorias"]:
+                if exemplo is not None:
+                    dados["projetos"][projeto]["categorias"][categoria]["exemplo"] = exemplo
+                if regras is not None:
+                    dados["projetos"][projeto]["categorias"][categoria]["regras"] = regras
+
+                self._salvar_dados(dados)
+                return True
+            return False
+
+    def deletar_categoria(self, projeto: str, categoria: str) -> bool:
+        with _lock_dados:
+            dados = self._carregar_dados()
+
+            if projeto in dados["projetos"]:
+                if categoria in dados["projetos"][projeto]["categorias"]:
+                    del dados["projetos"][projeto]["categorias"][categoria]
+                    self._salvar_dados(dados)
+                    return True
+            return False
@@ -0,0 +1,247 @@
+"""
+Armazenamento SQLite
+Backend local alternativo ao projetos.json: cada projeto e categoria é uma
+linha própria, então adicionar ou editar uma categoria grava só aquela linha
+(em vez de reescrever o arquivo inteiro) e várias sessões do Streamlit podem
+escrever ao mesmo tempo com segurança (WAL + transações)
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Versão do esquema (PRAGMA user_version). A migração do JSON só roda uma vez,
+# quando o banco é criado
+VERSAO_ESQUEMA = 1
+
+
+class ArmazenamentoSQLite:
+    """Guarda projetos e categorias em um banco SQLite local"""
+
+    def __init__(self, db_path: Path, importar_de: Path = None):
+        """
+        Inicializa o banco
+
+        Args:
+            db_path: Caminho do arquivo .db
+            importar_de: projetos.json a migrar na criação do banco (opcional)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        novo = self._inicializar_banco()
+
+        if novo and importar_de and Path(importar_de).exists():
+            total = self.importar_json(importar_de)
+            print(f"📦 {total} projetos migrados de {Path(importar_de).name} para SQLite")
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão por operação (seguro entre threads) e faz commit ao sair"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _inicializar_banco(self) -> bool:
+        """Cria as tabelas; retorna True se o banco acabou de ser criado"""
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            versao = conn.execute("PRAGMA user_version").fetchone()[0]
+
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS projetos (
+                    id INTEGER PRIMARY KEY,
+                    nome TEXT NOT NULL UNIQUE,
+                    descricao TEXT NOT NULL DEFAULT '',
+                    criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE TABLE IF NOT EXISTS categorias (
+                    id INTEGER PRIMARY KEY,
+                    projeto_id INTEGER NOT NULL REFERENCES projetos(id) ON DELETE CASCADE,
+                    nome TEXT NOT NULL,
+                    exemplo TEXT NOT NULL DEFAULT '',
+                    regras TEXT NOT NULL DEFAULT '',
+                    criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(projeto_id, nome)
+                );
+            """)
+
+            if versao < VERSAO_ESQUEMA:
+                conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+        return versao == 0
+
+    def importar_json(self, caminho: Path) -> int:
+        """
+        Migra um projetos.json para o banco em uma única transação
+
+        Projetos e categorias que já existirem são atualizados.
+
+        Returns:
+            int: número de projetos importados
+        """
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+
+        projetos = dados.get("projetos", {})
+
+        with self._conectar() as conn:
+            for nome, projeto in projetos.items():
+                projeto_id = self._upsert_projeto(conn, nome, projeto.get("descricao", ""))
+                for categoria, memoria in projeto.get("categorias", {}).items():
+                    self._upsert_categoria(
+                        conn, projeto_id, categoria,
+                        memoria.get("exemplo", ""), memoria.get("regras", "")
+                    )
+
+        return len(projetos)
+
+    def exportar(self) -> Dict:
+        """Retorna todos os dados no formato do projetos.json"""
+        dados = {"projetos": {}}
+
+        with self._conectar() as conn:
+            for projeto_id, nome, descricao in conn.execute(
+                "SELECT id, nome, descricao FROM projetos ORDER BY id"
+            ):
+                dados["projetos"][nome] = {"descricao": descricao, "categorias": {}}
+
+            for projeto, categoria, exemplo, regras in conn.execute("""
+                SELECT p.nome, c.nome, c.exemplo, c.regras
+                FROM categorias c JOIN projetos p ON p.id = c.projeto_id
+                ORDER BY c.id
+            """):
+                dados["projetos"][projeto]["categorias"][categoria] = {"exemplo": exemplo, "regras": regras}
+
+        return dados
+
+    def _upsert_projeto(self, conn, nome: str, descricao: str) -> int:
+        conn.execute(
+            """
+            INSERT INTO projetos (nome, descricao) VALUES (?, ?)
+            ON CONFLICT(nome) DO UPDATE SET
+                descricao = excluded.descricao,
+                atualizado_em = CURRENT_TIMESTAMP
+            """,
+            (nome, descricao or "")
+        )
+        return conn.execute("SELECT id FROM projetos WHERE nome = ?", (nome,)).fetchone()[0]
+
+    def _upsert_categoria(self, conn, projeto_id: int, nome: str, exemplo: str, regras: str):
+        conn.execute(
+            """
+            INSERT INTO categorias (projeto_id, nome, exemplo, regras) VALUES (?, ?, ?, ?)
+            ON CONFLICT(projeto_id, nome) DO UPDATE SET
+                exemplo = excluded.exemplo,
+                regras = excluded.regras,
+                atualizado_em = CURRENT_TIMESTAMP
+            """,
+            (projeto_id, nome, exemplo or "", regras or "")
+        )
+
+    def _projeto_id(self, conn, nome: str) -> Optional[int]:
+        linha = conn.execute("SELECT id FROM projetos WHERE nome = ?", (nome,)).fetchone()
+        return linha[0] if linha else None
+
+    # ==================== PROJETOS ====================
+
+    def criar_projeto(self, nome: str, descricao: str = "") -> bool:
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO projetos (nome, descricao) VALUES (?, ?)",
+                (nome, descricao or "")
+            )
+            return cursor.rowcount > 0
+
+    def salvar_projeto(self, nome: str, descricao: str = "") -> bool:
+        """Cria o projeto ou atualiza sua descrição"""
+        with self._conectar() as conn:
+            self._upsert_projeto(conn, nome, descricao)
+            return True
+
+    def listar_projetos(self) -> List[str]:
+        with self._conectar() as conn:
+            return [linha[0] for linha in conn.execute("SELECT nome FROM projetos ORDER BY id")]
+
+    def deletar_projeto(self, projeto: str) -> bool:
+        with self._conectar() as conn:
+            # Categorias são removidas pelo ON DELETE CASCADE
+            cursor = conn.execute("DELETE FROM projetos WHERE nome = ?", (projeto,))
+            return cursor.rowcount > 0
+
+    # ==================== CATEGORIAS ====================
+
+    def adicionar_categoria(self, projeto: str, categoria: str, exemplo: str = "", regras: str = "") -> bool:
+        with self._conectar() as conn:
+            projeto_id = self._projeto_id(conn, projeto)
+            if projeto_id is None:
+                return False
+
+            self._upsert_categoria(conn, projeto_id, categoria, exemplo, regras)
+            return True
+
+    def listar_categorias(self, projeto: str) -> List[str]:
+        with self._conectar() as conn:
+            return [
+                linha[0] for linha in conn.execute(
+                    """
+                    SELECT c.nome FROM categorias c
+                    JOIN projetos p ON p.id = c.projeto_id
+                    WHERE p.nome = ?
+                    ORDER BY c.id
+                    """,
+                    (projeto,)
+                )
+            ]
+
+    def obter_categoria(self, projeto: str, categoria: str) -> Optional[Dict]:
+        with self._conectar() as conn:
+            linha = conn.execute(
+                """
+                SELECT c.exemplo, c.regras FROM categorias c
+                JOIN projetos p ON p.id = c.projeto_id
+                WHERE p.nome = ? AND c.nome = ?
+                """,
+                (projeto, categoria)
+            ).fetchone()
+
+        if linha:
+            return {"exemplo": linha[0], "regras": linha[1]}
+        return None
+
+    def atualizar_categoria(
+        self,
+        projeto: str,
+        categoria: str,
+        exemplo: Optional[str] = None,
+        regras: Optional[str] = None
+    ) -> bool:
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE categorias SET
+                    exemplo = COALESCE(?, exemplo),
+                    regras = COALESCE(?, regras),
+                    atualizado_em = CURRENT_TIMESTAMP
+                WHERE nome = ? AND projeto_id = (SELECT id FROM projetos WHERE nome = ?)
+                """,
+                (exemplo, regras, categoria, projeto)
+            )
+            return cursor.rowcount > 0
+
+    def deletar_categoria(self, projeto: str, categoria: str) -> bool:
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                "DELETE FROM categorias WHERE nome = ? AND projeto_id = (SELECT id FROM projetos WHERE nome = ?)",
+                (categoria, projeto)
+            )
+            return cursor.rowcount > 0
@@ -0,0 +1,311 @@
+"""
+Fila de Sincronização
+Registra cada alteração feita no armazenamento local em uma fila SQLite
+durável e a reenvia ao Supabase em segundo plano, com novas tentativas e
+backoff. As gravações retornam na velocidade do disco local e o Supabase
+converge depois, inclusive após ficar offline ou reiniciar o app
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+# Métodos do SupabaseHandler que podem ser enfileirados. Todos são idempotentes,
+# então reenviar uma operação depois de uma falha parcial é seguro
+OPERACOES = (
+    "criar_projeto",
+    "deletar_projeto",
+    "adicionar_categoria",
+    "atualizar_categoria",
+    "deletar_categoria",
+    "salvar_conteudos_em_lote",
+)
+
+# Códigos do Postgres/PostgREST que nunca mudam ao repetir: dados inválidos
+# (22), violação de constraint (23), erro de sintaxe, coluna ou permissão (42),
+# requisição (PGRST1) e schema (PGRST2) inválidos
+CODIGOS_PERMANENTES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+# Uma fila (e uma thread) por arquivo, compartilhada entre instâncias do
+# GerenciadorMemoria (o Streamlit cria uma nova a cada rerun)
+_filas: Dict[str, "FilaSincronizacao"] = {}
+_lock_filas = threading.Lock()
+
+
+def obter_fila(db_path: Path = None) -> "FilaSincronizacao":
+    """Retorna a fila do processo para o arquivo informado, criando-a se preciso"""
+    if db_path is None:
+        db_path = Path(__file__).parent / "dados" / "fila_sincronizacao.db"
+
+    chave = str(Path(db_path).resolve())
+
+    with _lock_filas:
+        fila = _filas.get(chave)
+        if fila is None:
+            fila = FilaSincronizacao(db_path)
+            _filas[chave] = fila
+        return fila
+
+
+def _erro_permanente(erro: Optional[Exception]) -> bool:
+    """
+    Se repetir a operação não adianta
+
+    Args:
+        erro: Exceção da operação, ou None se ela retornou falha sem exceção
+              (ex.: o projeto da categoria não existe no Supabase)
+    """
+    if erro is None:
+        return True
+
+    codigo = str(getattr(erro, "code", None) or "")
+    if codigo.startswith(CODIGOS_PERMANENTES):
+        return True
+
+    # Erros HTTP 4xx (menos timeout e rate limit) também não mudam ao repetir
+    status = getattr(getattr(erro, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
+class FilaSincronizacao:
+    """Fila durável de operações a replicar no Supabase"""
+
+    def __init__(self, db_path: Path, max_tentativas: int = None,
+                 backoff_base_s: float = 2.0, backoff_max_s: float = 300.0):
+        """
+        Inicializa a fila e inicia o worker de reenvio
+
+        Args:
+            db_path: Arquivo SQLite da fila
+            max_tentativas: Tentativas antes de marcar a operação como falha
+                            (padrão: FILA_MAX_TENTATIVAS ou 10)
+            backoff_base_s: Espera após a primeira falha (dobra a cada tentativa)
+            backoff_max_s: Espera máxima entre tentativas
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_tentativas = max_tentativas or int(os.getenv("FILA_MAX_TENTATIVAS", "10"))
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        self._supabase = None
+        self._acordar = threading.Event()
+        self._ultima_sincronizacao: Optional[float] = None
+        self._ultimo_erro: Optional[str] = None
+
+        self._inicializar_banco()
+
+        self._thread = threading.Thread(target=self._loop, name="fila-sincronizacao", daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão por operação (seguro entre threads) e faz commit ao sair"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _inicializar_banco(self):
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS operacoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    operacao TEXT NOT NULL,
+                    argumentos TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    criado_em REAL NOT NULL,
+                    proxima_tentativa REAL NOT NULL DEFAULT 0,
+                    ultimo_erro TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_operacoes_status ON operacoes(status, id)")
+
+    def enfileirar(self, operacao: str, **argumentos):
+        """
+        Registra uma operação para reenvio ao Supabase
+
+        Args:
+            operacao: Nome do método do SupabaseHandler (veja OPERACOES)
+            **argumentos: Argumentos nomeados do método (precisam ser serializáveis em JSON)
+        """
+        if operacao not in OPERACOES:
+            raise ValueError(f"Operação não suportada na fila: {operacao}")
+
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT INTO operacoes (operacao, argumentos, criado_em) VALUES (?, ?, ?)",
+                (operacao, json.dumps(argumentos, ensure_ascii=False, default=str), time.time())
+            )
+
+        self._acordar.set()
+
+    def pendentes(self) -> int:
+        """Número de operações ainda não replicadas"""
+        with self._conectar() as conn:
+            return conn.execute("SELECT COUNT(*) FROM operacoes WHERE status = 'pendente'").fetchone()[0]
+
+    def metricas(self) -> Dict:
+        """
+        Métricas para monitoramento
+
+        Returns:
+            dict com pendentes, falhas (operações abandonadas), atraso_s (idade
+            da operação pendente mais antiga), ultima_sincronizacao e ultimo_erro
+        """
+        with self._conectar() as conn:
+            pendentes, mais_antiga = conn.execute(
+                "SELECT COUNT(*), MIN(criado_em) FROM operacoes WHERE status = 'pendente'"
+            ).fetchone()
+            falhas = conn.execute("SELECT COUNT(*) FROM operacoes WHERE status = 'falhou'").fetchone()[0]
+
+        return {
+            "pendentes": pendentes,
+            "falhas": falhas,
+            "atraso_s": round(time.time() - mais_antiga, 1) if mais_antiga else 0.0,
+            "ultima_sincronizacao": self._ultima_sincronizacao,
+            "ultimo_erro": self._ultimo_erro
+        }
+
+    def nomes_com_falhas(self) -> Set[Tuple[str, Optional[str]]]:
+        """
+        Projetos e categorias cuja criação ou atualização foi abandonada
+
+        Eles existem localmente mas não no Supabase, então não podem ser
+        tratados como apagados remotamente.
+
+        Returns:
+            set de (projeto, categoria); categoria é None para o próprio projeto
+        """
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                "SELECT operacao, argumentos FROM operacoes WHERE status = 'falhou' "
+                "AND operacao IN ('criar_projeto', 'adicionar_categoria', 'atualizar_categoria')"
+            ).fetchall()
+
+        nomes = set()
+        for operacao, argumentos in linhas:
+            argumentos = json.loads(argumentos)
+            if operacao == "criar_projeto":
+                nomes.add((argumentos.get("nome"), None))
+            else:
+                nomes.add((argumentos.get("projeto_nome"), argumentos.get("categoria_nome")))
+        return nomes
+
+    def reenviar_falhas(self) -> int:
+        """Devolve as operações marcadas como falha para a fila; retorna quantas"""
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                "UPDATE operacoes SET status = 'pendente', tentativas = 0, proxima_tentativa = 0 "
+                "WHERE status = 'falhou'"
+            )
+            total = cursor.rowcount
+
+        self._acordar.set()
+        return total
+
+    def _cliente(self):
+        """SupabaseHandler usado pelo worker (reconecta se a conexão não existir)"""
+        if self._supabase is None or not self._supabase.connected:
+            from utils.supabase_handler import SupabaseHandler
+            self._supabase = SupabaseHandler()
+        return self._supabase
+
+    def _backoff(self, tentativas: int) -> float:
+        """Espera exponencial com jitter para a próxima tentativa"""
+        espera = min(self.backoff_max_s, self.backoff_base_s * (2 ** (tentativas - 1)))
+        return espera * random.uniform(0.75, 1.0)
+
+    def _loop(self):
+        """Worker: reenvia as operações e dorme até a próxima tentativa ou um novo enfileiramento"""
+        while True:
+            try:
+                espera = self._processar()
+            except Exception as e:
+                self._ultimo_erro = str(e)
+                print(f"⚠️ Erro na fila de sincronização: {e}")
+                espera = self.backoff_base_s
+
+            self._acordar.wait(espera)
+            self._acordar.clear()
+
+    def _processar(self) -> Optional[float]:
+        """
+        Reenvia as operações pendentes em ordem
+
+        A fila é FIFO: uma operação só é enviada depois que as anteriores
+        foram aplicadas (ex.: a categoria depois do seu projeto). Só erros
+        temporários (rede, 5xx, rate limit) seguram a fila com backoff; uma
+        operação que nunca vai passar (4xx, constraint) é marcada como falha
+        na hora e a fila segue para a próxima.
+
+        Returns:
+            Segundos até a próxima tentativa, ou None se a fila esvaziou
+        """
+        while True:
+            with self._conectar() as conn:
+                linha = conn.execute(
+                    "SELECT id, operacao, argumentos, tentativas, proxima_tentativa "
+                    "FROM operacoes WHERE status = 'pendente' ORDER BY id LIMIT 1"
+                ).fetchone()
+
+            if linha is None:
+                return None
+
+            op_id, operacao, argumentos, tentativas, proxima_tentativa = linha
+
+            agora = time.time()
+            if proxima_tentativa > agora:
+                return proxima_tentativa - agora
+
+            supabase = self._cliente()
+            erro = None
+            permanente = False
+
+            if not supabase.connected:
+                erro = "Supabase indisponível"
+            else:
+                try:
+                    supabase.ultimo_erro = None
+                    if not getattr(supabase, operacao)(**json.loads(argumentos)):
+                        excecao = supabase.ultimo_erro
+                        erro = str(excecao) if excecao else f"{operacao} retornou falha"
+                        permanente = _erro_permanente(excecao)
+                except Exception as e:
+                    erro = str(e)
+                    permanente = _erro_permanente(e)
+
+            if erro is None:
+                with self._conectar() as conn:
+                    conn.execute("DELETE FROM operacoes WHERE id = ?", (op_id,))
+                self._ultima_sincronizacao = time.time()
+                continue
+
+            tentativas += 1
+            self._ultimo_erro = erro
+
+            with self._conectar() as conn:
+                if permanente or tentativas >= self.max_tentativas:
+                    motivo = "erro permanente" if permanente else f"{tentativas} tentativas"
+                    print(f"❌ Operação {operacao} abandonada ({motivo}): {erro}")
+                    conn.execute(
+                        "UPDATE operacoes SET status = 'falhou', tentativas = ?, ultimo_erro = ? WHERE id = ?",
+                        (tentativas, erro, op_id)
+                    )
+                else:
+                    espera = self._backoff(tentativas)
+                    conn.execute(
+                        "UPDATE operacoes SET tentativas = ?, proxima_tentativa = ?, ultimo_erro = ? WHERE id = ?",
+                        (tentativas, agora + espera, erro, op_id)
+                    )
+                    return espera
@@ -1,14 +1,19 @@
 """
 Gerenciador de Memória
 Gerencia projetos, categorias, exemplos e regras de conteúdo
-Suporta Supabase (nuvem) com fallback para JSON (local)
+Suporta Supabase (nuvem) com fallback para armazenamento local (JSON ou SQLite)
 """
 
-import json
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from memoria.armazenamento_json import ArmazenamentoJSON
+from memoria.armazenamento_sqlite import ArmazenamentoSQLite
+from memoria.fila_sincronizacao import obter_fila
+from memoria.sincronizador import obter_sincronizador
+
 # Tentar importar Supabase
 try:
     from utils.supabase_handler import SupabaseHandler
@@ -18,16 +23,50 @@ except ImportError:
 
 class GerenciadorMemoria:
     """Gerencia a memória de projetos, categorias e regras de conteúdo"""
-    
-    def __init__(self, memoria_dir: str = "memoria/dados"):
+
+    def __init__(self, memoria_dir: str = "memoria/dados", backend_local: str = None,
+                 buffer_historico: bool = False, fila_sincronizacao: bool = None,
+                 sincronizar: bool = None):
+        """
+        Inicializa o gerenciador
+
+        Args:
+            memoria_dir: Mantido por compatibilidade (os dados ficam em memoria/dados)
+            backend_local: "json" ou "sqlite" (padrão: MEMORIA_BACKEND ou "json").
+                           No primeiro uso do SQLite, o projetos.json existente é migrado.
+            buffer_historico: Se True, o histórico é gravado no Supabase em lotes
+                              (BufferConteudos) em vez de um insert por artigo
+            fila_sincronizacao: Se True, toda alteração é gravada primeiro no
+                                armazenamento local e reenviada ao Supabase em
+                                segundo plano (padrão: MEMORIA_FILA ou False)
+            sincronizar: Se True, todas as leituras são locais e o espelho local
+                         recebe só as alterações do Supabase, em segundo plano
+                         (padrão: MEMORIA_SINCRONIZAR ou False). Requer a fila.
+        """
         self.memoria_dir = Path(__file__).parent / "dados"
         self.memoria_dir.mkdir(parents=True, exist_ok=True)
         self.projetos_file = self.memoria_dir / "projetos.json"
-        
+
+        if backend_local is None:
+            backend_local = os.getenv("MEMORIA_BACKEND", "json")
+        self.backend_local = backend_local.lower()
+
+        if self.backend_local == "sqlite":
+            self.local = ArmazenamentoSQLite(
+                self.memoria_dir / "projetos.db",
+                importar_de=self.projetos_file
+            )
+        elif self.backend_local == "json":
+            self.local = ArmazenamentoJSON(self.projetos_file)
+        else:
+            raise ValueError(f"MEMORIA_BACKEND inválido: {backend_local} (use 'json' ou 'sqlite')")
+
+        nome_local = "SQLite" if self.backend_local == "sqlite" else "JSON"
+
         # Tentar conectar ao Supabase
         self.supabase = None
         self.usar_supabase = False
-        
+
         if SUPABASE_AVAILABLE:
             try:
                 self.supabase = SupabaseHandler()
@@ -35,193 +74,228 @@ class GerenciadorMemoria:
                 if self.usar_supabase:
                     print("✅ Usando Supabase para armazenamento")
                 else:
-                    print("📝 Usando armazenamento local (JSON)")
+                    print(f"📝 Usando armazenamento local ({nome_local})")
             except Exception as e:
                 print(f"⚠️ Erro ao conectar Supabase: {e}")
-                print("📝 Usando armazenamento local (JSON)")
+                print(f"📝 Usando armazenamento local ({nome_local})")
         else:
-            print("📝 Usando armazenamento local (JSON)")
-        
-        self._inicializar_memoria()
-    
-    def _inicializar_memoria(self):
-        """Inicializa o arquivo de memória se não existir"""
-        if not self.projetos_file.exists():
-            dados_iniciais = {
-                "projetos": {}
-            }
-            self._salvar_dados(dados_iniciais)
-    
-    def _carregar_dados(self) -> Dict:
-        """Carrega os dados da memória"""
-        try:
-            with open(self.projetos_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            return {"projetos": {}}
-    
-    def _salvar_dados(self, dados: Dict):
-        """Salva os dados na memória"""
-        try:
-            with open(self.projetos_file, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Erro ao salvar dados: {e}")
-    
+            print(f"📝 Usando armazenamento local ({nome_local})")
+
+        if fila_sincronizacao is None:
+            fila_sincronizacao = os.getenv("MEMORIA_FILA", "0") == "1"
+
+        self.fila = None
+        if fila_sincronizacao and self.usar_supabase:
+            self.fila = obter_fila(self.memoria_dir / "fila_sincronizacao.db")
+
+        if sincronizar is None:
+            sincronizar = os.getenv("MEMORIA_SINCRONIZAR", "0") == "1"
+
+        self.sincronizador = None
+        if sincronizar and self.fila:
+            self.sincronizador = obter_sincronizador(
+                self.local, self.supabase, self.fila, self.memoria_dir / "sincronizacao.json"
+            )
+            self.sincronizador.iniciar()
+
+        self.buffer = None
+        if buffer_historico and self.usar_supabase:
+            from utils.buffer_conteudos import BufferConteudos
+            self.buffer = BufferConteudos(self.supabase)
+
+    def _ler_supabase(self) -> bool:
+        """
+        Se as leituras devem ir ao Supabase
+
+        Com o sincronizador ativo, as leituras são sempre locais. Sem ele, o
+        armazenamento local pode estar incompleto (ex.: container novo), então
+        as leituras vão ao Supabase; enquanto houver alterações na fila, o
+        resultado é completado com o que só existe localmente (_fila_pendente).
+        """
+        return not self.sincronizador and self.usar_supabase and self.supabase is not None
+
+    def _fila_pendente(self) -> bool:
+        """Se há alterações locais que o Supabase ainda não recebeu"""
+        return bool(self.fila and self.fila.pendentes())
+
+    @staticmethod
+    def _mesclar(remotos: List[str], locais: List[str]) -> List[str]:
+        """Nomes do Supabase seguidos dos que, por enquanto, só existem localmente"""
+        return list(remotos) + [nome for nome in locais if nome not in remotos]
+
+    def metricas_sincronizacao(self) -> Dict:
+        """Profundidade e atraso da fila de sincronização (vazio se a fila estiver desativada)"""
+        if self.fila:
+            return self.fila.metricas()
+        return {}
+
+    def sincronizar(self) -> Dict:
+        """Traz agora as alterações do Supabase para o armazenamento local"""
+        if self.sincronizador:
+            return self.sincronizador.sincronizar()
+        return {"status": "desativado"}
+
     def criar_projeto(self, nome: str, descricao: str = ""):
         """Cria um novo projeto"""
+        if self.fila:
+            # O Supabase recebe a operação mesmo que o projeto já exista localmente (upsert)
+            sucesso = self.local.criar_projeto(nome, descricao)
+            self.fila.enfileirar("criar_projeto", nome=nome, descricao=descricao)
+            return sucesso
+
         # Tentar Supabase primeiro
         if self.usar_supabase and self.supabase:
             sucesso = self.supabase.criar_projeto(nome, descricao)
             if sucesso:
                 # Também salvar localmente para sincronização
-                dados = self._carregar_dados()
-                if nome not in dados["projetos"]:
-                    dados["projetos"][nome] = {
-                        "descricao": descricao,
-                        "categorias": {}
-                    }
-                    self._salvar_dados(dados)
+                self.local.criar_projeto(nome, descricao)
                 return True
-        
-        # Fallback para JSON local
-        dados = self._carregar_dados()
-        
-        if nome not in dados["projetos"]:
-            dados["projetos"][nome] = {
-                "descricao": descricao,
-                "categorias": {}
-            }
-            self._salvar_dados(dados)
-            return True
-        return False
-    
+
+        # Fallback local
+        return self.local.criar_projeto(nome, descricao)
+
     def listar_projetos(self) -> List[str]:
         """Lista todos os projetos"""
         # Tentar Supabase primeiro
-        if self.usar_supabase and self.supabase:
+        if self._ler_supabase():
             projetos = self.supabase.listar_projetos()
             if projetos:
+                if self._fila_pendente():
+                    return self._mesclar(projetos, self.local.listar_projetos())
                 return projetos
-        
-        # Fallback para JSON local
-        dados = self._carregar_dados()
-        return list(dados["projetos"].keys())
-    
+
+        # Fallback local
+        return self.local.listar_projetos()
+
     def adicionar_categoria(
-        self, 
-        projeto: str, 
-        categoria: str, 
-        exemplo: str = "", 
+        self,
+        projeto: str,
+        categoria: str,
+        exemplo: str = "",
         regras: str = ""
     ):
         """Adiciona uma categoria a um projeto"""
+        if self.fila:
+            # O projeto pode existir só no Supabase (armazenamento local novo): criá-lo aqui também
+            if not self.local.adicionar_categoria(projeto, categoria, exemplo, regras):
+                self.local.salvar_projeto(projeto)
+                self.local.adicionar_categoria(projeto, categoria, exemplo, regras)
+
+            # A gravação remota nunca depende do estado local
+            self.fila.enfileirar(
+                "adicionar_categoria",
+                projeto_nome=projeto, categoria_nome=categoria,
+                exemplo=exemplo, regras=regras
+            )
+            return True
+
         # Tentar Supabase primeiro
         if self.usar_supabase and self.supabase:
             sucesso = self.supabase.adicionar_categoria(projeto, categoria, exemplo, regras)
             if sucesso:
                 # Também salvar localmente
-                dados = self._carregar_dados()
-                if projeto in dados["projetos"]:
-                    dados["projetos"][projeto]["categorias"][categoria] = {
-                        "exemplo": exemplo,
-                        "regras": regras
-                    }
-                    self._salvar_dados(dados)
+                self.local.adicionar_categoria(projeto, categoria, exemplo, regras)
                 return True
-        
-        # Fallback para JSON local
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"]:
-            dados["projetos"][projeto]["categorias"][categoria] = {
-                "exemplo": exemplo,
-                "regras": regras
-            }
-            self._salvar_dados(dados)
-            return True
-        return False
-    
+
+        # Fallback local
+        return self.local.adicionar_categoria(projeto, categoria, exemplo, regras)
+
     def listar_categorias(self, projeto: str) -> List[str]:
         """Lista todas as categorias de um projeto"""
         # Tentar Supabase primeiro
-        if self.usar_supabase and self.supabase:
+        if self._ler_supabase():
             categorias = self.supabase.listar_categorias(projeto)
             if categorias:
+                if self._fila_pendente():
+                    return self._mesclar(categorias, self.local.listar_categorias(projeto))
                 return categorias
-        
-        # Fallback para JSON local
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"]:
-            return list(dados["projetos"][projeto]["categorias"].keys())
-        return []
-    
+
+        # Fallback local
+        return self.local.listar_categorias(projeto)
+
     def obter_memoria_categoria(self, projeto: str, categoria: str) -> Dict:
         """Obtém a memória completa de uma categoria"""
+        # Com alterações na fila, a cópia local é a mais recente
+        if self._fila_pendente():
+            memoria = self.local.obter_categoria(projeto, categoria)
+            if memoria:
+                return memoria
+
         # Tentar Supabase primeiro
-        if self.usar_supabase and self.supabase:
+        if self._ler_supabase():
             memoria = self.supabase.obter_categoria(projeto, categoria)
             if memoria:
                 return memoria
-        
-        # Fallback para JSON local
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"]:
-            if categoria in dados["projetos"][projeto]["categorias"]:
-                return dados["projetos"][projeto]["categorias"][categoria]
-        
+
+        # Fallback local
+        memoria = self.local.obter_categoria(projeto, categoria)
+        if memoria:
+            return memoria
+
         return {"exemplo": "", "regras": ""}
-    
+
     def atualizar_categoria(
-        self, 
-        projeto: str, 
-        categoria: str, 
-        exemplo: Optional[str] = None, 
+        self,
+        projeto: str,
+        categoria: str,
+        exemplo: Optional[str] = None,
         regras: Optional[str] = None
     ):
         """Atualiza a memória de uma categoria"""
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"] and categoria in dados["projetos"][projeto]["categorias"]:
-            if exemplo is not None:
-                dados["projetos"][projeto]["categorias"][categoria]["exemplo"] = exemplo
-            if regras is not None:
-                dados["projetos"][projeto]["categorias"][categoria]["regras"] = regras
-            
-            self._salvar_dados(dados)
+        sucesso = self.local.atualizar_categoria(projeto, categoria, exemplo, regras)
+        if self.fila:
+            if not sucesso:
+                # A categoria existe só no Supabase: trazer a versão atualizada para o local
+                self.local.salvar_projeto(projeto)
+                self.local.adicionar_categoria(projeto, categoria, exemplo or "", regras or "")
+
+            self.fila.enfileirar(
+                "atualizar_categoria",
+                projeto_nome=projeto, categoria_nome=categoria,
+                exemplo=exemplo, regras=regras
+            )
             return True
-        return False
-    
+        return sucesso
+
     def deletar_categoria(self, projeto: str, categoria: str):
         """Deleta uma categoria de um projeto"""
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"]:
-            if categoria in dados["projetos"][projeto]["categorias"]:
-                del dados["projetos"][projeto]["categorias"][categoria]
-                self._salvar_dados(dados)
-                return True
-        return False
-    
+        sucesso = self.local.deletar_categoria(projeto, categoria)
+        if self.fila:
+            # Deletar é idempotente: enfileirar mesmo se não existia localmente
+            self.fila.enfileirar("deletar_categoria", projeto_nome=projeto, categoria_nome=categoria)
+        return sucesso
+
     def deletar_projeto(self, projeto: str):
         """Deleta um projeto completo"""
-        dados = self._carregar_dados()
-        
-        if projeto in dados["projetos"]:
-            del dados["projetos"][projeto]
-            self._salvar_dados(dados)
-            return True
-        return False
-    
-    def salvar_conteudo_gerado(self, projeto: str, categoria: str, 
+        sucesso = self.local.deletar_projeto(projeto)
+        if self.fila:
+            self.fila.enfileirar("deletar_projeto", nome=projeto)
+        return sucesso
+
+    def salvar_conteudo_gerado(self, projeto: str, categoria: str,
                                palavra_chave: str, conteudo_data: Dict) -> bool:
         """Salva conteúdo gerado no histórico (Supabase ou local)"""
+        if self.buffer:
+            return self.buffer.adicionar(projeto, categoria, palavra_chave, conteudo_data)
+
+        if self.fila:
+            self.fila.enfileirar("salvar_conteudos_em_lote", itens=[{
+                "projeto": projeto,
+                "categoria": categoria,
+                "palavra_chave": palavra_chave,
+                "conteudo_data": conteudo_data,
+                "criado_em": datetime.now().isoformat()
+            }])
+            return True
+
         if self.usar_supabase and self.supabase:
             return self.supabase.salvar_conteudo(projeto, categoria, palavra_chave, conteudo_data)
-        
+
         # Se não usar Supabase, apenas retorna True (JSON local não salva histórico por padrão)
         return True
 
+    def descarregar_historico(self) -> int:
+        """Grava imediatamente o histórico em buffer; retorna quantos conteúdos foram gravados"""
+        if self.buffer:
+            return self.buffer.descarregar()
+        return 0
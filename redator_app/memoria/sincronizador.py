@@ -0,0 +1,230 @@
+"""
+Sincronizador
+Mantém o armazenamento local como espelho do Supabase: as leituras do app
+passam a ser sempre locais e, periodicamente ou sob demanda, só as linhas
+alteradas no Supabase (atualizado_em) são trazidas para o espelho
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+# Um sincronizador (e uma thread) por arquivo de estado, compartilhado entre
+# instâncias do GerenciadorMemoria
+_sincronizadores: Dict[str, "Sincronizador"] = {}
+_lock_sincronizadores = threading.Lock()
+
+
+def obter_sincronizador(local, supabase, fila=None, estado_path: Path = None) -> "Sincronizador":
+    """Retorna o sincronizador do processo, criando-o na primeira chamada"""
+    if estado_path is None:
+        estado_path = Path(__file__).parent / "dados" / "sincronizacao.json"
+
+    chave = str(Path(estado_path).resolve())
+
+    with _lock_sincronizadores:
+        sincronizador = _sincronizadores.get(chave)
+        if sincronizador is None:
+            sincronizador = Sincronizador(local, supabase, fila, estado_path)
+            _sincronizadores[chave] = sincronizador
+        return sincronizador
+
+
+class Sincronizador:
+    """Traz para o armazenamento local as alterações feitas no Supabase"""
+
+    def __init__(self, local, supabase, fila=None, estado_path: Path = None, intervalo_s: float = None):
+        """
+        Inicializa o sincronizador
+
+        Args:
+            local: ArmazenamentoJSON ou ArmazenamentoSQLite
+            supabase: SupabaseHandler
+            fila: FilaSincronizacao (opcional). Enquanto houver alterações locais
+                  na fila, a sincronização é adiada para não sobrescrevê-las
+            estado_path: Arquivo onde o último checkpoint é guardado
+            intervalo_s: Intervalo da sincronização periódica
+                         (padrão: MEMORIA_SINCRONIZAR_INTERVALO_S ou 60)
+        """
+        self.local = local
+        self.supabase = supabase
+        self.fila = fila
+        self.estado_path = Path(estado_path)
+        self.intervalo_s = intervalo_s or float(os.getenv("MEMORIA_SINCRONIZAR_INTERVALO_S", "60"))
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._acordar = threading.Event()
+        self._estado = self._carregar_estado()
+
+    def _carregar_estado(self) -> Dict:
+        try:
+            with open(self.estado_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar_estado(self):
+        self.estado_path.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.estado_path.with_suffix('.json.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._estado, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.estado_path)
+
+    def estado(self) -> Dict:
+        """Checkpoints e horário/resultado da última sincronização"""
+        return dict(self._estado)
+
+    def iniciar(self):
+        """Inicia a sincronização periódica em segundo plano (só uma vez por processo)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="sincronizador", daemon=True)
+            self._thread.start()
+
+    def solicitar(self):
+        """Pede uma sincronização imediata à thread de fundo"""
+        self._acordar.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self.sincronizar()
+            except Exception as e:
+                print(f"⚠️ Erro na sincronização: {e}")
+
+            self._acordar.wait(self.intervalo_s)
+            self._acordar.clear()
+
+    def sincronizar(self) -> Dict:
+        """
+        Executa uma sincronização delta
+
+        1. Projetos e categorias com atualizado_em desde o último checkpoint
+           são gravados no armazenamento local
+        2. A lista de nomes do Supabase (sem conteúdo) é comparada com o
+           espelho: o que sumiu lá é removido aqui. Na primeira sincronização,
+           o que só existe localmente é enviado ao Supabase pela fila
+
+        Returns:
+            dict com status ("ok", "adiado" ou "offline") e contagens
+        """
+        with self._lock:
+            if self.fila and self.fila.pendentes():
+                return {"status": "adiado"}
+
+            if not self.supabase or not self.supabase.connected:
+                return {"status": "offline"}
+
+            primeira = "checkpoint_projetos" not in self._estado
+            # Foto do espelho antes de aplicar: só o que já existia pode ser removido
+            antes = self.local.exportar()["projetos"]
+            antes = {nome: list(projeto["categorias"].keys()) for nome, projeto in antes.items()}
+
+            projetos = self.supabase.listar_projetos_alterados(self._estado.get("checkpoint_projetos"))
+            categorias = self.supabase.listar_categorias_alteradas(self._estado.get("checkpoint_categorias"))
+            nomes = self.supabase.listar_nomes()
+
+            if projetos is None or categorias is None or nomes is None:
+                return {"status": "offline"}
+
+            for projeto in projetos:
+                self.local.salvar_projeto(projeto["nome"], projeto.get("descricao") or "")
+
+            for categoria in categorias:
+                if not self.local.adicionar_categoria(
+                    categoria["projeto"], categoria["nome"], categoria["exemplo"], categoria["regras"]
+                ):
+                    self.local.salvar_projeto(categoria["projeto"])
+                    self.local.adicionar_categoria(
+                        categoria["projeto"], categoria["nome"], categoria["exemplo"], categoria["regras"]
+                    )
+
+            removidos = enviados = 0
+
+            if primeira:
+                enviados = self._enviar_somente_locais(antes, nomes)
+            else:
+                removidos = self._remover_deletados(antes, nomes)
+
+            if projetos:
+                self._estado["checkpoint_projetos"] = projetos[-1]["atualizado_em"]
+            else:
+                self._estado.setdefault("checkpoint_projetos", None)
+            if categorias:
+                self._estado["checkpoint_categorias"] = categorias[-1]["atualizado_em"]
+            else:
+                self._estado.setdefault("checkpoint_categorias", None)
+
+            resultado = {
+                "status": "ok",
+                "projetos": len(projetos),
+                "categorias": len(categorias),
+                "removidos": removidos,
+                "enviados": enviados
+            }
+            self._estado["ultima_sincronizacao"] = time.time()
+            self._estado["ultimo_resultado"] = resultado
+            self._salvar_estado()
+
+            return resultado
+
+    def _remover_deletados(self, antes: Dict, nomes: Dict) -> int:
+        """Remove do espelho o que não existe mais no Supabase"""
+        removidos = 0
+
+        # Uma alteração local pode ter entrado na fila durante a sincronização
+        if self.fila and self.fila.pendentes():
+            return 0
+
+        # O que a fila abandonou nunca chegou ao Supabase: não foi apagado lá
+        falhas = self.fila.nomes_com_falhas() if self.fila else set()
+        projetos_com_falhas = {projeto for projeto, _ in falhas}
+
+        for projeto, categorias in antes.items():
+            if projeto not in nomes:
+                if projeto not in projetos_com_falhas:
+                    self.local.deletar_projeto(projeto)
+                    removidos += 1
+                continue
+
+            for categoria in categorias:
+                if categoria not in nomes[projeto] and (projeto, categoria) not in falhas:
+                    self.local.deletar_categoria(projeto, categoria)
+                    removidos += 1
+
+        return removidos
+
+    def _enviar_somente_locais(self, antes: Dict, nomes: Dict) -> int:
+        """Enfileira para o Supabase o que até agora só existia localmente"""
+        if not self.fila:
+            return 0
+
+        dados = self.local.exportar()["projetos"]
+        enviados = 0
+
+        for projeto, categorias in antes.items():
+            if projeto not in dados:
+                continue
+
+            if projeto not in nomes:
+                self.fila.enfileirar(
+                    "criar_projeto", nome=projeto, descricao=dados[projeto].get("descricao", "")
+                )
+                enviados += 1
+
+            for categoria in categorias:
+                memoria = dados[projeto]["categorias"].get(categoria)
+                if memoria is not None and categoria not in nomes.get(projeto, []):
+                    self.fila.enfileirar(
+                        "adicionar_categoria",
+                        projeto_nome=projeto, categoria_nome=categoria,
+                        exemplo=memoria.get("exemplo", ""), regras=memoria.get("regras", "")
+                    )
+                    enviados += 1
+
+        return enviados
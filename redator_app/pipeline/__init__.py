@@ -0,0 +1,2 @@
+# Módulo de pipeline
+
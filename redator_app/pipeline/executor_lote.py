@@ -0,0 +1,274 @@
+"""
+Executor em Lote
+Processa listas de palavras-chave (CSV ou JSONL) rodando vários pipelines
+de artigo em paralelo, com número de workers configurável
+"""
+
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Adicionar o diretório pai ao path para importar os módulos do app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pipeline.pipeline_artigo import gerar_artigo
+
+CAMPOS_OBRIGATORIOS = ("projeto", "categoria", "palavra_chave")
+
+
+def carregar_palavras_chave(caminho: str) -> List[Dict]:
+    """
+    Carrega as linhas do lote a partir de um arquivo CSV ou JSONL
+
+    Cada linha precisa dos campos: projeto, categoria, palavra_chave
+
+    Args:
+        caminho: Caminho do arquivo (.csv ou .jsonl)
+
+    Returns:
+        list de dicts com projeto, categoria e palavra_chave
+
+    Raises:
+        ValueError: se o formato não for suportado ou faltar algum campo
+    """
+    arquivo = Path(caminho)
+    sufixo = arquivo.suffix.lower()
+
+    if sufixo == ".csv":
+        with open(arquivo, 'r', encoding='utf-8-sig', newline='') as f:
+            amostra = f.read(2048)
+            f.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+            except csv.Error:
+                dialeto = csv.excel
+            registros = list(csv.DictReader(f, dialect=dialeto))
+    elif sufixo in (".jsonl", ".ndjson"):
+        registros = []
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    registros.append(json.loads(linha))
+    else:
+        raise ValueError(f"Formato não suportado: {sufixo} (use .csv ou .jsonl)")
+
+    linhas = []
+    for numero, registro in enumerate(registros, start=1):
+        faltando = [c for c in CAMPOS_OBRIGATORIOS if not str(registro.get(c) or "").strip()]
+        if faltando:
+            raise ValueError(f"Linha {numero} sem os campos: {', '.join(faltando)}")
+        linhas.append({c: str(registro[c]).strip() for c in CAMPOS_OBRIGATORIOS})
+
+    return linhas
+
+
+class ExecutorLote:
+    """Executa o pipeline de artigo para muitas palavras-chave em paralelo"""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        publicar: bool = True,
+        salvar_historico: bool = True,
+        ao_concluir: Optional[Callable[[Dict], None]] = None
+    ):
+        """
+        Inicializa o executor
+
+        Args:
+            workers: Número máximo de artigos processados ao mesmo tempo
+            publicar: Se True, publica cada artigo no Google Docs
+            salvar_historico: Se True, salva os artigos no histórico (Supabase, em lotes)
+            ao_concluir: Callback chamado com o resultado de cada linha
+        """
+        if workers < 1:
+            raise ValueError("workers deve ser pelo menos 1")
+
+        self.workers = workers
+        self.publicar = publicar
+        self.salvar_historico = salvar_historico
+        self.ao_concluir = ao_concluir
+
+        self._locais = threading.local()
+        self._lock_saida = threading.Lock()
+        self._gerenciador = None
+        self._docs_handler = None
+        self._artigos: Dict[int, Dict] = {}
+
+    def _componentes(self) -> Dict:
+        """
+        Retorna os componentes do worker atual, criando-os na primeira chamada
+
+        Os agentes vêm do registro do processo (compartilhados entre workers);
+        o gerador de imagem é por thread. A publicação no Google Docs não
+        acontece aqui: cada artigo pronto vai para o pool de publicação.
+        """
+        if not hasattr(self._locais, "componentes"):
+            from agents.registro_agentes import obter_agente_pesquisador, obter_agente_redator
+            from agents.gerador_imagem import GeradorImagem
+
+            self._locais.componentes = {
+                "pesquisador": obter_agente_pesquisador(),
+                "redator": obter_agente_redator(),
+                "gerador_imagem": GeradorImagem()
+            }
+
+        return self._locais.componentes
+
+    def _processar(self, indice: int, linha: Dict) -> Dict:
+        """Processa uma linha do lote e devolve seu status"""
+        inicio = time.perf_counter()
+        resultado = {
+            "indice": indice,
+            "projeto": linha["projeto"],
+            "categoria": linha["categoria"],
+            "palavra_chave": linha["palavra_chave"]
+        }
+
+        try:
+            componentes = self._componentes()
+            artigo = gerar_artigo(
+                projeto=linha["projeto"],
+                categoria=linha["categoria"],
+                palavra_chave=linha["palavra_chave"],
+                gerenciador=self._gerenciador,
+                publicar=False,
+                salvar_historico=self.salvar_historico,
+                **componentes
+            )
+            resultado.update({
+                "status": "sucesso",
+                "titulo": artigo["conteudo"].get("titulo", ""),
+                "imagem_path": artigo["imagem_path"],
+                "documento_url": None,
+                "tempos": artigo["tempos"]
+            })
+
+            if self.publicar:
+                # Bytes ainda em memória no gerador deste worker (a imagem pode nem estar em disco)
+                imagem_dados = (
+                    componentes["gerador_imagem"].obter_bytes(artigo["imagem_path"])
+                    if artigo["imagem_path"] else None
+                )
+                self._artigos[indice] = {
+                    "titulo": resultado["titulo"],
+                    "conteudo": artigo["conteudo"].get("conteudo_formatado", ""),
+                    "imagem_path": artigo["imagem_path"],
+                    "imagem_dados": imagem_dados
+                }
+        except Exception as e:
+            resultado.update({
+                "status": "erro",
+                "erro": str(e)
+            })
+
+        resultado["duracao_s"] = round(time.perf_counter() - inicio, 2)
+        return resultado
+
+    def _reportar(self, resultado: Dict, concluidos: int, total: int):
+        """Imprime o status de uma linha concluída"""
+        rotulo = f"[{concluidos}/{total}] {resultado['palavra_chave']} ({resultado['projeto']}/{resultado['categoria']})"
+
+        with self._lock_saida:
+            if resultado["status"] == "sucesso":
+                destino = resultado.get("documento_url") or resultado.get("imagem_path")
+                print(f"✅ {rotulo} em {resultado['duracao_s']}s → {destino}")
+            else:
+                print(f"❌ {rotulo} em {resultado['duracao_s']}s: {resultado['erro']}")
+
+        if self.ao_concluir:
+            self.ao_concluir(resultado)
+
+    def _publicar(self, publicador, resultado: Dict, artigo: Dict) -> Dict:
+        """Publica no Google Docs um artigo gerado com sucesso e atualiza seu resultado"""
+        inicio = time.perf_counter()
+        publicado = publicador.publicar_artigo(artigo)
+
+        if publicado["erro"]:
+            resultado["status"] = "erro"
+            resultado["erro"] = f"Publicação falhou: {publicado['erro']}"
+        else:
+            resultado["documento_url"] = publicado["documento_url"]
+            resultado["imagem_url"] = publicado["imagem_url"]
+
+        resultado["duracao_s"] = round(resultado["duracao_s"] + time.perf_counter() - inicio, 2)
+        return resultado
+
+    def executar(self, linhas: List[Dict]) -> Dict:
+        """
+        Executa o lote completo
+
+        Args:
+            linhas: Lista de dicts com projeto, categoria e palavra_chave
+
+        Returns:
+            dict com o resumo (totais, duração, artigos/hora) e os resultados por linha
+        """
+        total = len(linhas)
+        resultados = []
+
+        if self._gerenciador is None:
+            # Sempre necessário para ler exemplo e regras das categorias; o buffer
+            # de histórico só existe quando o histórico é salvo
+            from memoria.gerenciador_memoria import GerenciadorMemoria
+            self._gerenciador = GerenciadorMemoria(buffer_historico=self.salvar_historico)
+
+        if self.publicar and self._docs_handler is None:
+            # Autenticar uma vez na thread principal (o login OAuth é interativo)
+            from utils.google_docs_handler import GoogleDocsHandler
+            self._docs_handler = GoogleDocsHandler()
+
+        publicador = None
+        if self.publicar:
+            from utils.publicador_lote import PublicadorLote
+            publicador = PublicadorLote(self._docs_handler, workers=self.workers)
+
+        print(f"🚀 Iniciando lote com {total} palavras-chave e {self.workers} workers")
+        inicio = time.perf_counter()
+
+        # Cada artigo é publicado assim que fica pronto (um lote interrompido
+        # mantém publicado o que já terminou); a linha só é reportada depois
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lote") as executor, \
+                ThreadPoolExecutor(
+                    max_workers=publicador.workers if publicador else 1, thread_name_prefix="publicacao"
+                ) as publicacao:
+            pendentes = {
+                executor.submit(self._processar, indice, linha)
+                for indice, linha in enumerate(linhas)
+            }
+
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+
+                for futuro in concluidos:
+                    resultado = futuro.result()
+                    artigo = self._artigos.pop(resultado["indice"], None)
+
+                    if artigo is not None:
+                        pendentes.add(publicacao.submit(self._publicar, publicador, resultado, artigo))
+                        continue
+
+                    resultados.append(resultado)
+                    self._reportar(resultado, len(resultados), total)
+
+        if self._gerenciador:
+            self._gerenciador.descarregar_historico()
+
+        resultados.sort(key=lambda r: r["indice"])
+
+        duracao = time.perf_counter() - inicio
+        sucesso = sum(1 for r in resultados if r["status"] == "sucesso")
+
+        return {
+            "total": total,
+            "sucesso": sucesso,
+            "erros": total - sucesso,
+            "workers": self.workers,
+            "duracao_total_s": round(duracao, 2),
+            "artigos_por_hora": round(sucesso / duracao * 3600, 1) if duracao > 0 else 0.0,
+            "resultados": resultados
+        }
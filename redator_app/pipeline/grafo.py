@@ -0,0 +1,116 @@
+"""
+Grafo de Tarefas
+Executa etapas com dependências entre si: cada etapa começa assim que
+todas as suas dependências terminam, e etapas independentes rodam em paralelo
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class GrafoTarefas:
+    """Pequeno grafo de dependências (DAG) executado em um pool de threads"""
+
+    def __init__(self):
+        self._tarefas: Dict[str, Dict] = {}
+        self.tempos: Dict[str, float] = {}
+
+    def adicionar(self, nome: str, funcao: Callable[..., Any], dependencias: Iterable[str] = ()):
+        """
+        Adiciona uma etapa ao grafo
+
+        Args:
+            nome: Nome único da etapa (também é a chave do resultado)
+            funcao: Função chamada com os resultados das dependências como kwargs
+            dependencias: Nomes das etapas que precisam terminar antes
+        """
+        if nome in self._tarefas:
+            raise ValueError(f"Etapa duplicada: {nome}")
+
+        dependencias = tuple(dependencias)
+        for dependencia in dependencias:
+            if dependencia not in self._tarefas:
+                raise ValueError(f"Etapa '{nome}' depende de '{dependencia}', que não foi adicionada")
+
+        self._tarefas[nome] = {"funcao": funcao, "dependencias": dependencias}
+        return self
+
+    def _executar_tarefa(self, nome: str, argumentos: Dict[str, Any]) -> Any:
+        """Executa uma etapa medindo o tempo gasto"""
+        inicio = time.perf_counter()
+        try:
+            return self._tarefas[nome]["funcao"](**argumentos)
+        finally:
+            self.tempos[nome] = round(time.perf_counter() - inicio, 2)
+
+    def executar(
+        self,
+        max_workers: Optional[int] = None,
+        ao_concluir: Optional[Callable[[str, Any], None]] = None,
+        ao_aguardar: Optional[Callable[[], None]] = None,
+        intervalo: float = 0.1
+    ) -> Dict[str, Any]:
+        """
+        Executa o grafo completo
+
+        Args:
+            max_workers: Máximo de etapas simultâneas (padrão: número de etapas)
+            ao_concluir: Callback chamado na thread de quem executa o grafo
+                         sempre que uma etapa termina (nome, resultado)
+            ao_aguardar: Callback chamado na thread de quem executa o grafo a cada
+                         `intervalo` segundos enquanto há etapas rodando (ex.: repassar
+                         progresso produzido pelas etapas para a interface)
+            intervalo: Intervalo em segundos entre chamadas de ao_aguardar
+
+        Returns:
+            dict com o resultado de cada etapa
+
+        Raises:
+            A exceção da primeira etapa que falhar (as pendentes não são iniciadas)
+        """
+        resultados: Dict[str, Any] = {}
+        pendentes = dict(self._tarefas)
+        em_execucao = {}
+        erro = None
+
+        with ThreadPoolExecutor(max_workers=max_workers or max(len(pendentes), 1)) as executor:
+            while pendentes or em_execucao:
+                if erro is None:
+                    prontas = [
+                        nome for nome, tarefa in pendentes.items()
+                        if all(d in resultados for d in tarefa["dependencias"])
+                    ]
+                    for nome in prontas:
+                        argumentos = {d: resultados[d] for d in pendentes[nome]["dependencias"]}
+                        futuro = executor.submit(self._executar_tarefa, nome, argumentos)
+                        em_execucao[futuro] = nome
+                        del pendentes[nome]
+
+                if not em_execucao:
+                    break
+
+                concluidos, _ = wait(
+                    em_execucao,
+                    timeout=intervalo if ao_aguardar else None,
+                    return_when=FIRST_COMPLETED
+                )
+                if ao_aguardar:
+                    ao_aguardar()
+
+                for futuro in concluidos:
+                    nome = em_execucao.pop(futuro)
+                    try:
+                        resultados[nome] = futuro.result()
+                    except Exception as e:
+                        if erro is None:
+                            erro = e
+                        continue
+
+                    if ao_concluir and erro is None:
+                        ao_concluir(nome, resultados[nome])
+
+        if erro is not None:
+            raise erro
+
+        return resultados
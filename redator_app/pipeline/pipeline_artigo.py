@@ -0,0 +1,171 @@
+"""
+Pipeline de Artigo
+Executa o fluxo completo de geração de um artigo, sem interface.
+
+As etapas formam um grafo de dependências:
+
+    pesquisa → redacao ─────────┐
+                                ├→ documento
+    imagem → upload_imagem ─────┘
+
+A imagem só precisa da palavra-chave e da categoria, então ela (e o upload
+para o Drive) roda em paralelo com a pesquisa e a redação.
+"""
+
+import queue
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from pipeline.grafo import GrafoTarefas
+
+
+def gerar_artigo(
+    projeto: str,
+    categoria: str,
+    palavra_chave: str,
+    pesquisador,
+    redator,
+    gerador_imagem,
+    gerenciador=None,
+    docs_handler=None,
+    publicar: bool = True,
+    salvar_historico: bool = True,
+    ao_concluir_etapa: Optional[Callable[[str, Any], None]] = None,
+    ao_receber_evento: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    Gera um artigo completo para uma palavra-chave
+
+    Args:
+        projeto: Nome do projeto
+        categoria: Nome da categoria (usada para buscar exemplo e regras)
+        palavra_chave: Palavra-chave do artigo
+        pesquisador: Instância de AgentePesquisador
+        redator: Instância de AgenteRedator
+        gerador_imagem: Instância de GeradorImagem
+        gerenciador: GerenciadorMemoria (opcional) - memória da categoria e histórico
+        docs_handler: GoogleDocsHandler (opcional) - envia a imagem ao Drive
+        publicar: Se True (e houver docs_handler), cria o documento no Google Docs
+        salvar_historico: Se True (e houver gerenciador), salva o artigo no histórico.
+                          A memória da categoria é lida do gerenciador de qualquer forma
+        ao_concluir_etapa: Callback (etapa, resultado) chamado na thread atual
+                           sempre que uma etapa termina
+        ao_receber_evento: Se informado, a redação roda em streaming e cada evento
+                           de AgenteRedator.gerar_conteudo_stream (exceto o final)
+                           é repassado a este callback na thread atual
+
+    Returns:
+        dict com conteúdo gerado, caminho e URL da imagem, URL do documento e tempos por etapa
+
+    Raises:
+        RuntimeError: se a pesquisa ou a redação falharem
+    """
+    memoria = {"exemplo": "", "regras": ""}
+    if gerenciador:
+        memoria = gerenciador.obter_memoria_categoria(projeto, categoria)
+
+    contexto_imagem = {
+        'palavra_chave': palavra_chave,
+        'categoria': categoria,
+        'projeto': projeto
+    }
+
+    def etapa_pesquisa():
+        pesquisa = pesquisador.pesquisar(palavra_chave)
+        if pesquisa.get("erro"):
+            raise RuntimeError(f"Pesquisa falhou: {pesquisa['erro']}")
+        return pesquisa
+
+    eventos_redacao = queue.Queue()
+
+    def etapa_redacao(pesquisa):
+        argumentos = {
+            "palavra_chave": palavra_chave,
+            "pesquisa_resultado": pesquisa,
+            "exemplo_categoria": memoria.get("exemplo", ""),
+            "regras_categoria": memoria.get("regras", "")
+        }
+
+        if ao_receber_evento is None:
+            conteudo = redator.gerar_conteudo(**argumentos)
+        else:
+            conteudo = None
+            for evento in redator.gerar_conteudo_stream(**argumentos):
+                if evento["tipo"] == "final":
+                    conteudo = evento["resultado"]
+                else:
+                    eventos_redacao.put(evento)
+
+        if conteudo.get("erro"):
+            raise RuntimeError(f"Redação falhou: {conteudo['erro']}")
+        return conteudo
+
+    def etapa_imagem():
+        return gerador_imagem.gerar_imagem(
+            titulo=palavra_chave,
+            descricao="",
+            contexto=contexto_imagem
+        )
+
+    def etapa_upload_imagem(imagem):
+        # Enviar os bytes que o gerador ainda tem em memória (sem reler o arquivo)
+        dados = gerador_imagem.obter_bytes(imagem) if imagem else None
+        if dados:
+            return docs_handler.enviar_imagem(dados, nome=Path(imagem).name)
+        return docs_handler.enviar_imagem(imagem)
+
+    def etapa_documento(redacao, upload_imagem=None, imagem=None):
+        return docs_handler.criar_documento(
+            titulo=redacao["titulo"],
+            conteudo=redacao["conteudo_formatado"],
+            imagem_path=imagem,
+            imagem_url=upload_imagem,
+            imagem_dados=gerador_imagem.obter_bytes(imagem) if imagem else None
+        )
+
+    grafo = GrafoTarefas()
+    grafo.adicionar("pesquisa", etapa_pesquisa)
+    grafo.adicionar("redacao", etapa_redacao, ["pesquisa"])
+    grafo.adicionar("imagem", etapa_imagem)
+
+    if docs_handler and docs_handler.metodo_publicacao == "html":
+        # A imagem vai embutida no HTML: não há upload separado
+        if publicar:
+            grafo.adicionar("documento", etapa_documento, ["redacao", "imagem"])
+    elif docs_handler:
+        grafo.adicionar("upload_imagem", etapa_upload_imagem, ["imagem"])
+        if publicar:
+            grafo.adicionar("documento", etapa_documento, ["redacao", "upload_imagem"])
+
+    def repassar_eventos():
+        while True:
+            try:
+                evento = eventos_redacao.get_nowait()
+            except queue.Empty:
+                return
+            ao_receber_evento(evento)
+
+    resultados = grafo.executar(
+        ao_concluir=ao_concluir_etapa,
+        ao_aguardar=repassar_eventos if ao_receber_evento else None
+    )
+
+    conteudo = resultados["redacao"]
+    conteudo["imagem_path"] = resultados["imagem"]
+    conteudo["imagem_url"] = resultados.get("upload_imagem")
+
+    # Histórico (depois de tudo, para registrar o caminho da imagem)
+    if gerenciador and salvar_historico:
+        gerenciador.salvar_conteudo_gerado(projeto, categoria, palavra_chave, conteudo)
+
+    return {
+        "projeto": projeto,
+        "categoria": categoria,
+        "palavra_chave": palavra_chave,
+        "pesquisa": resultados["pesquisa"],
+        "conteudo": conteudo,
+        "imagem_path": resultados["imagem"],
+        "imagem_url": resultados.get("upload_imagem"),
+        "documento_url": resultados.get("documento"),
+        "tempos": dict(grafo.tempos)
+    }
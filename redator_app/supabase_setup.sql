@@ -53,15 +53,27 @@ CREATE TABLE IF NOT EXISTS conteudos_gerados (
     palavras_chave_secundarias TEXT[],
     imagem_path TEXT,
     estatisticas JSONB,
+    hash_conteudo TEXT,
     criado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Bancos criados antes da coluna hash_conteudo
+ALTER TABLE conteudos_gerados ADD COLUMN IF NOT EXISTS hash_conteudo TEXT;
+
+-- Hash do artigo: torna os inserts em lote idempotentes (upsert sem duplicar)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conteudos_hash ON conteudos_gerados(hash_conteudo);
+
 -- Índices para busca e performance
 CREATE INDEX IF NOT EXISTS idx_conteudos_projeto ON conteudos_gerados(projeto_id);
 CREATE INDEX IF NOT EXISTS idx_conteudos_categoria ON conteudos_gerados(categoria_id);
 CREATE INDEX IF NOT EXISTS idx_conteudos_palavra_chave ON conteudos_gerados(palavra_chave);
 CREATE INDEX IF NOT EXISTS idx_conteudos_criado_em ON conteudos_gerados(criado_em DESC);
 
+-- Índices para a paginação do histórico por (criado_em, id)
+CREATE INDEX IF NOT EXISTS idx_conteudos_pagina ON conteudos_gerados(criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_conteudos_projeto_pagina ON conteudos_gerados(projeto_id, criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_conteudos_categoria_pagina ON conteudos_gerados(categoria_id, criado_em DESC, id DESC);
+
 -- Índice para busca full-text no conteúdo
 CREATE INDEX IF NOT EXISTS idx_conteudos_busca ON conteudos_gerados USING gin(to_tsvector('portuguese', conteudo));
 
@@ -82,6 +94,7 @@ CREATE TABLE IF NOT EXISTS imagens_geradas (
 );
 
 CREATE INDEX IF NOT EXISTS idx_imagens_conteudo ON imagens_geradas(conteudo_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_imagens_conteudo_arquivo ON imagens_geradas(conteudo_id, nome_arquivo);
 
 -- ================================================
 -- 5. FUNÇÕES AUXILIARES
@@ -96,12 +109,14 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Triggers para atualização automática
+-- Triggers para atualização automática (recriados para o script poder ser executado de novo)
+DROP TRIGGER IF EXISTS trigger_atualizar_projeto ON projetos;
 CREATE TRIGGER trigger_atualizar_projeto
 BEFORE UPDATE ON projetos
 FOR EACH ROW
 EXECUTE FUNCTION atualizar_timestamp();
 
+DROP TRIGGER IF EXISTS trigger_atualizar_categoria ON categorias;
 CREATE TRIGGER trigger_atualizar_categoria
 BEFORE UPDATE ON categorias
 FOR EACH ROW
@@ -111,20 +126,34 @@ EXECUTE FUNCTION atualizar_timestamp();
 -- 6. VIEWS ÚTEIS
 -- ================================================
 
--- View com estatísticas por projeto
-CREATE OR REPLACE VIEW estatisticas_projetos AS
+-- View com estatísticas por projeto (usada por SupabaseHandler.obter_estatisticas_projeto)
+-- Categorias e conteúdos são agregados separadamente: um JOIN direto das duas
+-- tabelas multiplicaria as linhas e inflaria o total de palavras
+DROP VIEW IF EXISTS estatisticas_projetos;
+CREATE VIEW estatisticas_projetos AS
 SELECT 
     p.id,
     p.nome,
     p.descricao,
-    COUNT(DISTINCT c.id) as total_categorias,
-    COUNT(DISTINCT cg.id) as total_conteudos,
-    SUM((cg.estatisticas->>'total_palavras')::int) as total_palavras,
-    MAX(cg.criado_em) as ultimo_conteudo
+    COALESCE(c.total_categorias, 0) as total_categorias,
+    COALESCE(cg.total_conteudos, 0) as total_conteudos,
+    COALESCE(cg.total_palavras, 0) as total_palavras,
+    cg.ultimo_conteudo
 FROM projetos p
-LEFT JOIN categorias c ON p.id = c.projeto_id
-LEFT JOIN conteudos_gerados cg ON p.id = cg.projeto_id
-GROUP BY p.id, p.nome, p.descricao;
+LEFT JOIN (
+    SELECT projeto_id, COUNT(*) as total_categorias
+    FROM categorias
+    GROUP BY projeto_id
+) c ON c.projeto_id = p.id
+LEFT JOIN (
+    SELECT 
+        projeto_id,
+        COUNT(*) as total_conteudos,
+        SUM((estatisticas->>'total_palavras')::int) as total_palavras,
+        MAX(criado_em) as ultimo_conteudo
+    FROM conteudos_gerados
+    GROUP BY projeto_id
+) cg ON cg.projeto_id = p.id;
 
 -- View com últimos conteúdos gerados
 CREATE OR REPLACE VIEW ultimos_conteudos AS
@@ -153,6 +182,10 @@ ALTER TABLE conteudos_gerados ENABLE ROW LEVEL SECURITY;
 ALTER TABLE imagens_geradas ENABLE ROW LEVEL SECURITY;
 
 -- Políticas de acesso (permitir tudo por enquanto - ajuste conforme necessário)
+DROP POLICY IF EXISTS "Permitir acesso total a projetos" ON projetos;
+DROP POLICY IF EXISTS "Permitir acesso total a categorias" ON categorias;
+DROP POLICY IF EXISTS "Permitir acesso total a conteudos" ON conteudos_gerados;
+DROP POLICY IF EXISTS "Permitir acesso total a imagens" ON imagens_geradas;
 CREATE POLICY "Permitir acesso total a projetos" ON projetos FOR ALL USING (true);
 CREATE POLICY "Permitir acesso total a categorias" ON categorias FOR ALL USING (true);
 CREATE POLICY "Permitir acesso total a conteudos" ON conteudos_gerados FOR ALL USING (true);
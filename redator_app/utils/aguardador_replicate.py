@@ -0,0 +1,298 @@
+"""
+Aguardador Replicate
+Acompanha as predições do Replicate até a conclusão. Uma única thread
+consulta todas as predições pendentes do processo (cada uma com seu próprio
+intervalo, que cresce enquanto ela não termina) e, opcionalmente, um
+receptor local de webhooks antecipa a consulta assim que o Replicate avisa
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import requests
+
+from utils.http_sessao import obter_sessao, timeout
+
+# Estados finais de uma predição no Replicate
+STATUS_FINAIS = {"succeeded", "failed", "canceled"}
+
+_aguardador: Optional["AguardadorReplicate"] = None
+_lock_aguardador = threading.Lock()
+
+
+def obter_aguardador() -> "AguardadorReplicate":
+    """Retorna o aguardador do processo, criando-o na primeira chamada"""
+    global _aguardador
+    with _lock_aguardador:
+        if _aguardador is None:
+            _aguardador = AguardadorReplicate()
+        return _aguardador
+
+
+class AguardadorReplicate:
+    """Resolve predições do Replicate por webhook ou por polling adaptativo"""
+
+    def __init__(
+        self,
+        intervalo_inicial_s: float = 0.5,
+        intervalo_max_s: float = 5.0,
+        fator: float = 1.5,
+        webhook_url: str = None,
+        webhook_porta: int = None,
+        webhook_segredo: str = None
+    ):
+        """
+        Inicializa o aguardador
+
+        Args:
+            intervalo_inicial_s: Primeira espera entre consultas de uma predição
+            intervalo_max_s: Teto da espera entre consultas
+            fator: Multiplicador da espera a cada consulta sem conclusão
+            webhook_url: URL pública que encaminha para o receptor local
+                         (padrão: REPLICATE_WEBHOOK_URL; sem ela, só polling)
+            webhook_porta: Porta local do receptor (padrão: REPLICATE_WEBHOOK_PORTA ou 8765)
+            webhook_segredo: Segredo de assinatura dos webhooks (padrão: REPLICATE_WEBHOOK_SECRET).
+                             Obrigatório com webhook_url: sem ele, o receptor não sobe
+                             e só o polling é usado
+        """
+        self.intervalo_inicial_s = intervalo_inicial_s
+        self.intervalo_max_s = intervalo_max_s
+        self.fator = fator
+        self.webhook_url = webhook_url or os.getenv("REPLICATE_WEBHOOK_URL") or None
+        self.webhook_porta = webhook_porta or int(os.getenv("REPLICATE_WEBHOOK_PORTA", "8765"))
+        self.webhook_segredo = webhook_segredo or os.getenv("REPLICATE_WEBHOOK_SECRET") or None
+
+        # Conexões reaproveitadas entre as consultas
+        self._sessao = obter_sessao()
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        # id da predição → {future, url, headers, intervalo, proxima, prazo}
+        self._pendentes: Dict[str, Dict] = {}
+
+        self._thread = threading.Thread(target=self._loop, name="aguardador-replicate", daemon=True)
+        self._thread.start()
+
+        self._servidor = None
+        if self.webhook_url and not self.webhook_segredo:
+            print("⚠️ REPLICATE_WEBHOOK_URL sem REPLICATE_WEBHOOK_SECRET: webhooks desativados, usando polling")
+        elif self.webhook_url:
+            self._iniciar_receptor()
+
+    # ------------------------------------------------------------------
+    # Registro das predições
+    # ------------------------------------------------------------------
+
+    def aguardar(self, prediction: Dict, headers: Dict, timeout_s: float = 120.0) -> Future:
+        """
+        Passa a acompanhar uma predição
+
+        Args:
+            prediction: Resposta do Replicate ao criar a predição
+            headers: Headers de autenticação para as consultas
+            timeout_s: Prazo máximo até a conclusão
+
+        Returns:
+            Future resolvido com a predição final (status succeeded, failed ou canceled)
+        """
+        futuro = Future()
+
+        if prediction.get("status") in STATUS_FINAIS:
+            futuro.set_result(prediction)
+            return futuro
+
+        # Com webhook ativo, o polling vira só uma rede de segurança
+        intervalo = self.intervalo_max_s if self._servidor else self.intervalo_inicial_s
+        agora = time.monotonic()
+
+        with self._lock:
+            self._pendentes[prediction["id"]] = {
+                "futuro": futuro,
+                "url": prediction["urls"]["get"],
+                "headers": headers,
+                "intervalo": intervalo,
+                "proxima": agora + intervalo,
+                "prazo": agora + timeout_s
+            }
+
+        self._acordar.set()
+        return futuro
+
+    def pendentes(self) -> int:
+        """Número de predições ainda em andamento"""
+        with self._lock:
+            return len(self._pendentes)
+
+    def _antecipar(self, prediction_id: str):
+        """Agenda a consulta de uma predição para agora (aviso do webhook)"""
+        with self._lock:
+            pendente = self._pendentes.get(prediction_id)
+            if pendente is None:
+                return
+            pendente["proxima"] = time.monotonic()
+
+        self._acordar.set()
+
+    def _resolver(self, prediction_id: str, prediction: Dict = None, erro: Exception = None):
+        """Conclui o Future de uma predição (uma única vez)"""
+        with self._lock:
+            pendente = self._pendentes.pop(prediction_id, None)
+
+        if pendente is None:
+            return
+
+        if erro is not None:
+            pendente["futuro"].set_exception(erro)
+        else:
+            pendente["futuro"].set_result(prediction)
+
+    # ------------------------------------------------------------------
+    # Polling adaptativo
+    # ------------------------------------------------------------------
+
+    def _loop(self):
+        while True:
+            try:
+                espera = self._consultar_vencidas()
+            except Exception as e:
+                print(f"⚠️ Erro ao acompanhar predições do Replicate: {e}")
+                espera = self.intervalo_max_s
+
+            self._acordar.wait(espera)
+            self._acordar.clear()
+
+    def _consultar_vencidas(self) -> Optional[float]:
+        """
+        Consulta as predições cujo intervalo venceu
+
+        Returns:
+            Segundos até a próxima consulta, ou None se não houver predições
+        """
+        agora = time.monotonic()
+        with self._lock:
+            vencidas = [
+                (pid, dict(p)) for pid, p in self._pendentes.items()
+                if p["proxima"] <= agora or p["prazo"] <= agora
+            ]
+
+        for prediction_id, pendente in vencidas:
+            if agora >= pendente["prazo"]:
+                self._resolver(prediction_id, erro=TimeoutError("Timeout waiting for image generation"))
+                continue
+
+            try:
+                response = self._sessao.get(pendente["url"], headers=pendente["headers"], timeout=timeout(10))
+            except requests.RequestException:
+                response = None
+
+            if response is not None and response.status_code == 200:
+                prediction = response.json()
+                if prediction.get("status") in STATUS_FINAIS:
+                    self._resolver(prediction_id, prediction)
+                    continue
+            elif response is not None and response.status_code not in (429, 500, 502, 503, 504):
+                self._resolver(
+                    prediction_id, erro=Exception(f"Error checking status: {response.status_code}")
+                )
+                continue
+
+            # Ainda processando (ou erro temporário): esperar mais da próxima vez
+            with self._lock:
+                if prediction_id in self._pendentes:
+                    atual = self._pendentes[prediction_id]
+                    atual["intervalo"] = min(self.intervalo_max_s, atual["intervalo"] * self.fator)
+                    atual["proxima"] = time.monotonic() + atual["intervalo"]
+
+        with self._lock:
+            if not self._pendentes:
+                return None
+            proxima = min(min(p["proxima"], p["prazo"]) for p in self._pendentes.values())
+
+        return max(0.0, proxima - time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Webhook
+    # ------------------------------------------------------------------
+
+    def parametros_webhook(self) -> Dict:
+        """Campos a incluir no payload da predição para receber o webhook (vazio se desativado)"""
+        if not self._servidor:
+            return {}
+        return {"webhook": self.webhook_url, "webhook_events_filter": ["completed"]}
+
+    def _assinatura_valida(self, headers, corpo: bytes) -> bool:
+        """Verifica a assinatura HMAC-SHA256 enviada pelo Replicate (webhook-signature)"""
+        if not self.webhook_segredo:
+            return False
+
+        webhook_id = headers.get("webhook-id", "")
+        timestamp = headers.get("webhook-timestamp", "")
+        assinaturas = headers.get("webhook-signature", "")
+
+        try:
+            if abs(time.time() - int(timestamp)) > 300:
+                return False
+        except ValueError:
+            return False
+
+        segredo = base64.b64decode(self.webhook_segredo.split("_", 1)[-1])
+        conteudo = f"{webhook_id}.{timestamp}.".encode() + corpo
+        esperada = base64.b64encode(hmac.new(segredo, conteudo, hashlib.sha256).digest()).decode()
+
+        return any(
+            hmac.compare_digest(esperada, assinatura.split(",", 1)[-1])
+            for assinatura in assinaturas.split()
+        )
+
+    def _iniciar_receptor(self):
+        """
+        Sobe o servidor HTTP local que recebe os webhooks de conclusão
+
+        O webhook só acorda o polling: o resultado é sempre lido da API do
+        Replicate (urls.get registrada em aguardar), nunca do corpo recebido.
+        """
+        aguardador = self
+
+        class Receptor(BaseHTTPRequestHandler):
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+                if not aguardador._assinatura_valida(self.headers, corpo):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                try:
+                    prediction = json.loads(corpo)
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                if isinstance(prediction, dict) and prediction.get("status") in STATUS_FINAIS:
+                    aguardador._antecipar(prediction.get("id"))
+
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._servidor = ThreadingHTTPServer(("0.0.0.0", self.webhook_porta), Receptor)
+        except OSError as e:
+            print(f"⚠️ Receptor de webhooks do Replicate indisponível (porta {self.webhook_porta}): {e}")
+            self._servidor = None
+            return
+
+        threading.Thread(
+            target=self._servidor.serve_forever, name="webhook-replicate", daemon=True
+        ).start()
+        print(f"✅ Recebendo webhooks do Replicate na porta {self.webhook_porta}")
@@ -0,0 +1,118 @@
+"""
+Buffer de Conteúdos
+Acumula os artigos gerados e grava o histórico no Supabase em inserts de
+várias linhas, por tamanho ou por tempo, em vez de uma ida ao banco por artigo
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+
+class BufferConteudos:
+    """Fila em memória de conteúdos a gravar no histórico do Supabase"""
+
+    def __init__(self, supabase_handler, tamanho_lote: int = None, intervalo_s: float = None):
+        """
+        Inicializa o buffer e a thread que o descarrega periodicamente
+
+        Args:
+            supabase_handler: SupabaseHandler conectado
+            tamanho_lote: Itens por insert; atingido esse número o buffer é
+                          descarregado na hora (padrão: BUFFER_HISTORICO_TAMANHO ou 25)
+            intervalo_s: Intervalo máximo entre descargas
+                         (padrão: BUFFER_HISTORICO_INTERVALO_S ou 5)
+        """
+        self.supabase = supabase_handler
+        self.tamanho_lote = tamanho_lote or int(os.getenv("BUFFER_HISTORICO_TAMANHO", "25"))
+        self.intervalo_s = intervalo_s or float(os.getenv("BUFFER_HISTORICO_INTERVALO_S", "5"))
+
+        self._pendentes: List[Dict] = []
+        self._lock = threading.Lock()
+        self._lock_envio = threading.Lock()
+        self._acordar = threading.Event()
+        self._fechado = False
+
+        self._thread = threading.Thread(target=self._loop, name="buffer-conteudos", daemon=True)
+        self._thread.start()
+
+        # Não perder o que estiver no buffer quando o processo terminar
+        atexit.register(self.fechar)
+
+    @property
+    def pendentes(self) -> int:
+        """Número de conteúdos aguardando gravação"""
+        with self._lock:
+            return len(self._pendentes)
+
+    def adicionar(self, projeto: str, categoria: str, palavra_chave: str, conteudo_data: Dict) -> bool:
+        """Coloca um conteúdo no buffer (a gravação acontece na próxima descarga)"""
+        item = {
+            "projeto": projeto,
+            "categoria": categoria,
+            "palavra_chave": palavra_chave,
+            "conteudo_data": dict(conteudo_data),
+            # Fixado aqui para que um reenvio grave exatamente a mesma linha
+            "criado_em": datetime.now().isoformat()
+        }
+
+        with self._lock:
+            self._pendentes.append(item)
+            cheio = len(self._pendentes) >= self.tamanho_lote
+
+        if cheio:
+            self._acordar.set()
+        return True
+
+    def _loop(self):
+        """Descarrega o buffer a cada intervalo ou quando ele enche"""
+        while not self._fechado:
+            self._acordar.wait(self.intervalo_s)
+            self._acordar.clear()
+            if not self._fechado:
+                self.descarregar()
+
+    def descarregar(self) -> int:
+        """
+        Grava tudo o que está no buffer
+
+        Se um insert falhar, os itens restantes voltam para o buffer e são
+        reenviados na próxima descarga (o hash do conteúdo evita duplicatas).
+
+        Returns:
+            int: número de conteúdos gravados
+        """
+        with self._lock_envio:
+            with self._lock:
+                lote = self._pendentes
+                self._pendentes = []
+
+            gravados = 0
+            for inicio in range(0, len(lote), self.tamanho_lote):
+                parte = lote[inicio:inicio + self.tamanho_lote]
+
+                if not self.supabase.salvar_conteudos_em_lote(parte):
+                    with self._lock:
+                        self._pendentes[:0] = lote[inicio:]
+                    break
+
+                gravados += len(parte)
+
+            return gravados
+
+    def fechar(self):
+        """Para a thread de descarga e grava o que restar"""
+        if self._fechado:
+            return
+
+        self._fechado = True
+        self._acordar.set()
+        self._thread.join(timeout=self.intervalo_s + 5)
+
+        self.descarregar()
+
+        restantes = self.pendentes
+        if restantes:
+            print(f"⚠️ {restantes} conteúdos não puderam ser salvos no histórico")
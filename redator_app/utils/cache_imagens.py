@@ -0,0 +1,206 @@
+"""
+Cache de Imagens
+Guarda as imagens geradas endereçadas pelo conteúdo do pedido (provedor,
+modelo, prompt e tamanho): regenerar um artigo com o mesmo prompt devolve o
+arquivo existente em vez de pagar outra geração. Os arquivos ficam em
+subpastas por prefixo do hash e, acima do orçamento de disco, os menos
+usados recentemente são apagados
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class CacheImagens:
+    """Cache de imagens em disco com limite de tamanho (LRU)"""
+
+    def __init__(self, diretorio: str = None, max_mb: float = None):
+        """
+        Inicializa o cache
+
+        Args:
+            diretorio: Pasta do cache (padrão: redator_app/imagens_geradas/cache)
+            max_mb: Orçamento de disco em MB (padrão: IMAGEM_CACHE_MAX_MB ou 500)
+        """
+        if diretorio is None:
+            diretorio = Path(__file__).parent.parent / "imagens_geradas" / "cache"
+        if max_mb is None:
+            max_mb = float(os.getenv("IMAGEM_CACHE_MAX_MB", "500"))
+
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.diretorio / "indice.db"
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+
+        self._inicializar_banco()
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão por operação (seguro entre threads) e faz commit ao sair"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _inicializar_banco(self):
+        """Cria a tabela do índice se não existir"""
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS imagens (
+                    chave TEXT PRIMARY KEY,
+                    caminho TEXT NOT NULL,
+                    provedor TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    tamanho_bytes INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_imagens_acessado ON imagens(acessado_em)")
+
+    @staticmethod
+    def chave(provedor: str, modelo: str, prompt: str, tamanho: str) -> str:
+        """
+        Chave de uma imagem
+
+        Args:
+            provedor: Ex.: "openai", "replicate", "texto"
+            modelo: Modelo e parâmetros que mudam o resultado
+            prompt: Prompt enviado ao provedor
+            tamanho: Tamanho final da imagem (ex.: "1200x630")
+        """
+        hash_prompt = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{provedor}|{modelo}|{hash_prompt}|{tamanho}".encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave: str, nome: str = None, extensao: str = ".png") -> Path:
+        """Arquivo da imagem, em subpastas pelos 4 primeiros caracteres do hash"""
+        arquivo = f"{nome}_{chave[:16]}{extensao}" if nome else f"{chave}{extensao}"
+        return self.diretorio / chave[:2] / chave[2:4] / arquivo
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Busca uma imagem no cache
+
+        Returns:
+            str com o caminho da imagem, ou None se não estiver no cache
+        """
+        try:
+            with self._conectar() as conn:
+                linha = conn.execute("SELECT caminho FROM imagens WHERE chave = ?", (chave,)).fetchone()
+
+                if linha and Path(linha[0]).exists():
+                    conn.execute("UPDATE imagens SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+                    with self._lock:
+                        self.acertos += 1
+                    return linha[0]
+
+                if linha:
+                    # O arquivo foi apagado por fora do cache
+                    conn.execute("DELETE FROM imagens WHERE chave = ?", (chave,))
+        except Exception as e:
+            print(f"Erro ao ler cache de imagens: {e}")
+
+        with self._lock:
+            self.falhas += 1
+        return None
+
+    def salvar(self, chave: str, dados: bytes, provedor: str, modelo: str, nome: str = None,
+               extensao: str = ".png") -> str:
+        """
+        Guarda uma imagem no cache e aplica o orçamento de disco
+
+        Args:
+            chave: Chave da imagem (veja chave())
+            dados: Bytes da imagem
+            provedor: Provedor que gerou a imagem
+            modelo: Modelo usado
+            nome: Prefixo legível do nome do arquivo (ex.: título sanitizado)
+            extensao: Extensão do arquivo (ex.: ".png", ".webp")
+
+        Returns:
+            str com o caminho da imagem
+        """
+        caminho = self._caminho(chave, nome, extensao)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        # Escrita atômica: quem ler o cache nunca vê um arquivo pela metade
+        temporario = caminho.with_name(f".{caminho.name}.{threading.get_ident()}.tmp")
+        with open(temporario, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, caminho)
+
+        agora = time.time()
+        try:
+            with self._conectar() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO imagens
+                        (chave, caminho, provedor, modelo, tamanho_bytes, criado_em, acessado_em)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (chave, str(caminho), provedor, modelo, len(dados), agora, agora)
+                )
+                self._aplicar_limite(conn, manter=chave)
+        except Exception as e:
+            print(f"Erro ao salvar cache de imagens: {e}")
+
+        return str(caminho)
+
+    def _aplicar_limite(self, conn, manter: str = None):
+        """Apaga as imagens menos usadas até o total caber no orçamento"""
+        total = conn.execute("SELECT COALESCE(SUM(tamanho_bytes), 0) FROM imagens").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for chave, caminho, tamanho in conn.execute(
+            "SELECT chave, caminho, tamanho_bytes FROM imagens ORDER BY acessado_em"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            if chave == manter:
+                continue
+
+            try:
+                Path(caminho).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Erro ao remover imagem do cache: {e}")
+                continue
+
+            conn.execute("DELETE FROM imagens WHERE chave = ?", (chave,))
+            total -= tamanho
+
+    def estatisticas(self) -> Dict:
+        """Retorna acertos, falhas, taxa de acerto, total de imagens e MB em disco"""
+        with self._conectar() as conn:
+            entradas, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho_bytes), 0) FROM imagens"
+            ).fetchone()
+
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 3) if consultas else 0.0,
+                "entradas": entradas,
+                "mb": round(total / (1024 * 1024), 1)
+            }
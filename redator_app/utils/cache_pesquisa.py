@@ -0,0 +1,194 @@
+"""
+Cache de Pesquisa
+Guarda em disco (SQLite) os resultados do AgentePesquisador para evitar
+refazer a mesma pesquisa (GPT-4 + Tavily) em regenerações e variantes
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class CachePesquisa:
+    """Cache persistente de pesquisas com expiração (TTL) e limite de tamanho"""
+
+    def __init__(
+        self,
+        db_path: str = None,
+        ttl_horas: float = None,
+        max_entradas: int = None
+    ):
+        """
+        Inicializa o cache
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: memoria/dados/cache_pesquisa.db)
+            ttl_horas: Validade de uma pesquisa em horas (padrão: PESQUISA_CACHE_TTL_HORAS ou 24)
+            max_entradas: Máximo de pesquisas guardadas (padrão: PESQUISA_CACHE_MAX_ENTRADAS ou 500)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / "memoria" / "dados" / "cache_pesquisa.db"
+        if ttl_horas is None:
+            ttl_horas = float(os.getenv("PESQUISA_CACHE_TTL_HORAS", "24"))
+        if max_entradas is None:
+            max_entradas = int(os.getenv("PESQUISA_CACHE_MAX_ENTRADAS", "500"))
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_horas = ttl_horas
+        self.max_entradas = max_entradas
+
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+
+        self._inicializar_banco()
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão por operação (seguro entre threads) e faz commit ao sair"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _inicializar_banco(self):
+        """Cria a tabela do cache se não existir"""
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pesquisas (
+                    chave TEXT PRIMARY KEY,
+                    palavra_chave TEXT NOT NULL,
+                    profundidade TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_acessado ON pesquisas(acessado_em)")
+
+    @staticmethod
+    def normalizar(palavra_chave: str) -> str:
+        """Normaliza a palavra-chave (minúsculas, sem acentos, espaços simples)"""
+        texto = unicodedata.normalize("NFKD", palavra_chave.casefold())
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return " ".join(texto.split())
+
+    def _chave(self, palavra_chave: str, profundidade: str) -> str:
+        return f"{self.normalizar(palavra_chave)}|{profundidade}"
+
+    def obter(
+        self,
+        palavra_chave: str,
+        profundidade: str = "detalhada",
+        max_idade_horas: float = None
+    ) -> Optional[Dict]:
+        """
+        Busca uma pesquisa ainda válida no cache
+
+        Args:
+            palavra_chave: Termo pesquisado
+            profundidade: "rapida" ou "detalhada"
+            max_idade_horas: Janela de frescor desta consulta (padrão: ttl_horas)
+
+        Returns:
+            dict com o resultado da pesquisa, ou None se não houver pesquisa válida
+        """
+        if max_idade_horas is None:
+            max_idade_horas = self.ttl_horas
+
+        chave = self._chave(palavra_chave, profundidade)
+        agora = time.time()
+
+        try:
+            with self._conectar() as conn:
+                linha = conn.execute(
+                    "SELECT resultado, criado_em FROM pesquisas WHERE chave = ?",
+                    (chave,)
+                ).fetchone()
+
+                if linha and agora - linha[1] <= max_idade_horas * 3600:
+                    conn.execute("UPDATE pesquisas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                    with self._lock:
+                        self.acertos += 1
+                    return json.loads(linha[0])
+        except Exception as e:
+            print(f"Erro ao ler cache de pesquisa: {e}")
+
+        with self._lock:
+            self.falhas += 1
+        return None
+
+    def salvar(self, palavra_chave: str, profundidade: str, resultado: Dict):
+        """Guarda uma pesquisa no cache e aplica os limites de validade e tamanho"""
+        agora = time.time()
+
+        try:
+            with self._conectar() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO pesquisas
+                        (chave, palavra_chave, profundidade, resultado, criado_em, acessado_em)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        self._chave(palavra_chave, profundidade),
+                        palavra_chave,
+                        profundidade,
+                        json.dumps(resultado, ensure_ascii=False),
+                        agora,
+                        agora
+                    )
+                )
+                self._aplicar_limites(conn, agora)
+        except Exception as e:
+            print(f"Erro ao salvar cache de pesquisa: {e}")
+
+    def _aplicar_limites(self, conn, agora: float):
+        """Remove pesquisas expiradas e, acima do limite, as menos usadas"""
+        conn.execute("DELETE FROM pesquisas WHERE criado_em < ?", (agora - self.ttl_horas * 3600,))
+        conn.execute(
+            """
+            DELETE FROM pesquisas WHERE chave IN (
+                SELECT chave FROM pesquisas
+                ORDER BY acessado_em DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entradas,)
+        )
+
+    def invalidar(self, palavra_chave: str = None, profundidade: str = "detalhada"):
+        """Remove uma pesquisa do cache (ou todas, se palavra_chave for None)"""
+        with self._conectar() as conn:
+            if palavra_chave is None:
+                conn.execute("DELETE FROM pesquisas")
+            else:
+                conn.execute("DELETE FROM pesquisas WHERE chave = ?", (self._chave(palavra_chave, profundidade),))
+
+    def estatisticas(self) -> Dict:
+        """Retorna acertos, falhas, taxa de acerto e total de entradas"""
+        with self._conectar() as conn:
+            entradas = conn.execute("SELECT COUNT(*) FROM pesquisas").fetchone()[0]
+
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 3) if consultas else 0.0,
+                "entradas": entradas
+            }
@@ -3,18 +3,39 @@ Google Docs Handler
 Gerencia a criação e formatação de documentos no Google Docs
 """
 
+import io
 import os
+import re
 import json
+import mimetypes
+from collections import OrderedDict
 from pathlib import Path
+from typing import Union
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
 from dotenv import load_dotenv
 
+from utils.indice_drive import IndiceImagensDrive, hash_conteudo
+from utils.renderizador_html import imagem_data_uri, markdown_para_html
+
 load_dotenv()
 
+LISTA_NUMERADA = re.compile(r'^\d+\.\s+')
+NEGRITO = re.compile(r'\*\*(.+?)\*\*')
+
+# Limite do upload multipart do Drive; acima disso o upload é resumable
+LIMITE_UPLOAD_MULTIPART = 5 * 1024 * 1024
+
+
+def _tamanho_utf16(texto: str) -> int:
+    """Tamanho do texto em unidades UTF-16 (a unidade dos índices do Google Docs)"""
+    return len(texto.encode('utf-16-le')) // 2
+
+
 class GoogleDocsHandler:
     """Gerencia integração com Google Docs e Drive"""
     
@@ -24,17 +45,33 @@ class GoogleDocsHandler:
         'https://www.googleapis.com/auth/drive.file'
     ]
     
-    def __init__(self, credentials_path: str = None):
+    # Permissão de leitura pública (imagens inseridas nos documentos)
+    PERMISSAO_PUBLICA = {'type': 'anyone', 'role': 'reader'}
+    
+    def __init__(self, credentials_path: str = None, metodo_publicacao: str = None):
         """
         Inicializa o handler do Google Docs
         
         Args:
             credentials_path: Caminho para o arquivo credentials.json
+            metodo_publicacao: "docs" (documento vazio + batchUpdate) ou "html"
+                               (um único upload de HTML convertido pelo Drive).
+                               Padrão: GOOGLE_DOCS_METODO ou "docs"
         """
         if credentials_path is None:
             credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'config/credentials.json')
         
+        if metodo_publicacao is None:
+            metodo_publicacao = os.getenv('GOOGLE_DOCS_METODO', 'docs')
+        if metodo_publicacao not in ('docs', 'html'):
+            raise ValueError(f"GOOGLE_DOCS_METODO inválido: {metodo_publicacao} (use 'docs' ou 'html')")
+        
         self.credentials_path = credentials_path
+        self.metodo_publicacao = metodo_publicacao
+        self.indice_imagens = IndiceImagensDrive()
+        # Imagens servidas pelo índice sem consultar o Drive: URL → (hash, bytes, nome),
+        # para reenviar se o documento não conseguir usar o arquivo (apagado do Drive)
+        self._imagens_reaproveitadas = OrderedDict()
         self.creds = None
         self.docs_service = None
         self.drive_service = None
@@ -76,7 +113,9 @@ class GoogleDocsHandler:
         self, 
         titulo: str, 
         conteudo: str, 
-        imagem_path: str = None
+        imagem_path: str = None,
+        imagem_url: str = None,
+        imagem_dados: bytes = None
     ) -> str:
         """
         Cria um novo documento no Google Docs com formatação
@@ -85,95 +124,276 @@ class GoogleDocsHandler:
             titulo: Título do documento
             conteudo: Conteúdo em Markdown
             imagem_path: Caminho para a imagem de destaque (opcional)
+            imagem_url: URL de uma imagem já enviada com enviar_imagem (opcional,
+                        evita um novo upload quando a imagem subiu em paralelo)
+            imagem_dados: Bytes da imagem de imagem_path já em memória (opcional;
+                          a imagem pode nem estar gravada em disco)
             
         Returns:
             str: URL do documento criado
         """
+        if self.metodo_publicacao == 'html':
+            return self.criar_documento_html(titulo, conteudo, imagem_path, imagem_url, imagem_dados)
         
         # Criar documento vazio
         doc = self.docs_service.documents().create(body={'title': titulo}).execute()
         document_id = doc.get('documentId')
         
-        # Preparar requisições de formatação
-        requests = []
-        
-        # 1. Inserir imagem (se fornecida)
-        if imagem_path and Path(imagem_path).exists():
+        image_url = imagem_url
+        if not image_url and imagem_dados:
+            image_url = self.enviar_imagem(imagem_dados, nome=Path(imagem_path).name if imagem_path else None)
+        elif not image_url and imagem_path:
             # Fazer upload da imagem para o Drive
-            image_url = self._upload_imagem(imagem_path)
-            
-            if image_url:
-                requests.append({
-                    'insertInlineImage': {
-                        'location': {'index': 1},
-                        'uri': image_url,
-                        'objectSize': {
-                            'height': {'magnitude': 300, 'unit': 'PT'},
-                            'width': {'magnitude': 600, 'unit': 'PT'}
-                        }
-                    }
-                })
-                
-                # Adicionar quebra de linha após imagem
-                requests.append({
-                    'insertText': {
-                        'location': {'index': 1},
-                        'text': '\n\n'
-                    }
-                })
+            image_url = self.enviar_imagem(imagem_path)
         
-        # 2. Converter Markdown para formato Google Docs
-        formatted_requests = self._markdown_para_docs(conteudo, 1)
-        requests.extend(formatted_requests)
-        
-        # Executar todas as formatações
-        if requests:
+        # Executar todas as formatações (o batchUpdate é atômico: se falhar, nada foi aplicado)
+        try:
+            self.docs_service.documents().batchUpdate(
+                documentId=document_id,
+                body={'requests': self.montar_requisicoes(conteudo, image_url)}
+            ).execute()
+        except HttpError as e:
+            nova_url = self.reenviar_imagem(image_url) if self.imagem_indisponivel(e) else None
+            if not nova_url:
+                raise
             self.docs_service.documents().batchUpdate(
                 documentId=document_id,
-                body={'requests': requests}
+                body={'requests': self.montar_requisicoes(conteudo, nova_url)}
             ).execute()
         
         # Retornar URL do documento
+        return self.url_documento(document_id)
+    
+    @staticmethod
+    def url_documento(document_id: str) -> str:
+        """URL de edição de um documento"""
         return f"https://docs.google.com/document/d/{document_id}/edit"
     
-    def _upload_imagem(self, imagem_path: str) -> str:
-        """Faz upload da imagem para o Google Drive e retorna a URL"""
+    @staticmethod
+    def url_imagem(file_id: str) -> str:
+        """URL direta de uma imagem pública no Drive"""
+        return f"https://drive.google.com/uc?export=view&id={file_id}"
+    
+    def montar_requisicoes(self, conteudo: str, image_url: str = None) -> list:
+        """
+        Requisições do batchUpdate que preenchem um documento vazio
+        
+        Args:
+            conteudo: Conteúdo em Markdown
+            image_url: URL pública da imagem de destaque (opcional)
+            
+        Returns:
+            list: Lista de requisições para a API
+        """
+        # 1. Converter Markdown para formato Google Docs (texto + estilos por intervalo)
+        requests = self._markdown_para_docs(conteudo, 1)
+        
+        # 2. Inserir imagem no topo (se fornecida), depois do texto já formatado
+        if image_url:
+            # Quebra de linha entre a imagem e o texto
+            requests.append({
+                'insertText': {
+                    'location': {'index': 1},
+                    'text': '\n'
+                }
+            })
+            requests.append({
+                'updateParagraphStyle': {
+                    'range': {'startIndex': 1, 'endIndex': 2},
+                    'paragraphStyle': {'namedStyleType': 'NORMAL_TEXT'},
+                    'fields': 'namedStyleType'
+                }
+            })
+
+            requests.append({
+                'insertInlineImage': {
+                    'location': {'index': 1},
+                    'uri': image_url,
+                    'objectSize': {
+                        'height': {'magnitude': 300, 'unit': 'PT'},
+                        'width': {'magnitude': 600, 'unit': 'PT'}
+                    }
+                }
+            })
+        
+        return requests
+    
+    def criar_documento_html(
+        self,
+        titulo: str,
+        conteudo: str,
+        imagem_path: str = None,
+        imagem_url: str = None,
+        imagem_dados: bytes = None
+    ) -> str:
+        """
+        Cria o documento com um único upload de HTML convertido pelo Drive
+        
+        O artigo é renderizado localmente (tabelas e negrito incluídos) com a
+        imagem embutida em base64, então não há upload de imagem, permissão
+        pública nem batchUpdate.
+        
+        Args:
+            titulo: Título do documento
+            conteudo: Conteúdo em Markdown
+            imagem_path: Imagem local a embutir no documento (opcional)
+            imagem_url: URL pública da imagem, usada se não houver arquivo local (opcional)
+            imagem_dados: Bytes da imagem de imagem_path já em memória (opcional)
+            
+        Returns:
+            str: URL do documento criado
+        """
+        file = self.requisicao_documento_html(
+            self.drive_service, titulo, conteudo, imagem_path, imagem_url, imagem_dados
+        ).execute()
+        
+        return self.url_documento(file.get('id'))
+    
+    @staticmethod
+    def requisicao_documento_html(drive_service, titulo: str, conteudo: str,
+                                  imagem_path: str = None, imagem_url: str = None,
+                                  imagem_dados: bytes = None):
+        """Requisição files.create (ainda não executada) que importa o artigo como Google Doc"""
+        imagem_src = imagem_data_uri(imagem_path, imagem_dados) or imagem_url
+        documento_html = markdown_para_html(conteudo, titulo=titulo, imagem_src=imagem_src)
+        
+        media = MediaIoBaseUpload(
+            io.BytesIO(documento_html.encode('utf-8')),
+            mimetype='text/html',
+            resumable=False
+        )
+        
+        return drive_service.files().create(
+            body={
+                'name': titulo,
+                'mimeType': 'application/vnd.google-apps.document'
+            },
+            media_body=media,
+            fields='id'
+        )
+    
+    def enviar_imagem(self, imagem: Union[str, bytes], nome: str = None) -> str:
+        """
+        Envia a imagem de destaque para o Drive antes da criação do documento
+
+        Permite que o upload rode em paralelo com a redação; a URL retornada
+        é passada depois para criar_documento(imagem_url=...). Uma imagem com o
+        mesmo conteúdo de outra já enviada reaproveita o arquivo existente.
+
+        Args:
+            imagem: Caminho do arquivo ou os bytes da imagem (ex.: GeradorImagem.obter_bytes)
+            nome: Nome do arquivo no Drive (padrão: nome do arquivo local)
+
+        Returns:
+            str: URL pública da imagem, ou None se o arquivo não existir ou o upload falhar
+        """
+        if isinstance(imagem, (bytes, bytearray)):
+            return self._upload_imagem(bytes(imagem), nome or "imagem.png")
+
+        if not imagem or not Path(imagem).exists():
+            return None
+
+        with open(imagem, 'rb') as f:
+            dados = f.read()
+        return self._upload_imagem(dados, nome or Path(imagem).name)
+
+    def _upload_imagem(self, dados: bytes, nome: str) -> str:
+        """Faz upload da imagem para o Google Drive (se ainda não estiver lá) e retorna a URL"""
         try:
-            file_metadata = {
-                'name': Path(imagem_path).name,
-                'mimeType': 'image/png'
-            }
+            hash_imagem = hash_conteudo(dados)
             
-            media = MediaFileUpload(
-                imagem_path,
-                mimetype='image/png',
-                resumable=True
-            )
+            # O índice é confiável: um arquivo apagado só é descoberto (e reenviado)
+            # quando o documento tenta usá-lo (veja reenviar_imagem)
+            file_id = self.indice_imagens.obter(hash_imagem)
+            if file_id:
+                url = self.url_imagem(file_id)
+                self._imagens_reaproveitadas[url] = (hash_imagem, dados, nome)
+                while len(self._imagens_reaproveitadas) > 8:
+                    self._imagens_reaproveitadas.popitem(last=False)
+                return url
             
-            file = self.drive_service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id, webViewLink, webContentLink'
-            ).execute()
+            file = self.requisicao_upload_imagem(self.drive_service, dados, nome).execute()
             
             # Tornar arquivo público (somente leitura)
             self.drive_service.permissions().create(
                 fileId=file.get('id'),
-                body={'type': 'anyone', 'role': 'reader'}
+                body=self.PERMISSAO_PUBLICA
             ).execute()
             
+            self.indice_imagens.salvar(hash_imagem, file.get('id'), nome)
+            
             # Retornar URL direta da imagem
-            file_id = file.get('id')
-            return f"https://drive.google.com/uc?export=view&id={file_id}"
+            return self.url_imagem(file.get('id'))
             
         except Exception as e:
             print(f"Erro ao fazer upload da imagem: {e}")
             return None
     
+    def reenviar_imagem(self, image_url: str) -> str:
+        """
+        Tira do índice uma imagem reaproveitada que o documento não conseguiu usar e a envia de novo
+
+        Returns:
+            str: nova URL pública, ou None se a imagem não veio do índice (ou o upload falhar)
+        """
+        reaproveitada = self._imagens_reaproveitadas.pop(image_url, None)
+        if reaproveitada is None:
+            return None
+
+        hash_imagem, dados, nome = reaproveitada
+        print("⚠️ Imagem do índice não está mais no Drive; enviando de novo")
+        self.indice_imagens.remover(hash_imagem)
+        return self._upload_imagem(dados, nome)
+
+    @staticmethod
+    def imagem_indisponivel(erro: Exception) -> bool:
+        """
+        Se o erro indica que a imagem usada não existe mais no Drive
+
+        O Drive responde 404; o Docs recusa o insertInlineImage com 400
+        ("problem retrieving the image").
+        """
+        if not isinstance(erro, HttpError):
+            return False
+        if erro.resp.status == 404:
+            return True
+        return erro.resp.status == 400 and b'image' in (erro.content or b'').lower()
+    
+    @staticmethod
+    def requisicao_upload_imagem(drive_service, dados: bytes, nome: str):
+        """
+        Requisição files.create (ainda não executada) que envia a imagem ao Drive
+        
+        Imagens de até 5 MB vão em um único upload multipart; só as maiores
+        usam o upload resumable (que exige uma chamada extra para iniciar).
+        """
+        mimetype = mimetypes.guess_type(nome)[0] or 'image/png'
+        
+        file_metadata = {
+            'name': nome,
+            'mimeType': mimetype
+        }
+        
+        media = MediaIoBaseUpload(
+            io.BytesIO(dados),
+            mimetype=mimetype,
+            resumable=len(dados) > LIMITE_UPLOAD_MULTIPART
+        )
+        
+        return drive_service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id'
+        )
+    
     def _markdown_para_docs(self, markdown: str, start_index: int) -> list:
         """
         Converte Markdown para requisições do Google Docs API
         
+        Todo o texto entra com um único insertText; títulos, listas e negrito
+        são aplicados depois como requisições por intervalo. O número de
+        requisições cresce com os trechos formatados, não com as linhas.
+        
         Args:
             markdown: Texto em Markdown
             start_index: Índice inicial para inserção
@@ -181,85 +401,87 @@ class GoogleDocsHandler:
         Returns:
             list: Lista de requisições para a API
         """
-        requests = []
-        linhas = markdown.split('\n')
+        partes = []
+        titulos = []   # (início, fim, estilo)
+        listas = []    # [início, fim, preset] - linhas consecutivas do mesmo tipo
+        negritos = []  # (início, fim)
         current_index = start_index
         
-        for linha in linhas:
-            if not linha.strip():
-                # Linha vazia - adicionar quebra
-                requests.append({
-                    'insertText': {
-                        'location': {'index': current_index},
-                        'text': '\n'
-                    }
-                })
-                current_index += 1
-                continue
-            
-            # Detectar tipo de linha e formatar
+        for linha in markdown.split('\n'):
             texto_limpo = linha.strip()
+            estilo = None
+            lista = None
             
-            # Headers
-            if texto_limpo.startswith('# '):
-                texto = texto_limpo[2:] + '\n'
-                start = current_index
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
-                # Formatar como H1
-                requests.append({
-                    'updateParagraphStyle': {
-                        'range': {'startIndex': start, 'endIndex': current_index - 1},
-                        'paragraphStyle': {'namedStyleType': 'HEADING_1'},
-                        'fields': 'namedStyleType'
-                    }
-                })
-            
+            if not texto_limpo:
+                texto = ''
+            elif texto_limpo.startswith('### '):
+                texto, estilo = texto_limpo[4:], 'HEADING_3'
             elif texto_limpo.startswith('## '):
-                texto = texto_limpo[3:] + '\n'
-                start = current_index
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
-                # Formatar como H2
-                requests.append({
-                    'updateParagraphStyle': {
-                        'range': {'startIndex': start, 'endIndex': current_index - 1},
-                        'paragraphStyle': {'namedStyleType': 'HEADING_2'},
-                        'fields': 'namedStyleType'
-                    }
-                })
+                texto, estilo = texto_limpo[3:], 'HEADING_2'
+            elif texto_limpo.startswith('# '):
+                texto, estilo = texto_limpo[2:], 'HEADING_1'
+            elif texto_limpo.startswith('- ') or texto_limpo.startswith('* '):
+                texto, lista = texto_limpo[2:], 'BULLET_DISC_CIRCLE_SQUARE'
+            elif LISTA_NUMERADA.match(texto_limpo):
+                texto, lista = LISTA_NUMERADA.sub('', texto_limpo, count=1), 'NUMBERED_DECIMAL_ALPHA_ROMAN'
+            else:
+                texto = linha
             
-            elif texto_limpo.startswith('### '):
-                texto = texto_limpo[4:] + '\n'
-                start = current_index
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
-                # Formatar como H3
-                requests.append({
-                    'updateParagraphStyle': {
-                        'range': {'startIndex': start, 'endIndex': current_index - 1},
-                        'paragraphStyle': {'namedStyleType': 'HEADING_3'},
-                        'fields': 'namedStyleType'
-                    }
-                })
+            # Negrito: remover os ** e guardar o intervalo
+            inicio_linha = current_index
+            pedacos = NEGRITO.split(texto)
+            for i, pedaco in enumerate(pedacos):
+                tamanho = _tamanho_utf16(pedaco)
+                if i % 2 == 1 and pedaco:
+                    negritos.append((current_index, current_index + tamanho))
+                partes.append(pedaco)
+                current_index += tamanho
             
-            # Lista com marcadores
-            elif texto_limpo.startswith('- ') or texto_limpo.startswith('* '):
-                texto = '• ' + texto_limpo[2:] + '\n'
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
+            fim_linha = current_index
+            partes.append('\n')
+            current_index += 1
             
-            # Lista numerada
-            elif texto_limpo[0].isdigit() and texto_limpo[1:3] == '. ':
-                texto = texto_limpo + '\n'
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
+            if estilo and fim_linha > inicio_linha:
+                titulos.append((inicio_linha, fim_linha, estilo))
             
-            # Texto normal
-            else:
-                texto = linha + '\n'
-                requests.append({'insertText': {'location': {'index': current_index}, 'text': texto}})
-                current_index += len(texto)
+            if lista:
+                if listas and listas[-1][2] == lista and listas[-1][1] == inicio_linha:
+                    listas[-1][1] = current_index
+                else:
+                    listas.append([inicio_linha, current_index, lista])
+        
+        requests = [{
+            'insertText': {
+                'location': {'index': start_index},
+                'text': ''.join(partes)
+            }
+        }]
+        
+        for inicio, fim, estilo in titulos:
+            requests.append({
+                'updateParagraphStyle': {
+                    'range': {'startIndex': inicio, 'endIndex': fim},
+                    'paragraphStyle': {'namedStyleType': estilo},
+                    'fields': 'namedStyleType'
+                }
+            })
+        
+        for inicio, fim, preset in listas:
+            requests.append({
+                'createParagraphBullets': {
+                    'range': {'startIndex': inicio, 'endIndex': fim},
+                    'bulletPreset': preset
+                }
+            })
+        
+        for inicio, fim in negritos:
+            requests.append({
+                'updateTextStyle': {
+                    'range': {'startIndex': inicio, 'endIndex': fim},
+                    'textStyle': {'bold': True},
+                    'fields': 'bold'
+                }
+            })
         
         return requests
     
@@ -0,0 +1,101 @@
+"""
+Sessão HTTP
+Sessão requests compartilhada pelo processo: mantém conexões keep-alive por
+host (a API e o CDN de onde a imagem é baixada reaproveitam o handshake TLS
+entre artigos), repete 429/5xx com backoff e aplica timeouts de conexão e
+leitura separados
+"""
+
+import os
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Erros HTTP temporários
+STATUS_RETENTAVEIS = (429, 500, 502, 503, 504)
+
+_sessao: Optional["SessaoHTTP"] = None
+_lock_sessao = threading.Lock()
+
+
+class RetryHTTP(Retry):
+    """
+    Retry que também repete POST em 429
+
+    Um 429 garante que a requisição não foi processada, então repetir uma
+    geração (que é cobrada) é seguro. Nos demais erros, POST não é repetido.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and method.upper() == "POST":
+            return bool(self.total) if self.total is not None else True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def timeout(leitura_s: float, conexao_s: float = None) -> Tuple[float, float]:
+    """
+    Timeout (conexão, leitura) para uma chamada
+
+    Args:
+        leitura_s: Espera máxima entre bytes da resposta
+        conexao_s: Espera máxima para abrir a conexão (padrão: HTTP_TIMEOUT_CONEXAO_S ou 5)
+    """
+    if conexao_s is None:
+        conexao_s = float(os.getenv("HTTP_TIMEOUT_CONEXAO_S", "5"))
+    return (conexao_s, leitura_s)
+
+
+class SessaoHTTP(requests.Session):
+    """requests.Session com pools por host, novas tentativas e timeout padrão"""
+
+    def __init__(self, tentativas: int = None, backoff_s: float = None,
+                 conexoes_por_host: int = None, timeout_padrao: Tuple[float, float] = None):
+        """
+        Inicializa a sessão
+
+        Args:
+            tentativas: Novas tentativas em 429/5xx e erros de conexão
+                        (padrão: HTTP_MAX_TENTATIVAS ou 3)
+            backoff_s: Base do backoff exponencial entre tentativas
+                       (padrão: HTTP_BACKOFF_S ou 0.5). Retry-After é respeitado
+            conexoes_por_host: Conexões mantidas abertas por host
+                               (padrão: HTTP_CONEXOES_POR_HOST ou 10)
+            timeout_padrao: (conexão, leitura) das chamadas sem timeout explícito
+        """
+        super().__init__()
+
+        tentativas = tentativas if tentativas is not None else int(os.getenv("HTTP_MAX_TENTATIVAS", "3"))
+        backoff_s = backoff_s if backoff_s is not None else float(os.getenv("HTTP_BACKOFF_S", "0.5"))
+        conexoes_por_host = conexoes_por_host or int(os.getenv("HTTP_CONEXOES_POR_HOST", "10"))
+        self.timeout_padrao = timeout_padrao or timeout(30)
+
+        retry = RetryHTTP(
+            total=tentativas,
+            backoff_factor=backoff_s,
+            status_forcelist=STATUS_RETENTAVEIS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adaptador = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=conexoes_por_host,
+            max_retries=retry
+        )
+        self.mount("https://", adaptador)
+        self.mount("http://", adaptador)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout_padrao)
+        return super().request(method, url, **kwargs)
+
+
+def obter_sessao() -> SessaoHTTP:
+    """Retorna a sessão HTTP do processo, criando-a na primeira chamada"""
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            _sessao = SessaoHTTP()
+        return _sessao
@@ -0,0 +1,77 @@
+"""
+Índice de Imagens no Drive
+Associa o hash do conteúdo de cada imagem ao arquivo já enviado ao Google
+Drive, para que republicar um artigo (ou reutilizar uma imagem) não faça
+um novo upload nem uma nova chamada de permissão
+"""
+
+import hashlib
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+
+def hash_conteudo(dados: bytes) -> str:
+    """SHA-256 dos bytes da imagem"""
+    return hashlib.sha256(dados).hexdigest()
+
+
+class IndiceImagensDrive:
+    """Índice persistente hash do conteúdo → id do arquivo no Drive"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Inicializa o índice
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: memoria/dados/indice_drive.db)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / "memoria" / "dados" / "indice_drive.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._inicializar_banco()
+
+    @contextmanager
+    def _conectar(self):
+        """Abre uma conexão por operação (seguro entre threads) e faz commit ao sair"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _inicializar_banco(self):
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS imagens (
+                    hash TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    nome TEXT,
+                    criado_em REAL NOT NULL
+                )
+            """)
+
+    def obter(self, hash_imagem: str) -> Optional[str]:
+        """Retorna o id do arquivo no Drive com esse conteúdo, ou None"""
+        with self._conectar() as conn:
+            linha = conn.execute("SELECT file_id FROM imagens WHERE hash = ?", (hash_imagem,)).fetchone()
+        return linha[0] if linha else None
+
+    def salvar(self, hash_imagem: str, file_id: str, nome: str = None):
+        """Registra um arquivo enviado (já com permissão pública)"""
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO imagens (hash, file_id, nome, criado_em) VALUES (?, ?, ?, ?)",
+                (hash_imagem, file_id, nome, time.time())
+            )
+
+    def remover(self, hash_imagem: str):
+        """Esquece um arquivo (ex.: foi apagado do Drive)"""
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM imagens WHERE hash = ?", (hash_imagem,))
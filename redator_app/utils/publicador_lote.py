@@ -0,0 +1,415 @@
+"""
+Publicador em Lote
+Publica muitos artigos no Google Docs ao mesmo tempo, respeitando as cotas
+por minuto das APIs do Docs e do Drive (token bucket), agrupando as
+permissões das imagens em requisições batch e repetindo 429/5xx com backoff
+(criações só são repetidas em 429, para não duplicar documentos)
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from utils.indice_drive import hash_conteudo
+
+# Erros HTTP que valem nova tentativa
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+# O Drive aceita no máximo 100 chamadas por requisição batch
+TAMANHO_BATCH_DRIVE = 100
+
+
+def _tem_imagem(artigo: Dict) -> bool:
+    """Se o artigo tem uma imagem local a enviar (em memória ou em disco)"""
+    if artigo.get("imagem_dados"):
+        return True
+    return bool(artigo.get("imagem_path")) and Path(artigo["imagem_path"]).exists()
+
+
+class LimitadorTaxa:
+    """Token bucket: libera no máximo N chamadas por minuto, com rajadas curtas"""
+
+    def __init__(self, por_minuto: float, rajada: int = None):
+        """
+        Args:
+            por_minuto: Chamadas permitidas por minuto
+            rajada: Chamadas que podem sair de uma vez (padrão: 10% da cota por minuto)
+        """
+        self.taxa = por_minuto / 60.0
+        self.capacidade = rajada or max(1, int(por_minuto / 10))
+        self._fichas = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Bloqueia até haver uma ficha disponível e a consome"""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+
+                espera = (1 - self._fichas) / self.taxa
+
+            time.sleep(espera)
+
+
+def _cota_excedida(erro: Exception) -> bool:
+    """Se a API recusou a chamada por cota (garante que ela não foi processada)"""
+    if not isinstance(erro, HttpError):
+        return False
+    if erro.resp.status == 429:
+        return True
+    # O Drive também sinaliza cota estourada com 403 + rateLimitExceeded
+    return erro.resp.status == 403 and b'ratelimitexceeded' in (erro.content or b'').lower()
+
+
+def _retentavel(erro: Exception) -> bool:
+    """Se o erro é temporário (cota, servidor ou rede)"""
+    if _cota_excedida(erro):
+        return True
+    if isinstance(erro, HttpError):
+        return erro.resp.status in STATUS_RETENTAVEIS
+    return isinstance(erro, (ConnectionError, TimeoutError, socket.timeout))
+
+
+class PublicadorLote:
+    """Publica artigos no Google Docs em paralelo, dentro das cotas das APIs"""
+
+    def __init__(
+        self,
+        docs_handler,
+        workers: int = None,
+        docs_por_minuto: float = None,
+        drive_por_minuto: float = None,
+        max_tentativas: int = 5,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 32.0,
+        janela_batch_s: float = None
+    ):
+        """
+        Inicializa o publicador
+
+        Args:
+            docs_handler: GoogleDocsHandler já autenticado (fornece as credenciais
+                          e o formato dos documentos)
+            workers: Publicações simultâneas (padrão: PUBLICACAO_WORKERS ou 4)
+            docs_por_minuto: Cota de escrita da Docs API
+                             (padrão: PUBLICACAO_DOCS_POR_MINUTO ou 60)
+            drive_por_minuto: Cota de escrita da Drive API
+                              (padrão: PUBLICACAO_DRIVE_POR_MINUTO ou 180)
+            max_tentativas: Tentativas por chamada em erros temporários
+            backoff_base_s: Espera máxima após a primeira falha (dobra a cada tentativa)
+            backoff_max_s: Teto da espera entre tentativas
+            janela_batch_s: Quanto a primeira permissão pendente espera pelas de outros
+                            artigos antes de sair o batch (padrão: PUBLICACAO_JANELA_BATCH_S ou 0.5)
+        """
+        self.docs_handler = docs_handler
+        self.workers = workers or int(os.getenv("PUBLICACAO_WORKERS", "4"))
+        self.limitador_docs = LimitadorTaxa(
+            docs_por_minuto or float(os.getenv("PUBLICACAO_DOCS_POR_MINUTO", "60"))
+        )
+        self.limitador_drive = LimitadorTaxa(
+            drive_por_minuto or float(os.getenv("PUBLICACAO_DRIVE_POR_MINUTO", "180"))
+        )
+        self.max_tentativas = max_tentativas
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.janela_batch_s = (
+            janela_batch_s if janela_batch_s is not None
+            else float(os.getenv("PUBLICACAO_JANELA_BATCH_S", "0.5"))
+        )
+
+        self._locais = threading.local()
+        # Permissões à espera do próximo batch: (id do arquivo, Future com se ficou pública)
+        self._lock_permissoes = threading.Lock()
+        self._permissoes_pendentes: List[Tuple[str, Future]] = []
+
+    def _servicos(self) -> Dict:
+        """Clientes Docs/Drive da thread atual (o cliente HTTP do Google não é thread-safe)"""
+        if not hasattr(self._locais, "servicos"):
+            creds = self.docs_handler.creds
+            self._locais.servicos = {
+                "docs": build('docs', 'v1', credentials=creds, cache_discovery=False),
+                "drive": build('drive', 'v3', credentials=creds, cache_discovery=False)
+            }
+        return self._locais.servicos
+
+    def _esperar(self, tentativa: int):
+        """Backoff exponencial com jitter completo"""
+        teto = min(self.backoff_max_s, self.backoff_base_s * (2 ** (tentativa - 1)))
+        time.sleep(random.uniform(0, teto))
+
+    def _executar(self, requisicao, limitador: LimitadorTaxa, criacao: bool = False):
+        """
+        Executa uma chamada da API dentro da cota, repetindo erros temporários
+
+        Args:
+            requisicao: Requisição do googleapiclient
+            limitador: Cota da API chamada
+            criacao: Se a chamada cria um arquivo ou documento. Depois de um 5xx
+                     ou erro de rede ele pode ter sido criado mesmo assim, então
+                     só a recusa por cota é repetida (evita duplicatas)
+        """
+        retentavel = _cota_excedida if criacao else _retentavel
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            limitador.adquirir()
+            try:
+                return requisicao.execute()
+            except Exception as e:
+                if not retentavel(e) or tentativa == self.max_tentativas:
+                    raise
+            self._esperar(tentativa)
+
+    def _enviar_imagem(self, imagem_path: str, dados: bytes = None) -> Tuple[str, str, bool]:
+        """
+        Envia uma imagem (sem a permissão pública), reaproveitando arquivos já enviados
+
+        Args:
+            imagem_path: Caminho da imagem (dá o nome do arquivo no Drive)
+            dados: Bytes da imagem já em memória (sem eles, o arquivo é lido)
+
+        O índice é usado sem consultar o Drive (economiza a cota); se o arquivo
+        tiver sido apagado, o documento falha e a imagem é reenviada
+        (veja publicar_artigo).
+
+        Returns:
+            tuple (id do arquivo, hash do conteúdo, se o arquivo já existia e é público)
+        """
+        drive = self._servicos()["drive"]
+
+        if dados is None:
+            with open(imagem_path, 'rb') as f:
+                dados = f.read()
+        hash_imagem = hash_conteudo(dados)
+
+        file_id = self.docs_handler.indice_imagens.obter(hash_imagem)
+        if file_id:
+            return file_id, hash_imagem, True
+
+        file = self._executar(
+            self.docs_handler.requisicao_upload_imagem(drive, dados, Path(imagem_path).name),
+            self.limitador_drive,
+            criacao=True
+        )
+        return file.get('id'), hash_imagem, False
+
+    def _tornar_publicas(self, file_ids: List[str]) -> set:
+        """
+        Torna as imagens públicas com requisições batch (até 100 por chamada HTTP)
+
+        Returns:
+            set com os ids que ficaram públicos
+        """
+        drive = self._servicos()["drive"]
+        pendentes = list(file_ids)
+        publicas = set()
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            falhas = []
+
+            def ao_responder(request_id, response, exception):
+                if exception is None:
+                    publicas.add(request_id)
+                elif _retentavel(exception):
+                    falhas.append(request_id)
+                else:
+                    print(f"⚠️ Permissão da imagem {request_id} falhou: {exception}")
+
+            for inicio in range(0, len(pendentes), TAMANHO_BATCH_DRIVE):
+                parte = pendentes[inicio:inicio + TAMANHO_BATCH_DRIVE]
+                batch = drive.new_batch_http_request(callback=ao_responder)
+
+                for file_id in parte:
+                    # Cada chamada do batch conta na cota do Drive
+                    self.limitador_drive.adquirir()
+                    batch.add(
+                        drive.permissions().create(
+                            fileId=file_id, body=self.docs_handler.PERMISSAO_PUBLICA, fields='id'
+                        ),
+                        request_id=file_id
+                    )
+
+                try:
+                    batch.execute()
+                except Exception as e:
+                    if not _retentavel(e):
+                        raise
+                    falhas.extend(f for f in parte if f not in publicas)
+
+            if not falhas:
+                break
+
+            pendentes = falhas
+            self._esperar(tentativa)
+
+        return publicas
+
+    def _tornar_publica(self, file_id: str) -> bool:
+        """
+        Torna uma imagem pública no mesmo batch que as dos artigos publicados ao mesmo tempo
+
+        A primeira thread a pedir uma permissão espera janela_batch_s, junta
+        todos os pedidos feitos nesse intervalo e envia um único batch; as
+        demais só aguardam o resultado.
+
+        Returns:
+            bool: se a imagem ficou pública
+        """
+        futuro = Future()
+        with self._lock_permissoes:
+            self._permissoes_pendentes.append((file_id, futuro))
+            lider = len(self._permissoes_pendentes) == 1
+
+        if lider:
+            time.sleep(self.janela_batch_s)
+            with self._lock_permissoes:
+                pedidos, self._permissoes_pendentes = self._permissoes_pendentes, []
+
+            try:
+                publicas = self._tornar_publicas(sorted({f for f, _ in pedidos}))
+            except Exception as e:
+                for _, pedido in pedidos:
+                    pedido.set_exception(e)
+            else:
+                for pedido_id, pedido in pedidos:
+                    pedido.set_result(pedido_id in publicas)
+
+        return futuro.result()
+
+    def _criar_documento(self, artigo: Dict, reenviar_imagem: Callable[[], Optional[str]] = None) -> str:
+        """
+        Cria e preenche um documento, retornando sua URL
+
+        Args:
+            artigo: dict com titulo, conteudo e, opcionalmente, imagem_url
+            reenviar_imagem: Se a imagem veio do índice, envia-a de novo e retorna
+                             a nova URL; chamado uma vez se o Docs não conseguir usá-la
+        """
+        servicos = self._servicos()
+
+        if self.docs_handler.metodo_publicacao == 'html':
+            file = self._executar(
+                self.docs_handler.requisicao_documento_html(
+                    servicos["drive"], artigo["titulo"], artigo["conteudo"],
+                    artigo.get("imagem_path"), artigo.get("imagem_url"), artigo.get("imagem_dados")
+                ),
+                self.limitador_drive,
+                criacao=True
+            )
+            return self.docs_handler.url_documento(file.get('id'))
+
+        doc = self._executar(
+            servicos["docs"].documents().create(body={'title': artigo["titulo"]}),
+            self.limitador_docs,
+            criacao=True
+        )
+        document_id = doc.get('documentId')
+        revisao = doc.get('revisionId')
+
+        # requiredRevisionId: se um 5xx ou erro de rede esconder uma aplicação que
+        # deu certo, a nova tentativa é recusada em vez de inserir o artigo de novo
+        def aplicar(imagem_url):
+            self._executar(
+                servicos["docs"].documents().batchUpdate(
+                    documentId=document_id,
+                    body={
+                        'requests': self.docs_handler.montar_requisicoes(artigo["conteudo"], imagem_url),
+                        'writeControl': {'requiredRevisionId': revisao}
+                    }
+                ),
+                self.limitador_docs
+            )
+
+        try:
+            try:
+                aplicar(artigo.get("imagem_url"))
+            except HttpError as e:
+                # O batchUpdate é atômico: com a imagem inválida nada foi aplicado
+                if not (reenviar_imagem and self.docs_handler.imagem_indisponivel(e)):
+                    raise
+                nova_url = reenviar_imagem()
+                if not nova_url:
+                    raise
+                aplicar(nova_url)
+        except HttpError as e:
+            if e.resp.status != 400 or not self._revisao_mudou(document_id, revisao):
+                raise
+            # O documento acabou de ser criado: só a tentativa anterior pode tê-lo alterado
+
+        return self.docs_handler.url_documento(document_id)
+
+    def _revisao_mudou(self, document_id: str, revisao: str) -> bool:
+        """Se o documento já passou da revisão informada (o batchUpdate anterior foi aplicado)"""
+        doc = self._executar(
+            self._servicos()["docs"].documents().get(documentId=document_id, fields='revisionId'),
+            self.limitador_docs
+        )
+        return doc.get('revisionId') != revisao
+
+    def publicar_artigo(self, artigo: Dict) -> Dict:
+        """
+        Publica um único artigo (imagem, permissão e documento)
+
+        Usado para publicar cada artigo assim que ele fica pronto; as cotas
+        são compartilhadas com as demais chamadas deste publicador e a
+        permissão pública da imagem sai em batch com as dos outros artigos
+        publicados ao mesmo tempo.
+
+        Args:
+            artigo: dict com titulo, conteudo (Markdown) e, opcionalmente,
+                    imagem_path, imagem_dados (bytes já em memória) e imagem_url
+
+        Returns:
+            dict com documento_url, imagem_url e erro
+        """
+        resultado = {"documento_url": None, "imagem_url": artigo.get("imagem_url"), "erro": None}
+        reenviar = None
+
+        def enviar():
+            file_id, hash_imagem, reaproveitada = self._enviar_imagem(
+                artigo["imagem_path"], artigo.get("imagem_dados")
+            )
+            if reaproveitada or self._tornar_publica(file_id):
+                resultado["imagem_url"] = self.docs_handler.url_imagem(file_id)
+                self.docs_handler.indice_imagens.salvar(
+                    hash_imagem, file_id, Path(artigo["imagem_path"]).name
+                )
+            return hash_imagem, reaproveitada
+
+        def reenviar_sem_indice():
+            print(f"⚠️ Imagem de '{artigo['titulo']}' não está mais no Drive; enviando de novo")
+            self.docs_handler.indice_imagens.remover(hash_imagem)
+            resultado["imagem_url"] = None
+            enviar()
+            return resultado["imagem_url"]
+
+        if self.docs_handler.metodo_publicacao != 'html' and not artigo.get("imagem_url") and _tem_imagem(artigo):
+            try:
+                hash_imagem, reaproveitada = enviar()
+                if reaproveitada:
+                    reenviar = reenviar_sem_indice
+            except Exception as e:
+                print(f"⚠️ Upload da imagem de '{artigo['titulo']}' falhou: {e}")
+
+        try:
+            resultado["documento_url"] = self._criar_documento(
+                {**artigo, "imagem_url": resultado["imagem_url"]}, reenviar
+            )
+        except Exception as e:
+            resultado["erro"] = str(e)
+
+        return resultado
@@ -0,0 +1,157 @@
+"""
+Renderizador HTML
+Converte o Markdown dos artigos em um documento HTML completo (títulos,
+listas, negrito, links, tabelas e imagem de destaque embutida), pronto para
+ser importado pelo Google Drive como Google Docs
+"""
+
+import base64
+import html
+import mimetypes
+import re
+from pathlib import Path
+from typing import List, Optional
+
+TITULO = re.compile(r'^(#{1,6})\s+(.*)$')
+ITEM_LISTA = re.compile(r'^[-*]\s+(.*)$')
+ITEM_NUMERADO = re.compile(r'^\d+\.\s+(.*)$')
+SEPARADOR_TABELA = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+LINHA_HORIZONTAL = re.compile(r'^(-{3,}|\*{3,})$')
+
+NEGRITO = re.compile(r'\*\*(.+?)\*\*')
+ITALICO = re.compile(r'(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])')
+LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+
+
+def imagem_data_uri(caminho: str, dados: bytes = None) -> Optional[str]:
+    """
+    Devolve uma imagem como data URI (base64), ou None se não houver imagem
+
+    Args:
+        caminho: Arquivo da imagem (com dados, serve só para o tipo pela extensão)
+        dados: Bytes da imagem já em memória (ex.: GeradorImagem.obter_bytes)
+    """
+    if dados is None:
+        if not caminho or not Path(caminho).exists():
+            return None
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+
+    mimetype = mimetypes.guess_type(str(caminho or ''))[0] or 'image/png'
+    return f"data:{mimetype};base64,{base64.b64encode(dados).decode('ascii')}"
+
+
+def _inline(texto: str) -> str:
+    """Escapa o HTML e aplica negrito, itálico e links"""
+    texto = html.escape(texto, quote=True)
+    texto = LINK.sub(r'<a href="\2">\1</a>', texto)
+    texto = NEGRITO.sub(r'<strong>\1</strong>', texto)
+    texto = ITALICO.sub(r'<em>\1</em>', texto)
+    return texto
+
+
+def _celulas(linha: str) -> List[str]:
+    """Divide uma linha de tabela Markdown em células"""
+    linha = linha.strip()
+    if linha.startswith('|'):
+        linha = linha[1:]
+    if linha.endswith('|'):
+        linha = linha[:-1]
+    return [celula.strip() for celula in linha.split('|')]
+
+
+def _tabela(linhas: List[str]) -> str:
+    """Renderiza uma tabela Markdown (cabeçalho, separador e linhas)"""
+    cabecalho = _celulas(linhas[0])
+    partes = ['<table border="1" cellpadding="6" style="border-collapse: collapse;">', '<tr>']
+    partes.extend(f'<th>{_inline(celula)}</th>' for celula in cabecalho)
+    partes.append('</tr>')
+
+    for linha in linhas[2:]:
+        celulas = _celulas(linha)
+        # Completar ou cortar para o número de colunas do cabeçalho
+        celulas = (celulas + [''] * len(cabecalho))[:len(cabecalho)]
+        partes.append('<tr>')
+        partes.extend(f'<td>{_inline(celula)}</td>' for celula in celulas)
+        partes.append('</tr>')
+
+    partes.append('</table>')
+    return ''.join(partes)
+
+
+def markdown_para_html(markdown: str, titulo: str = "", imagem_src: str = None) -> str:
+    """
+    Converte o Markdown de um artigo em um documento HTML
+
+    Args:
+        markdown: Conteúdo em Markdown
+        titulo: Título do documento (tag <title>)
+        imagem_src: URL ou data URI da imagem de destaque, inserida no topo (opcional)
+
+    Returns:
+        str: Documento HTML completo (UTF-8)
+    """
+    corpo = []
+    if imagem_src:
+        corpo.append(f'<p><img src="{html.escape(imagem_src, quote=True)}" width="600"></p>')
+
+    linhas = markdown.split('\n')
+    lista_aberta = None
+    i = 0
+
+    def fechar_lista():
+        nonlocal lista_aberta
+        if lista_aberta:
+            corpo.append(f'</{lista_aberta}>')
+            lista_aberta = None
+
+    while i < len(linhas):
+        linha = linhas[i].strip()
+
+        # Tabela: linha com | seguida do separador |---|
+        if ('|' in linha and i + 1 < len(linhas) and '|' in linhas[i + 1]
+                and SEPARADOR_TABELA.match(linhas[i + 1].strip())):
+            fechar_lista()
+            fim = i + 2
+            while fim < len(linhas) and '|' in linhas[fim]:
+                fim += 1
+            corpo.append(_tabela([l.strip() for l in linhas[i:fim]]))
+            i = fim
+            continue
+
+        i += 1
+
+        if not linha:
+            fechar_lista()
+            continue
+
+        titulo_md = TITULO.match(linha)
+        item = ITEM_LISTA.match(linha)
+        numerado = ITEM_NUMERADO.match(linha)
+
+        if titulo_md:
+            fechar_lista()
+            nivel = len(titulo_md.group(1))
+            corpo.append(f'<h{nivel}>{_inline(titulo_md.group(2))}</h{nivel}>')
+        elif LINHA_HORIZONTAL.match(linha):
+            fechar_lista()
+            corpo.append('<hr>')
+        elif item or numerado:
+            tipo = 'ul' if item else 'ol'
+            if lista_aberta != tipo:
+                fechar_lista()
+                corpo.append(f'<{tipo}>')
+                lista_aberta = tipo
+            corpo.append(f'<li>{_inline((item or numerado).group(1))}</li>')
+        else:
+            fechar_lista()
+            corpo.append(f'<p>{_inline(linha)}</p>')
+
+    fechar_lista()
+
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f'<title>{html.escape(titulo or "")}</title></head>\n<body>\n'
+        + '\n'.join(corpo)
+        + '\n</body></html>\n'
+    )
@@ -0,0 +1,238 @@
+"""
+Saúde dos Provedores
+Acompanha, para cada provedor de imagens, a taxa de erro recente e a
+latência média (EWMA) e aplica um disjuntor (circuit breaker): depois de
+falhas seguidas ou de uma taxa de erro alta, o provedor é pulado na hora
+em vez de fazer cada artigo esperar pelo timeout, e volta a ser testado
+com uma única chamada depois de um tempo
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+# Estados do disjuntor
+FECHADO = "fechado"        # provedor em uso normal
+ABERTO = "aberto"          # provedor pulado até o fim da espera
+MEIO_ABERTO = "meio_aberto"  # uma chamada de teste decide se fecha ou reabre
+
+class ProvedorIndisponivel(Exception):
+    """O disjuntor do provedor está aberto: a chamada nem foi feita"""
+
+
+_registro: Optional["RegistroSaude"] = None
+_lock_registro = threading.Lock()
+
+
+def obter_saude() -> "RegistroSaude":
+    """Retorna o registro de saúde do processo, criando-o na primeira chamada"""
+    global _registro
+    with _lock_registro:
+        if _registro is None:
+            _registro = RegistroSaude()
+        return _registro
+
+
+class Disjuntor:
+    """Estado de saúde e disjuntor de um provedor"""
+
+    def __init__(self, janela: int, taxa_erro_max: float, falhas_seguidas_max: int,
+                 espera_s: float, espera_max_s: float, alfa_latencia: float = 0.3):
+        self.janela = deque(maxlen=janela)
+        self.taxa_erro_max = taxa_erro_max
+        self.falhas_seguidas_max = falhas_seguidas_max
+        self.espera_base_s = espera_s
+        self.espera_max_s = espera_max_s
+        self.alfa_latencia = alfa_latencia
+
+        self.estado = FECHADO
+        self.espera_s = espera_s
+        self.aberto_ate = 0.0
+        self.teste_em_andamento = False
+        self.falhas_seguidas = 0
+        self.latencia_ewma_s: Optional[float] = None
+        self.chamadas = 0
+        self.falhas = 0
+        self.puladas = 0
+        self.ultimo_erro: Optional[str] = None
+
+    def permitir(self, agora: float) -> bool:
+        if self.estado == FECHADO:
+            return True
+
+        if self.estado == ABERTO and agora >= self.aberto_ate:
+            self.estado = MEIO_ABERTO
+            self.teste_em_andamento = False
+
+        if self.estado == MEIO_ABERTO and not self.teste_em_andamento:
+            self.teste_em_andamento = True
+            return True
+
+        self.puladas += 1
+        return False
+
+    def registrar(self, sucesso: bool, latencia_s: float, erro: str, agora: float):
+        self.chamadas += 1
+        self.janela.append(sucesso)
+        self.latencia_ewma_s = (
+            latencia_s if self.latencia_ewma_s is None
+            else self.alfa_latencia * latencia_s + (1 - self.alfa_latencia) * self.latencia_ewma_s
+        )
+
+        if sucesso:
+            self.falhas_seguidas = 0
+            if self.estado != FECHADO:
+                # O teste passou: volta ao normal e esquece as falhas antigas
+                self.estado = FECHADO
+                self.espera_s = self.espera_base_s
+                self.janela.clear()
+                self.janela.append(True)
+            return
+
+        self.falhas += 1
+        self.falhas_seguidas += 1
+        self.ultimo_erro = erro
+
+        if self.estado == MEIO_ABERTO:
+            # O teste falhou: reabre esperando o dobro
+            self.espera_s = min(self.espera_max_s, self.espera_s * 2)
+            self._abrir(agora)
+        elif self.estado == FECHADO and (
+            self.falhas_seguidas >= self.falhas_seguidas_max
+            or (len(self.janela) >= self.janela.maxlen // 2 and self.taxa_erro() >= self.taxa_erro_max)
+        ):
+            self._abrir(agora)
+
+    def _abrir(self, agora: float):
+        self.estado = ABERTO
+        self.aberto_ate = agora + self.espera_s
+        self.teste_em_andamento = False
+
+    def taxa_erro(self) -> float:
+        if not self.janela:
+            return 0.0
+        return sum(1 for sucesso in self.janela if not sucesso) / len(self.janela)
+
+
+class RegistroSaude:
+    """Disjuntores de todos os provedores, compartilhados entre as chamadas do processo"""
+
+    def __init__(
+        self,
+        janela: int = 20,
+        taxa_erro_max: float = 0.5,
+        falhas_seguidas_max: int = None,
+        espera_s: float = None,
+        espera_max_s: float = 600.0
+    ):
+        """
+        Inicializa o registro
+
+        Args:
+            janela: Últimas chamadas consideradas na taxa de erro
+            taxa_erro_max: Taxa de erro (com ao menos meia janela de chamadas) que abre o disjuntor
+            falhas_seguidas_max: Falhas seguidas que abrem o disjuntor
+                                 (padrão: PROVEDOR_FALHAS_SEGUIDAS ou 3)
+            espera_s: Tempo aberto antes da chamada de teste (padrão: PROVEDOR_ESPERA_S ou 60).
+                      Dobra a cada teste que falha, até espera_max_s
+            espera_max_s: Teto do tempo aberto
+        """
+        self.janela = janela
+        self.taxa_erro_max = taxa_erro_max
+        self.falhas_seguidas_max = falhas_seguidas_max or int(os.getenv("PROVEDOR_FALHAS_SEGUIDAS", "3"))
+        self.espera_s = espera_s or float(os.getenv("PROVEDOR_ESPERA_S", "60"))
+        self.espera_max_s = espera_max_s
+
+        self._lock = threading.Lock()
+        self._disjuntores: Dict[str, Disjuntor] = {}
+        self._escolhas: Dict[str, int] = {}
+        self._ultimo_provedor: Optional[str] = None
+
+    def _disjuntor(self, provedor: str) -> Disjuntor:
+        if provedor not in self._disjuntores:
+            self._disjuntores[provedor] = Disjuntor(
+                self.janela, self.taxa_erro_max, self.falhas_seguidas_max, self.espera_s, self.espera_max_s
+            )
+        return self._disjuntores[provedor]
+
+    def permitir(self, provedor: str) -> bool:
+        """Se o provedor pode ser chamado agora (disjuntor fechado, ou é a vez do teste)"""
+        with self._lock:
+            return self._disjuntor(provedor).permitir(time.monotonic())
+
+    def registrar(self, provedor: str, sucesso: bool, latencia_s: float, erro: str = None):
+        """Registra o resultado de uma chamada ao provedor"""
+        with self._lock:
+            disjuntor = self._disjuntor(provedor)
+            estado_anterior = disjuntor.estado
+            disjuntor.registrar(sucesso, latencia_s, erro, time.monotonic())
+            estado = disjuntor.estado
+
+            if sucesso:
+                self._escolhas[provedor] = self._escolhas.get(provedor, 0) + 1
+                self._ultimo_provedor = provedor
+
+        if estado != estado_anterior:
+            if estado == ABERTO:
+                print(f"⛔ {provedor}: disjuntor aberto por {disjuntor.espera_s:.0f}s ({erro})")
+            elif estado == FECHADO:
+                print(f"✅ {provedor}: provedor recuperado")
+
+    def chamar(self, provedor: str, chamada: Callable[[], Any]) -> Any:
+        """
+        Faz uma chamada real ao provedor, passando pelo disjuntor e registrando o resultado
+
+        Só o que de fato vai ao provedor deve passar por aqui (ex.: não um acerto
+        de cache), para não distorcer a taxa de erro e a latência.
+
+        Raises:
+            ProvedorIndisponivel: se o disjuntor estiver aberto
+        """
+        if not self.permitir(provedor):
+            raise ProvedorIndisponivel(provedor)
+
+        inicio = time.monotonic()
+        try:
+            resultado = chamada()
+        except Exception as e:
+            self.registrar(provedor, False, time.monotonic() - inicio, str(e)[:200])
+            raise
+
+        self.registrar(provedor, True, time.monotonic() - inicio)
+        return resultado
+
+    def escolher(self, provedor: str):
+        """Registra um provedor usado sem chamada monitorada (ex.: o fallback local)"""
+        with self._lock:
+            self._escolhas[provedor] = self._escolhas.get(provedor, 0) + 1
+            self._ultimo_provedor = provedor
+
+    def metricas(self) -> Dict:
+        """
+        Métricas para monitoramento
+
+        Returns:
+            dict com ultimo_provedor, escolhas por provedor e, em provedores, o
+            estado do disjuntor, taxa de erro, latência média, contagens e último erro
+        """
+        agora = time.monotonic()
+        with self._lock:
+            return {
+                "ultimo_provedor": self._ultimo_provedor,
+                "escolhas": dict(self._escolhas),
+                "provedores": {
+                    provedor: {
+                        "estado": d.estado,
+                        "taxa_erro": round(d.taxa_erro(), 3),
+                        "latencia_media_s": round(d.latencia_ewma_s, 2) if d.latencia_ewma_s is not None else None,
+                        "chamadas": d.chamadas,
+                        "falhas": d.falhas,
+                        "puladas": d.puladas,
+                        "reteste_em_s": round(max(0.0, d.aberto_ate - agora), 1) if d.estado == ABERTO else None,
+                        "ultimo_erro": d.ultimo_erro
+                    }
+                    for provedor, d in self._disjuntores.items()
+                }
+            }
@@ -3,8 +3,11 @@ Supabase Handler
 Gerencia conexão e operações com Supabase para armazenamento persistente
 """
 
+import hashlib
 import os
-from typing import Dict, List, Optional
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -13,20 +16,42 @@ load_dotenv()
 # Tentar importar Supabase
 try:
     from supabase import create_client, Client
+    from postgrest.types import ReturnMethod
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
     print("⚠️ Supabase não instalado. Use: uv add supabase")
 
+# Cache nome → id de projetos e categorias, compartilhado entre instâncias
+# (o app cria um handler novo a cada rerun). A URL do Supabase faz parte da
+# chave para não misturar bancos diferentes.
+_lock_ids = threading.Lock()
+_ids_projetos: Dict[Tuple[str, str], int] = {}
+_ids_categorias: Dict[Tuple[str, int, str], int] = {}
+
+# Bancos (URLs) ainda sem a migração do hash_conteudo: o histórico é gravado
+# com insert simples. 42703 = coluna inexistente, 42P10 = on_conflict sem
+# índice único, PGRST204 = coluna fora do cache de schema do PostgREST
+_urls_sem_hash = set()
+CODIGOS_SEM_MIGRACAO = ("42703", "42P10", "PGRST204")
+
 class SupabaseHandler:
     """Gerencia operações com Supabase"""
     
+    # Projeção leve do histórico (sem o corpo do artigo)
+    COLUNAS_RESUMO = (
+        "id, projeto_id, categoria_id, palavra_chave, titulo, "
+        "total_palavras:estatisticas->total_palavras, criado_em"
+    )
+    
     def __init__(self):
         """Inicializa conexão com Supabase"""
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_KEY")
         self.client: Optional[Client] = None
         self.connected = False
+        # Exceção da última gravação que retornou False (a fila decide se vale repetir)
+        self.ultimo_erro: Optional[Exception] = None
         
         if not SUPABASE_AVAILABLE:
             print("⚠️ Supabase não disponível. Usando armazenamento local.")
@@ -43,6 +68,75 @@ class SupabaseHandler:
         else:
             print("⚠️ SUPABASE_URL ou SUPABASE_KEY não configurados")
     
+    # ==================== CACHE DE IDS ====================
+    
+    def _guardar_projeto_id(self, nome: str, projeto_id: int):
+        with _lock_ids:
+            _ids_projetos[(self.supabase_url, nome)] = projeto_id
+    
+    def _guardar_categoria_id(self, projeto_id: int, nome: str, categoria_id: int):
+        with _lock_ids:
+            _ids_categorias[(self.supabase_url, projeto_id, nome)] = categoria_id
+    
+    def _obter_projeto_id(self, nome: str) -> Optional[int]:
+        """Retorna o id do projeto (do cache ou com uma consulta)"""
+        projeto_id = _ids_projetos.get((self.supabase_url, nome))
+        if projeto_id is not None:
+            return projeto_id
+        
+        projeto = self.client.table("projetos").select("id").eq("nome", nome).execute()
+        if not projeto.data:
+            return None
+        
+        projeto_id = projeto.data[0]["id"]
+        self._guardar_projeto_id(nome, projeto_id)
+        return projeto_id
+    
+    def _obter_ids_categoria(self, projeto_nome: str, categoria_nome: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Retorna (projeto_id, categoria_id)
+        
+        Com o cache frio, resolve os dois ids em uma única consulta (join com projetos).
+        """
+        projeto_id = _ids_projetos.get((self.supabase_url, projeto_nome))
+        if projeto_id is not None:
+            categoria_id = _ids_categorias.get((self.supabase_url, projeto_id, categoria_nome))
+            if categoria_id is not None:
+                return projeto_id, categoria_id
+        
+        result = (
+            self.client.table("categorias")
+            .select("id, projeto_id, projetos!inner(nome)")
+            .eq("projetos.nome", projeto_nome)
+            .eq("nome", categoria_nome)
+            .execute()
+        )
+        
+        if result.data:
+            linha = result.data[0]
+            self._guardar_projeto_id(projeto_nome, linha["projeto_id"])
+            self._guardar_categoria_id(linha["projeto_id"], categoria_nome, linha["id"])
+            return linha["projeto_id"], linha["id"]
+        
+        # Categoria não existe; o projeto talvez exista
+        return self._obter_projeto_id(projeto_nome), None
+    
+    def _invalidar_projeto(self, nome: str):
+        """Remove do cache o projeto e todas as suas categorias"""
+        with _lock_ids:
+            projeto_id = _ids_projetos.pop((self.supabase_url, nome), None)
+            if projeto_id is not None:
+                for chave in [c for c in _ids_categorias if c[0] == self.supabase_url and c[1] == projeto_id]:
+                    del _ids_categorias[chave]
+    
+    def invalidar_cache_ids(self):
+        """Esvazia o cache de ids (ex.: após alterações feitas fora do app)"""
+        with _lock_ids:
+            for chave in [c for c in _ids_projetos if c[0] == self.supabase_url]:
+                del _ids_projetos[chave]
+            for chave in [c for c in _ids_categorias if c[0] == self.supabase_url]:
+                del _ids_categorias[chave]
+    
     # ==================== PROJETOS ====================
     
     def criar_projeto(self, nome: str, descricao: str = "") -> bool:
@@ -57,11 +151,32 @@ class SupabaseHandler:
                 "criado_em": datetime.now().isoformat()
             }
             
-            result = self.client.table("projetos").insert(data).execute()
+            # Idempotente: se o projeto já existir, nada muda (permite reenviar da fila)
+            result = self.client.table("projetos").upsert(
+                data, on_conflict="nome", ignore_duplicates=True
+            ).execute()
+            if result.data:
+                self._guardar_projeto_id(nome, result.data[0]["id"])
             return True
         except Exception as e:
             print(f"Erro ao criar projeto: {e}")
+            self.ultimo_erro = e
+            return False
+    
+    def deletar_projeto(self, nome: str) -> bool:
+        """Deleta um projeto (categorias e conteúdos saem em cascata)"""
+        if not self.connected:
+            return False
+        
+        try:
+            self.client.table("projetos").delete().eq("nome", nome).execute()
+            return True
+        except Exception as e:
+            print(f"Erro ao deletar projeto: {e}")
+            self.ultimo_erro = e
             return False
+        finally:
+            self._invalidar_projeto(nome)
     
     def listar_projetos(self) -> List[str]:
         """Lista todos os projetos"""
@@ -99,25 +214,81 @@ class SupabaseHandler:
         
         try:
             # Buscar ID do projeto
-            projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
+            projeto_id = self._obter_projeto_id(projeto_nome)
             
-            if not projeto.data:
+            if projeto_id is None:
                 return False
             
-            projeto_id = projeto.data[0]["id"]
-            
             data = {
                 "projeto_id": projeto_id,
                 "nome": categoria_nome,
                 "exemplo": exemplo,
-                "regras": regras,
-                "criado_em": datetime.now().isoformat()
+                "regras": regras
             }
             
-            self.client.table("categorias").insert(data).execute()
+            # Upsert: se a categoria já existir, exemplo e regras são substituídos
+            # (mesmo comportamento do armazenamento local)
+            result = self.client.table("categorias").upsert(
+                data, on_conflict="projeto_id,nome"
+            ).execute()
+            if result.data:
+                self._guardar_categoria_id(projeto_id, categoria_nome, result.data[0]["id"])
             return True
         except Exception as e:
             print(f"Erro ao adicionar categoria: {e}")
+            self.ultimo_erro = e
+            self._invalidar_projeto(projeto_nome)
+            return False
+    
+    def atualizar_categoria(self, projeto_nome: str, categoria_nome: str,
+                            exemplo: Optional[str] = None, regras: Optional[str] = None) -> bool:
+        """Atualiza exemplo e/ou regras de uma categoria"""
+        if not self.connected:
+            return False
+        
+        data = {}
+        if exemplo is not None:
+            data["exemplo"] = exemplo
+        if regras is not None:
+            data["regras"] = regras
+        
+        if not data:
+            return True
+        
+        try:
+            projeto_id, categoria_id = self._obter_ids_categoria(projeto_nome, categoria_nome)
+            
+            if categoria_id is None:
+                return False
+            
+            self.client.table("categorias").update(data).eq("id", categoria_id).execute()
+            return True
+        except Exception as e:
+            print(f"Erro ao atualizar categoria: {e}")
+            self.ultimo_erro = e
+            self._invalidar_projeto(projeto_nome)
+            return False
+    
+    def deletar_categoria(self, projeto_nome: str, categoria_nome: str) -> bool:
+        """Deleta uma categoria de um projeto"""
+        if not self.connected:
+            return False
+        
+        try:
+            projeto_id = self._obter_projeto_id(projeto_nome)
+            
+            if projeto_id is None:
+                # Projeto não existe: não há o que deletar
+                return True
+            
+            self.client.table("categorias").delete().eq("projeto_id", projeto_id).eq("nome", categoria_nome).execute()
+            
+            with _lock_ids:
+                _ids_categorias.pop((self.supabase_url, projeto_id, categoria_nome), None)
+            return True
+        except Exception as e:
+            print(f"Erro ao deletar categoria: {e}")
+            self.ultimo_erro = e
             return False
     
     def listar_categorias(self, projeto_nome: str) -> List[str]:
@@ -126,16 +297,17 @@ class SupabaseHandler:
             return []
         
         try:
-            # Buscar projeto
-            projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
-            
-            if not projeto.data:
-                return []
+            # Uma única consulta: categorias com join no projeto pelo nome
+            result = (
+                self.client.table("categorias")
+                .select("id, nome, projeto_id, projetos!inner(nome)")
+                .eq("projetos.nome", projeto_nome)
+                .execute()
+            )
             
-            projeto_id = projeto.data[0]["id"]
-            
-            # Buscar categorias
-            result = self.client.table("categorias").select("nome").eq("projeto_id", projeto_id).execute()
+            for c in result.data:
+                self._guardar_projeto_id(projeto_nome, c["projeto_id"])
+                self._guardar_categoria_id(c["projeto_id"], c["nome"], c["id"])
             
             return [c["nome"] for c in result.data]
         except Exception as e:
@@ -148,18 +320,18 @@ class SupabaseHandler:
             return None
         
         try:
-            # Buscar projeto
-            projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
-            
-            if not projeto.data:
-                return None
-            
-            projeto_id = projeto.data[0]["id"]
-            
-            # Buscar categoria
-            result = self.client.table("categorias").select("*").eq("projeto_id", projeto_id).eq("nome", categoria_nome).execute()
+            # Uma única consulta: categoria com join no projeto pelo nome
+            result = (
+                self.client.table("categorias")
+                .select("id, projeto_id, exemplo, regras, projetos!inner(nome)")
+                .eq("projetos.nome", projeto_nome)
+                .eq("nome", categoria_nome)
+                .execute()
+            )
             
             if result.data:
+                self._guardar_projeto_id(projeto_nome, result.data[0]["projeto_id"])
+                self._guardar_categoria_id(result.data[0]["projeto_id"], categoria_nome, result.data[0]["id"])
                 return {
                     "exemplo": result.data[0].get("exemplo", ""),
                     "regras": result.data[0].get("regras", "")
@@ -169,68 +341,379 @@ class SupabaseHandler:
             print(f"Erro ao obter categoria: {e}")
             return None
     
+    # ==================== SINCRONIZAÇÃO ====================
+    
+    def _paginar(self, montar_query, tamanho_pagina: int = 1000) -> List[Dict]:
+        """Executa uma consulta em páginas (o PostgREST limita as linhas por resposta)"""
+        linhas = []
+        inicio = 0
+        
+        while True:
+            result = montar_query().range(inicio, inicio + tamanho_pagina - 1).execute()
+            linhas.extend(result.data)
+            
+            if len(result.data) < tamanho_pagina:
+                return linhas
+            inicio += tamanho_pagina
+    
+    def listar_projetos_alterados(self, desde: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        Projetos criados ou alterados desde um instante (atualizado_em >= desde)
+        
+        Returns:
+            list de dicts com nome, descricao e atualizado_em, ou None em caso de erro
+        """
+        if not self.connected:
+            return None
+        
+        def montar_query():
+            query = self.client.table("projetos").select("nome, descricao, atualizado_em")
+            if desde:
+                query = query.gte("atualizado_em", desde)
+            return query.order("atualizado_em").order("id")
+        
+        try:
+            return self._paginar(montar_query)
+        except Exception as e:
+            print(f"Erro ao listar projetos alterados: {e}")
+            return None
+    
+    def listar_categorias_alteradas(self, desde: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        Categorias criadas ou alteradas desde um instante (atualizado_em >= desde)
+        
+        Returns:
+            list de dicts com projeto, nome, exemplo, regras e atualizado_em,
+            ou None em caso de erro
+        """
+        if not self.connected:
+            return None
+        
+        def montar_query():
+            query = self.client.table("categorias").select(
+                "nome, exemplo, regras, atualizado_em, projetos!inner(nome)"
+            )
+            if desde:
+                query = query.gte("atualizado_em", desde)
+            return query.order("atualizado_em").order("id")
+        
+        try:
+            return [
+                {
+                    "projeto": linha["projetos"]["nome"],
+                    "nome": linha["nome"],
+                    "exemplo": linha.get("exemplo") or "",
+                    "regras": linha.get("regras") or "",
+                    "atualizado_em": linha["atualizado_em"]
+                }
+                for linha in self._paginar(montar_query)
+            ]
+        except Exception as e:
+            print(f"Erro ao listar categorias alteradas: {e}")
+            return None
+    
+    def listar_nomes(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Todos os projetos e suas categorias, só os nomes
+        
+        Usado para detectar o que foi deletado no Supabase sem baixar as linhas.
+        
+        Returns:
+            dict {projeto: [categorias]}, ou None em caso de erro
+        """
+        if not self.connected:
+            return None
+        
+        try:
+            nomes = {
+                linha["nome"]: []
+                for linha in self._paginar(
+                    lambda: self.client.table("projetos").select("nome").order("id")
+                )
+            }
+            
+            for linha in self._paginar(
+                lambda: self.client.table("categorias").select("nome, projetos!inner(nome)").order("id")
+            ):
+                nomes.setdefault(linha["projetos"]["nome"], []).append(linha["nome"])
+            
+            return nomes
+        except Exception as e:
+            print(f"Erro ao listar nomes: {e}")
+            return None
+    
     # ==================== CONTEÚDOS GERADOS ====================
     
+    @staticmethod
+    def calcular_hash_conteudo(projeto_nome: str, categoria_nome: str,
+                               palavra_chave: str, conteudo_data: Dict) -> str:
+        """Hash que identifica um artigo no histórico (torna os inserts idempotentes)"""
+        partes = [
+            projeto_nome or "",
+            categoria_nome or "",
+            palavra_chave or "",
+            conteudo_data.get("titulo", ""),
+            conteudo_data.get("conteudo_formatado", "")
+        ]
+        return hashlib.sha256("\x1f".join(partes).encode('utf-8')).hexdigest()
+    
     def salvar_conteudo(self, projeto_nome: str, categoria_nome: str, 
                        palavra_chave: str, conteudo_data: Dict) -> bool:
         """Salva conteúdo gerado no histórico"""
+        return self.salvar_conteudos_em_lote([{
+            "projeto": projeto_nome,
+            "categoria": categoria_nome,
+            "palavra_chave": palavra_chave,
+            "conteudo_data": conteudo_data
+        }])
+    
+    def salvar_conteudos_em_lote(self, itens: List[Dict]) -> bool:
+        """
+        Salva vários conteúdos (e suas imagens) com inserts de várias linhas
+        
+        Os conteúdos são gravados com upsert em hash_conteudo, então reenviar o
+        mesmo lote (ex.: depois de uma falha de rede) não duplica linhas. Em
+        bancos sem essa coluna (supabase_setup.sql antigo), cai para um insert
+        simples, sem essa garantia.
+        
+        Args:
+            itens: dicts com projeto, categoria, palavra_chave, conteudo_data
+                   e, opcionalmente, criado_em
+            
+        Returns:
+            bool: True se o lote foi gravado (itens de projetos inexistentes são descartados)
+        """
         if not self.connected:
             return False
         
+        projetos = set()
+        
         try:
-            # Buscar projeto
-            projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
+            conteudos = {}
+            imagens = {}
             
-            if not projeto.data:
-                return False
+            for item in itens:
+                projeto_id, categoria_id = self._obter_ids_categoria(item["projeto"], item["categoria"])
+                
+                if projeto_id is None:
+                    print(f"⚠️ Projeto '{item['projeto']}' não existe no Supabase; conteúdo descartado")
+                    continue
+                
+                projetos.add(item["projeto"])
+                conteudo_data = item["conteudo_data"]
+                hash_conteudo = self.calcular_hash_conteudo(
+                    item["projeto"], item["categoria"], item["palavra_chave"], conteudo_data
+                )
+                
+                conteudos[hash_conteudo] = {
+                    "projeto_id": projeto_id,
+                    "categoria_id": categoria_id,
+                    "palavra_chave": item["palavra_chave"],
+                    "titulo": conteudo_data.get("titulo", ""),
+                    "meta_description": conteudo_data.get("meta_description", ""),
+                    "conteudo": conteudo_data.get("conteudo_formatado", ""),
+                    "palavras_chave_secundarias": conteudo_data.get("palavras_chave_secundarias", []),
+                    "imagem_path": conteudo_data.get("imagem_path", ""),
+                    "estatisticas": conteudo_data.get("estatisticas", {}),
+                    "hash_conteudo": hash_conteudo,
+                    "criado_em": item.get("criado_em") or datetime.now().isoformat()
+                }
+                
+                if conteudo_data.get("imagem_path"):
+                    imagens[hash_conteudo] = {
+                        "nome_arquivo": Path(conteudo_data["imagem_path"]).name,
+                        "url_publica": conteudo_data.get("imagem_url")
+                    }
             
-            projeto_id = projeto.data[0]["id"]
+            if not conteudos:
+                return True
             
-            # Buscar categoria
-            categoria = self.client.table("categorias").select("id").eq("projeto_id", projeto_id).eq("nome", categoria_nome).execute()
+            if self.supabase_url in _urls_sem_hash:
+                self._inserir_conteudos(conteudos, imagens)
+                return True
             
-            categoria_id = categoria.data[0]["id"] if categoria.data else None
+            try:
+                self.client.table("conteudos_gerados").upsert(
+                    list(conteudos.values()),
+                    on_conflict="hash_conteudo",
+                    ignore_duplicates=True,
+                    returning=ReturnMethod.minimal
+                ).execute()
+            except Exception as e:
+                if not self._falta_migracao(e):
+                    raise
+                print("⚠️ conteudos_gerados sem hash_conteudo (execute supabase_setup.sql); usando insert simples")
+                with _lock_ids:
+                    _urls_sem_hash.add(self.supabase_url)
+                self._inserir_conteudos(conteudos, imagens)
+                return True
             
-            data = {
-                "projeto_id": projeto_id,
-                "categoria_id": categoria_id,
-                "palavra_chave": palavra_chave,
-                "titulo": conteudo_data.get("titulo", ""),
-                "meta_description": conteudo_data.get("meta_description", ""),
-                "conteudo": conteudo_data.get("conteudo_formatado", ""),
-                "palavras_chave_secundarias": conteudo_data.get("palavras_chave_secundarias", []),
-                "imagem_path": conteudo_data.get("imagem_path", ""),
-                "estatisticas": conteudo_data.get("estatisticas", {}),
-                "criado_em": datetime.now().isoformat()
-            }
+            if imagens:
+                # Ids dos conteúdos (novos ou já existentes) para ligar as imagens
+                ids = (
+                    self.client.table("conteudos_gerados")
+                    .select("id, hash_conteudo")
+                    .in_("hash_conteudo", list(imagens.keys()))
+                    .execute()
+                )
+                
+                linhas_imagens = [
+                    {"conteudo_id": linha["id"], **imagens[linha["hash_conteudo"]]}
+                    for linha in ids.data
+                ]
+                
+                if linhas_imagens:
+                    try:
+                        self.client.table("imagens_geradas").upsert(
+                            linhas_imagens,
+                            on_conflict="conteudo_id,nome_arquivo",
+                            ignore_duplicates=True,
+                            returning=ReturnMethod.minimal
+                        ).execute()
+                    except Exception as e:
+                        if not self._falta_migracao(e):
+                            raise
+                        self.client.table("imagens_geradas").insert(
+                            linhas_imagens, returning=ReturnMethod.minimal
+                        ).execute()
             
-            self.client.table("conteudos_gerados").insert(data).execute()
             return True
         except Exception as e:
             print(f"Erro ao salvar conteúdo: {e}")
+            self.ultimo_erro = e
+            # O id em cache pode estar desatualizado (projeto recriado fora do app)
+            for projeto_nome in projetos:
+                self._invalidar_projeto(projeto_nome)
             return False
     
+    @staticmethod
+    def _falta_migracao(erro: Exception) -> bool:
+        """Se o erro vem de um banco sem a coluna hash_conteudo ou sem os índices únicos"""
+        return str(getattr(erro, "code", None) or "") in CODIGOS_SEM_MIGRACAO
+    
+    def _inserir_conteudos(self, conteudos: Dict[str, Dict], imagens: Dict[str, Dict]):
+        """Insert simples do lote (sem hash_conteudo) e das imagens ligadas aos ids retornados"""
+        hashes = list(conteudos.keys())
+        linhas = [
+            {coluna: valor for coluna, valor in conteudo.items() if coluna != "hash_conteudo"}
+            for conteudo in conteudos.values()
+        ]
+        
+        result = self.client.table("conteudos_gerados").insert(linhas).execute()
+        
+        # O PostgREST devolve as linhas na ordem em que foram enviadas
+        linhas_imagens = [
+            {"conteudo_id": linha["id"], **imagens[hash_conteudo]}
+            for hash_conteudo, linha in zip(hashes, result.data)
+            if hash_conteudo in imagens
+        ]
+        
+        if linhas_imagens:
+            self.client.table("imagens_geradas").insert(
+                linhas_imagens, returning=ReturnMethod.minimal
+            ).execute()
+    
     def listar_conteudos(self, projeto_nome: str = None, categoria_nome: str = None, 
                         limite: int = 50) -> List[Dict]:
-        """Lista conteúdos gerados"""
+        """Lista conteúdos gerados (linhas completas, mais recentes primeiro)"""
+        pagina = self.listar_conteudos_paginado(
+            projeto_nome, categoria_nome, tamanho_pagina=limite, colunas="*"
+        )
+        return pagina["itens"]
+    
+    def listar_conteudos_paginado(
+        self,
+        projeto_nome: str = None,
+        categoria_nome: str = None,
+        tamanho_pagina: int = 50,
+        cursor: Optional[Tuple[str, int]] = None,
+        colunas: str = None
+    ) -> Dict:
+        """
+        Lista uma página do histórico, mais recentes primeiro
+        
+        Usa paginação por chave (criado_em, id): cada página continua do último
+        item da anterior, então o custo não cresce com a posição no histórico.
+        Por padrão traz só o resumo (COLUNAS_RESUMO); o texto completo de um
+        artigo é buscado sob demanda com obter_conteudo.
+        
+        Args:
+            projeto_nome: Filtrar por projeto (opcional)
+            categoria_nome: Filtrar por categoria do projeto (opcional)
+            tamanho_pagina: Itens por página
+            cursor: proximo_cursor da página anterior (None = primeira página)
+            colunas: Colunas do select (padrão: COLUNAS_RESUMO)
+            
+        Returns:
+            dict com itens e proximo_cursor (None quando não há mais páginas)
+        """
+        vazio = {"itens": [], "proximo_cursor": None}
+        
         if not self.connected:
-            return []
+            return vazio
         
         try:
-            query = self.client.table("conteudos_gerados").select("*")
+            query = self.client.table("conteudos_gerados").select(colunas or self.COLUNAS_RESUMO)
+            
+            if projeto_nome and categoria_nome:
+                projeto_id, categoria_id = self._obter_ids_categoria(projeto_nome, categoria_nome)
+                if categoria_id is None:
+                    return vazio
+                query = query.eq("projeto_id", projeto_id).eq("categoria_id", categoria_id)
+            elif projeto_nome:
+                projeto_id = self._obter_projeto_id(projeto_nome)
+                if projeto_id is None:
+                    return vazio
+                query = query.eq("projeto_id", projeto_id)
             
-            if projeto_nome:
-                projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
-                if projeto.data:
-                    query = query.eq("projeto_id", projeto.data[0]["id"])
+            if cursor:
+                criado_em, ultimo_id = cursor
+                query = query.or_(
+                    f'criado_em.lt."{criado_em}",'
+                    f'and(criado_em.eq."{criado_em}",id.lt.{int(ultimo_id)})'
+                )
             
-            query = query.order("criado_em", desc=True).limit(limite)
+            result = (
+                query.order("criado_em", desc=True)
+                .order("id", desc=True)
+                .limit(tamanho_pagina)
+                .execute()
+            )
             
-            result = query.execute()
-            return result.data
+            itens = result.data
+            proximo_cursor = None
+            if len(itens) == tamanho_pagina:
+                proximo_cursor = (itens[-1]["criado_em"], itens[-1]["id"])
+            
+            return {"itens": itens, "proximo_cursor": proximo_cursor}
         except Exception as e:
             print(f"Erro ao listar conteúdos: {e}")
-            return []
+            return vazio
+    
+    def iterar_conteudos(
+        self,
+        projeto_nome: str = None,
+        categoria_nome: str = None,
+        tamanho_pagina: int = 100,
+        colunas: str = None
+    ) -> Iterator[Dict]:
+        """
+        Percorre todo o histórico, buscando as páginas conforme são consumidas
+        
+        Yields:
+            dict de cada conteúdo (resumo por padrão, veja listar_conteudos_paginado)
+        """
+        cursor = None
+        
+        while True:
+            pagina = self.listar_conteudos_paginado(
+                projeto_nome, categoria_nome, tamanho_pagina, cursor, colunas
+            )
+            yield from pagina["itens"]
+            
+            cursor = pagina["proximo_cursor"]
+            if cursor is None:
+                break
     
     def obter_conteudo(self, conteudo_id: int) -> Optional[Dict]:
         """Obtém um conteúdo específico"""
@@ -250,31 +733,33 @@ class SupabaseHandler:
     # ==================== ESTATÍSTICAS ====================
     
     def obter_estatisticas_projeto(self, projeto_nome: str) -> Dict:
-        """Obtém estatísticas de um projeto"""
+        """
+        Obtém estatísticas de um projeto
+        
+        Os totais são agregados no banco pela view estatisticas_projetos
+        (supabase_setup.sql): uma única linha trafega, seja qual for o histórico.
+        """
         if not self.connected:
             return {}
         
         try:
-            # Buscar projeto
-            projeto = self.client.table("projetos").select("id").eq("nome", projeto_nome).execute()
+            result = (
+                self.client.table("estatisticas_projetos")
+                .select("total_categorias, total_conteudos, total_palavras, ultimo_conteudo")
+                .eq("nome", projeto_nome)
+                .execute()
+            )
             
-            if not projeto.data:
+            if not result.data:
                 return {}
             
-            projeto_id = projeto.data[0]["id"]
-            
-            # Contar conteúdos
-            conteudos = self.client.table("conteudos_gerados").select("*").eq("projeto_id", projeto_id).execute()
-            
-            total_conteudos = len(conteudos.data)
-            
-            # Calcular estatísticas
-            total_palavras = sum([c.get("estatisticas", {}).get("total_palavras", 0) for c in conteudos.data])
+            linha = result.data[0]
             
             return {
-                "total_conteudos": total_conteudos,
-                "total_palavras": total_palavras,
-                "ultimo_conteudo": conteudos.data[0].get("criado_em") if conteudos.data else None
+                "total_conteudos": linha.get("total_conteudos") or 0,
+                "total_palavras": linha.get("total_palavras") or 0,
+                "total_categorias": linha.get("total_categorias") or 0,
+                "ultimo_conteudo": linha.get("ultimo_conteudo")
             }
         except Exception as e:
             print(f"Erro ao obter estatísticas: {e}")